@@ -0,0 +1,51 @@
+"""
+Admin helpers for very large tables.
+
+A stock changelist runs an exact COUNT(*) for the paginator, plus another
+over the whole table for "(N total)". At millions of rows each is a full
+scan. `LargeTableAdminMixin` drops the second one and paginates with
+`EstimatedCountPaginator`:
+
+- an unfiltered Postgres table reports the planner's row estimate
+  (pg_class.reltuples, refreshed by autovacuum/ANALYZE);
+- any other list counts at most ADMIN_COUNT_LIMIT rows, so paging stops
+  there instead of scanning every match.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using):
+    """Planner estimate of `model`'s table size on Postgres, or None."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 until the table was first analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = settings.ADMIN_COUNT_LIMIT
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= limit:
+                return estimate
+        # COUNT over a LIMIT subquery: stops after `limit` matches
+        return queryset.order_by()[:limit].count()
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
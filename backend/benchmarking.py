@@ -0,0 +1,220 @@
+"""
+Shared helpers for the benchmark management commands.
+
+Each benchmark collects raw samples, turns them into a stats dict with
+`summarize`, and writes/compares a JSON baseline so regressions show up
+as diffs between runs. Commands subclass `BenchmarkCommand`, which owns the
+common options and the baseline handling.
+"""
+
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+BASELINE_DIR = Path(settings.BASE_DIR) / "benchmarks"
+
+
+def percentile(samples, pct):
+    """Return the `pct` percentile (0-100) of `samples` using linear interpolation."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * (pct / 100)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(timings, queries=None, total_seconds=None):
+    """
+    Build a stats dict from per-iteration timings (seconds).
+    Latencies are reported in milliseconds, throughput in ops/second.
+    """
+    total = total_seconds if total_seconds is not None else sum(timings)
+    stats = {
+        "iterations": len(timings),
+        "throughput": round(len(timings) / total, 2) if total else 0.0,
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3) if timings else 0.0,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+    }
+    if queries is not None:
+        stats["queries"] = max(queries) if queries else 0
+    return stats
+
+
+def time_call(fn, iterations, warmup=0):
+    """Call `fn` `warmup + iterations` times and return the measured timings."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def baseline_path(name):
+    return BASELINE_DIR / f"{name}.json"
+
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open() as fh:
+        return json.load(fh)
+
+
+def write_baseline(path, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Compare two `{case: stats}` mappings.
+
+    Returns a list of `(case, metric, old, new, change, regressed)` rows.
+    Latency metrics regress when they grow by more than `tolerance`,
+    query counts regress on any increase and throughput on any drop
+    beyond `tolerance`.
+    """
+    rows = []
+    for case, stats in current.items():
+        old_stats = (baseline or {}).get(case)
+        if not old_stats:
+            continue
+        for metric, new in stats.items():
+            old = old_stats.get(metric)
+            if old is None or metric == "iterations" or not isinstance(new, (int, float)):
+                continue
+            change = ((new - old) / old) if old else 0.0
+            if metric == "queries":
+                regressed = new > old
+            elif metric == "throughput":
+                regressed = change < -tolerance
+            elif metric.endswith("_ms"):
+                regressed = change > tolerance
+            else:
+                regressed = False
+            rows.append((case, metric, old, new, change, regressed))
+    return rows
+
+
+def report(stdout, style, current, baseline, tolerance=0.2):
+    """Print `current` stats and, when a baseline exists, the diff against it."""
+    for case, stats in current.items():
+        line = ", ".join(f"{key}={value}" for key, value in stats.items())
+        stdout.write(f"{case}: {line}")
+
+    if baseline is None:
+        stdout.write("No baseline found — run with --update-baseline to record one.")
+        return []
+
+    rows = compare(current, baseline, tolerance)
+    regressions = [row for row in rows if row[5]]
+    for case, metric, old, new, change, regressed in rows:
+        message = f"  {case}.{metric}: {old} -> {new} ({change:+.1%})"
+        stdout.write(style.ERROR(message) if regressed else message)
+    if regressions:
+        stdout.write(style.ERROR(f"{len(regressions)} regression(s) against baseline."))
+    else:
+        stdout.write(style.SUCCESS("No regressions against baseline."))
+    return regressions
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Base class for benchmark commands.
+
+    Subclasses set `name` (the baseline file), optionally the default
+    `iterations`/`warmup`, add their own options in `add_benchmark_arguments`
+    and implement `run(options)`, returning `{case: stats}`. With
+    `test_database`, `run` executes inside a throwaway test database
+    (`--keepdb` reuses it). The results are then reported against the
+    baseline, which `--update-baseline` overwrites and `--fail-on-regression`
+    enforces.
+    """
+
+    name = None
+    iterations = 10
+    warmup = 1
+    test_database = False
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=self.iterations)
+        parser.add_argument("--warmup", type=int, default=self.warmup)
+        parser.add_argument(
+            "--baseline",
+            default=str(baseline_path(self.name)),
+            help="Path of the JSON baseline to compare against.",
+        )
+        parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed relative latency/throughput change before flagging.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when any metric regresses.",
+        )
+        if self.test_database:
+            parser.add_argument("--keepdb", action="store_true", help="Reuse the test database.")
+        self.add_benchmark_arguments(parser)
+
+    def add_benchmark_arguments(self, parser):
+        pass
+
+    def run(self, options):
+        raise NotImplementedError
+
+    def metadata(self, options):
+        """Extra context stored with the baseline (not compared)."""
+        return {}
+
+    def handle(self, *args, **options):
+        if self.test_database:
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False, keepdb=options["keepdb"])
+            try:
+                cases = self.run(options)
+            finally:
+                teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+                teardown_test_environment()
+        else:
+            cases = self.run(options)
+
+        baseline = load_baseline(options["baseline"])
+        regressions = report(
+            self.stdout, self.style, cases, baseline and baseline.get("cases"), options["tolerance"]
+        )
+        if options["update_baseline"]:
+            results = {"cases": cases}
+            meta = self.metadata(options)
+            if meta:
+                results["meta"] = meta
+            write_baseline(options["baseline"], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+        elif regressions and options["fail_on_regression"]:
+            raise CommandError("Benchmark regressed against baseline.")
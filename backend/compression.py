@@ -0,0 +1,185 @@
+"""
+Brotli/gzip response compression.
+
+A replacement for Django's GZipMiddleware that:
+- negotiates Brotli (when the `brotli` package is installed) or gzip from
+  Accept-Encoding, honouring q-values,
+- only compresses text-like content types,
+- sits after WhiteNoiseMiddleware, so static files (served precompressed
+  by WhiteNoise) never reach it,
+- skips bodies smaller than COMPRESSION_MIN_SIZE bytes,
+- compresses streaming responses (e.g. exports) chunk by chunk, flushing
+  after each chunk so clients still receive data incrementally.
+"""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def parse_accept_encoding(header):
+    """Return `{coding: q}` for an Accept-Encoding header value."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def quality(codings, coding):
+    """The q the client gives `coding`, falling back to `*`."""
+    return codings.get(coding, codings.get("*", 0.0))
+
+
+def accepts(codings, coding):
+    return quality(codings, coding) > 0
+
+
+def gzip_compress(data, level=None):
+    level = settings.COMPRESSION_GZIP_LEVEL if level is None else level
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_compress(data, quality=None):
+    quality = settings.COMPRESSION_BROTLI_QUALITY if quality is None else quality
+    return brotli.compress(data, quality=quality)
+
+
+class GzipStream:
+    """Incremental gzip compressor that flushes after every chunk."""
+
+    def __init__(self, level=None):
+        level = settings.COMPRESSION_GZIP_LEVEL if level is None else level
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliStream:
+    """Incremental Brotli compressor that flushes after every chunk."""
+
+    def __init__(self, quality=None):
+        quality = settings.COMPRESSION_BROTLI_QUALITY if quality is None else quality
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def compress_sequence(iterator, stream):
+    for chunk in iterator:
+        data = stream.process(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+async def compress_async_sequence(iterator, stream):
+    async for chunk in iterator:
+        data = stream.process(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+# In order of server preference, which only breaks ties between equal q-values
+CODINGS = {
+    "br": (brotli_compress, BrotliStream),
+    "gzip": (gzip_compress, GzipStream),
+}
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with Brotli or gzip, whichever the client prefers."""
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or not self._compressible(response):
+            return response
+
+        min_size = settings.COMPRESSION_MIN_SIZE
+        if response.streaming:
+            length = response.get("Content-Length")
+            if length and length.isdigit() and int(length) < min_size:
+                return response
+        elif len(response.content) < min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        coding = self._choose_coding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+        compress, stream_class = CODINGS[coding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_sequence(
+                    response.streaming_content, stream_class()
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, stream_class()
+                )
+            # The compressed size is unknown until the stream is consumed.
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Compressed bytes differ from the original representation (RFC 9110 8.8.1).
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
+
+    def _compressible(self, response):
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _choose_coding(self, header):
+        codings = parse_accept_encoding(header)
+        available = [coding for coding in CODINGS if coding != "br" or brotli is not None]
+        best = max(available, key=lambda coding: quality(codings, coding))  # first wins ties
+        q = quality(codings, best)
+        # An explicitly preferred identity means "rather uncompressed"
+        if q <= 0 or codings.get("identity", 0.0) > q:
+            return None
+        return best
@@ -0,0 +1,123 @@
+"""
+Read-replica routing.
+
+Writes always go to ``default``. Reads go to the replica alias only while a
+view that opted in with ``ReplicaReadMixin`` handles a safe request, and
+only if the requesting user has not written anything in the last
+``REPLICA_STICKY_SECONDS`` (read-your-writes stickiness). Everything else
+keeps reading from the primary.
+
+Pins are ``backend.PrimaryPin`` rows on the primary, so a write handled by
+one worker pins the user's reads on every other worker and host too.
+"""
+
+import contextvars
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def replica_alias():
+    """Return the configured replica alias, or None when no replica is set up."""
+    alias = getattr(settings, "REPLICA_DB_ALIAS", None)
+    return alias if alias in settings.DATABASES else None
+
+
+def pin_to_primary(user_id):
+    """Send this user's reads to the primary for the sticky window (one UPSERT)."""
+    from .models import PrimaryPin
+
+    until = timezone.now() + timedelta(seconds=settings.REPLICA_STICKY_SECONDS)
+    PrimaryPin.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+        [PrimaryPin(user_id=user_id, pinned_until=until)],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["pinned_until"],
+    )
+
+
+def is_pinned_to_primary(user_id):
+    from .models import PrimaryPin
+
+    return (
+        PrimaryPin.objects.using(DEFAULT_DB_ALIAS)
+        .filter(user_id=user_id, pinned_until__gt=timezone.now())
+        .exists()
+    )
+
+
+class ReplicaRouter:
+    """Route reads to the replica while `_replica_reads` is enabled."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return replica_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so objects from either relate.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinMiddleware:
+    """Pin a user to the primary after any successful write request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+            and replica_alias()
+        ):
+            pin_to_primary(user.pk)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Opt a DRF view into replica reads for lag-tolerant, read-only requests.
+
+    `replica_actions` limits the opt-in to specific viewset actions; leave it
+    as None to allow every safe method.
+    """
+
+    replica_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _replica_reads.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication and permission checks run on the primary.
+        super().initial(request, *args, **kwargs)
+        if self.use_replica(request):
+            _replica_reads.set(True)
+
+    def use_replica(self, request):
+        if request.method not in SAFE_METHODS or not replica_alias():
+            return False
+        action = getattr(self, "action", None)
+        if self.replica_actions is not None and action not in self.replica_actions:
+            return False
+        user = request.user
+        return not (user.is_authenticated and is_pinned_to_primary(user.pk))
@@ -0,0 +1,134 @@
+"""
+In-process domain event bus.
+
+Models and jobs `publish()` typed events instead of writing side effects
+(notification rows, pushes) themselves. Events published inside a database
+transaction are only delivered once it commits, and are dropped on rollback.
+
+Delivery is batched: inside a `collect()` scope (every request, through
+EventBatchMiddleware, and the batch jobs) events are buffered and handed to
+each subscriber as one list when the scope ends, so a subscriber can write
+all of a request's side effects with a couple of bulk queries. Outside a
+scope, each event is delivered on its own.
+"""
+
+import contextlib
+import contextvars
+import logging
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# Events
+# -------------------------
+@dataclass(frozen=True)
+class BudgetCreated:
+    user_id: int
+    budget_id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class BudgetUpdated:
+    user_id: int
+    budget_id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class ExpenseRecorded:
+    user_id: int
+    budget_id: int
+    budget_name: str
+    amount: Decimal
+
+
+@dataclass(frozen=True)
+class ThresholdCrossed:
+    user_id: int
+    budget_id: int
+    budget_name: str
+    percent: int
+    spent: Decimal
+    limit: Decimal
+    push: bool = True
+
+
+# -------------------------
+# Bus
+# -------------------------
+# [(handler, event types)]; handlers take a list of events
+_subscribers = []
+_batch = contextvars.ContextVar("event_batch", default=None)
+
+
+def subscribe(handler, *event_types):
+    """Register `handler(events)` for the given event types."""
+    _subscribers.append((handler, event_types))
+    return handler
+
+
+def publish(event):
+    """Deliver `event` once the current transaction (if any) commits."""
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _deliver(event))
+    else:
+        _deliver(event)
+
+
+def _deliver(event):
+    batch = _batch.get()
+    if batch is not None:
+        batch.append(event)
+    else:
+        dispatch([event])
+
+
+def dispatch(events):
+    """Hand `events` to every subscriber, each getting only the types it registered for."""
+    if not events:
+        return
+    started = time.perf_counter()
+    for handler, event_types in _subscribers:
+        matching = [e for e in events if isinstance(e, event_types)]
+        if matching:
+            # Side effects run after commit; a failing subscriber must not fail the request
+            try:
+                handler(matching)
+            except Exception:
+                logger.exception("Event subscriber %s failed", handler.__qualname__)
+    logger.debug(
+        "Dispatched %d events in %.1fms", len(events), (time.perf_counter() - started) * 1000
+    )
+
+
+@contextlib.contextmanager
+def collect():
+    """Buffer delivered events and dispatch them together on exit (nestable)."""
+    if _batch.get() is not None:
+        yield
+        return
+    batch = []
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        dispatch(batch)
+
+
+class EventBatchMiddleware:
+    """Dispatch each request's events as one batch after the response is built."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect():
+            return self.get_response(request)
@@ -0,0 +1,325 @@
+"""
+Off-request image pipeline for profile and budget images.
+
+Uploads are only validated during the request and staged under
+IMAGE_STAGING_PREFIX in the "image_staging" storage (IMAGE_STAGING_STORAGE,
+by default a directory shared by the web and worker hosts; never the media
+storage, so the request does not wait on Cloudinary); the model row is
+marked `image_status="pending"` and serializers return
+IMAGE_PLACEHOLDER_URL meanwhile. The `process_images` worker then, per
+staged image:
+
+- re-encodes it with Pillow (EXIF orientation applied, metadata dropped),
+  downscaled to IMAGE_MAX_DIMENSION,
+- renders an IMAGE_THUMBNAIL_SIZE thumbnail,
+- saves both to the default storage (Cloudinary in production) and flips
+  the row to "ready" with one UPDATE, unless a newer upload replaced it.
+
+Undecodable or missing staged files mark the row "failed". Storage errors
+leave it pending for the next run, until it has been pending for
+IMAGE_STAGING_TIMEOUT seconds; then it is failed too, so no image stays on
+the placeholder forever.
+
+Models opt in with `image`, `image_thumbnail`, `image_status`,
+`image_staged` and `image_staged_at` fields and are listed in
+IMAGE_PIPELINE_MODELS.
+
+Reads go through `media_url`, which memoizes storage URLs per process: names
+are unique per upload, so a URL never goes stale and Cloudinary's URL
+building (and signing) runs once per image instead of once per row.
+"""
+
+import io
+import logging
+import os
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+
+import cloudinary
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+IMAGE_STATUS_CHOICES = (
+    ("none", "No image"),
+    ("pending", "Processing"),
+    ("ready", "Ready"),
+    ("failed", "Failed"),
+)
+ACCEPTED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF", "BMP", "TIFF"}
+# Size variant -> model field holding it
+IMAGE_VARIANTS = {"full": "image", "thumbnail": "image_thumbnail"}
+
+
+def staging_storage():
+    return storages["image_staging"]
+
+
+# -------------------------
+# Request side
+# -------------------------
+def validate_image(upload):
+    """Cheap checks before staging: size, format and pixel count (no decoding)."""
+    if upload.size > settings.IMAGE_MAX_UPLOAD_BYTES:
+        raise serializers.ValidationError(
+            f"Image is too large (max {settings.IMAGE_MAX_UPLOAD_BYTES // (1024 * 1024)} MB)."
+        )
+    try:
+        upload.seek(0)
+        with Image.open(upload) as image:
+            format, (width, height) = image.format, image.size
+            image.verify()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise serializers.ValidationError("Upload a valid image.")
+    finally:
+        upload.seek(0)
+    if format not in ACCEPTED_FORMATS:
+        raise serializers.ValidationError(f"Unsupported image format '{format}'.")
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise serializers.ValidationError("Image dimensions are too large.")
+
+
+def stage(upload):
+    """Store the raw upload for the worker; returns its staging name."""
+    extension = os.path.splitext(upload.name or "")[1].lower()[:10]
+    return staging_storage().save(f"{settings.IMAGE_STAGING_PREFIX}{uuid.uuid4().hex}{extension}", upload)
+
+
+# -------------------------
+# URLs
+# -------------------------
+def _is_cloudinary(storage):
+    return hasattr(storage, "_prepend_prefix")
+
+
+@lru_cache(maxsize=None)
+def thumbnail_transformation():
+    size = settings.IMAGE_THUMBNAIL_SIZE
+    return (("crop", "limit"), ("height", size), ("width", size))
+
+
+@lru_cache(maxsize=settings.IMAGE_URL_CACHE_SIZE)
+def media_url(storage, name, transformation=()):
+    """
+    URL of `name` in `storage`, memoized on `(storage, name, transformation)`.
+    `transformation` is a tuple of Cloudinary options, e.g.
+    `(("width", 256), ("crop", "limit"))`; other storages ignore it.
+    With IMAGE_SIGN_URLS, Cloudinary URLs are signed.
+    """
+    if _is_cloudinary(storage) and (transformation or settings.IMAGE_SIGN_URLS):
+        resource = cloudinary.CloudinaryResource(
+            storage._prepend_prefix(name), default_resource_type=storage._get_resource_type(name)
+        )
+        return resource.build_url(sign_url=settings.IMAGE_SIGN_URLS, **dict(transformation))
+    return storage.url(name)
+
+
+def _stored(instance, field_name):
+    """`(storage, name)` of a file field, read without building a FieldFile."""
+    value = instance.__dict__.get(field_name)
+    return instance._meta.get_field(field_name).storage, getattr(value, "name", value)
+
+
+def image_url(instance, variant="full"):
+    """
+    URL of an instance's image in the given size variant, or None. Images
+    without a stored thumbnail (uploaded before the pipeline) get a
+    Cloudinary-resized or full-size URL instead.
+    """
+    storage, name = _stored(instance, "image")
+    if not name:
+        return None
+    if variant == "thumbnail":
+        thumbnail_storage, thumbnail = _stored(instance, "image_thumbnail")
+        if thumbnail:
+            return media_url(thumbnail_storage, thumbnail)
+        return media_url(storage, name, thumbnail_transformation())
+    return media_url(storage, name)
+
+
+class ProcessedImageField(serializers.ImageField):
+    """
+    Writes stage the upload for the pipeline instead of storing it inline;
+    reads return the image URL, or the placeholder while it is processing.
+    Bound to the whole instance (source="*").
+
+    Rows serialized as part of a list get the thumbnail variant, single
+    objects the full image; `?image_size=thumbnail|full` overrides both.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("required", False)
+        kwargs.setdefault("allow_null", True)
+        super().__init__(source="*", **kwargs)
+
+    def get_variant(self):
+        request = self.context.get("request")
+        requested = request.query_params.get("image_size") if request is not None else None
+        if requested in IMAGE_VARIANTS:
+            return requested
+        in_list = isinstance(getattr(self.parent, "parent", None), serializers.ListSerializer)
+        return "thumbnail" if in_list else "full"
+
+    def validate_empty_values(self, data):
+        if data is None or data == "":
+            # Clearing the image
+            return True, {
+                "image": None,
+                "image_thumbnail": None,
+                "image_status": "none",
+                "image_staged": "",
+                "image_staged_at": None,
+            }
+        return super().validate_empty_values(data)
+
+    def to_internal_value(self, data):
+        upload = super().to_internal_value(data)
+        validate_image(upload)
+        return {"image_staged": stage(upload), "image_staged_at": timezone.now(), "image_status": "pending"}
+
+    def to_representation(self, instance):
+        if instance.image_status == "pending":
+            url = settings.IMAGE_PLACEHOLDER_URL
+        else:
+            url = image_url(instance, self.get_variant())
+            if url is None:
+                return None
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+# -------------------------
+# Worker side
+# -------------------------
+def render(data):
+    """Return `(full, thumbnail)` JPEG/PNG bytes and the file extension to use."""
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        keep_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if keep_alpha else "RGB")
+
+    def encode(img):
+        buffer = io.BytesIO()
+        if keep_alpha:
+            img.save(buffer, "PNG", optimize=True)
+        else:
+            img.save(buffer, "JPEG", quality=settings.IMAGE_QUALITY, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+    full = image.copy()
+    full.thumbnail((settings.IMAGE_MAX_DIMENSION,) * 2, Image.Resampling.LANCZOS)
+    thumbnail = image.copy()
+    thumbnail.thumbnail((settings.IMAGE_THUMBNAIL_SIZE,) * 2, Image.Resampling.LANCZOS)
+    return encode(full), encode(thumbnail), "png" if keep_alpha else "jpg"
+
+
+def fail(model, pk, staged):
+    """Give up on staged image `staged` of row `pk` (unless a newer upload replaced it)."""
+    model.objects.filter(pk=pk, image_staged=staged).update(
+        image_status="failed", image_staged="", image_staged_at=None
+    )
+    try:
+        staging_storage().delete(staged)
+    except Exception:
+        logger.warning("Could not delete staged image %s", staged, exc_info=True)
+    return "failed"
+
+
+def publish(model, pk, staged):
+    """Process one staged image and attach the results to row `pk`. Returns the new status."""
+    staging = staging_storage()
+    try:
+        with staging.open(staged, "rb") as f:
+            data = f.read()
+    except Exception:
+        if not _exists(staging, staged):
+            logger.error("Staged image %s for %s %s is missing", staged, model.__name__, pk)
+            return fail(model, pk, staged)
+        # Storage hiccup: leave it pending for the next run (see IMAGE_STAGING_TIMEOUT)
+        logger.warning("Could not read staged image %s", staged, exc_info=True)
+        return "retry"
+    try:
+        full, thumbnail, extension = render(data)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError):
+        logger.exception("Could not process staged image %s for %s %s", staged, model.__name__, pk)
+        return fail(model, pk, staged)
+
+    basename = f"{uuid.uuid4().hex}.{extension}"
+    image_field = model._meta.get_field("image")
+    thumb_field = model._meta.get_field("image_thumbnail")
+    image_name = image_field.storage.save(image_field.generate_filename(None, basename), ContentFile(full))
+    thumb_name = thumb_field.storage.save(thumb_field.generate_filename(None, basename), ContentFile(thumbnail))
+
+    current = model.objects.filter(pk=pk, image_staged=staged)
+    previous = current.values_list("image", "image_thumbnail").first()
+    updated = current.update(
+        image=image_name,
+        image_thumbnail=thumb_name,
+        image_status="ready",
+        image_staged="",
+        image_staged_at=None,
+    )
+    if updated:
+        # The files this upload replaced
+        stale = [name for name in previous or () if name]
+    else:
+        # Replaced by a newer upload (or deleted) meanwhile
+        stale = [image_name, thumb_name]
+    for name in stale:
+        image_field.storage.delete(name)
+    staging.delete(staged)
+    return "ready" if updated else "stale"
+
+
+def _exists(storage, name):
+    """Whether `name` is in `storage`; assumed so when the storage cannot tell."""
+    try:
+        return storage.exists(name)
+    except Exception:
+        return True
+
+
+def fail_stuck(model, now=None):
+    """Fail rows pending for longer than IMAGE_STAGING_TIMEOUT. Returns how many."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.IMAGE_STAGING_TIMEOUT)
+    stuck = model.objects.filter(image_status="pending").filter(
+        Q(image_staged="") | Q(image_staged_at=None) | Q(image_staged_at__lt=cutoff)
+    )
+    rows = list(stuck.values_list("pk", "image_staged"))
+    for pk, staged in rows:
+        logger.error("Image of %s %s stuck in processing, marking it failed", model.__name__, pk)
+        if staged:
+            fail(model, pk, staged)
+        else:
+            model.objects.filter(pk=pk, image_staged="").update(image_status="failed", image_staged_at=None)
+    return len(rows)
+
+
+def process_pending(batch_size=100):
+    """Publish every staged image. Returns `{status: count}`."""
+    counts = {}
+    for label in settings.IMAGE_PIPELINE_MODELS:
+        model = apps.get_model(label)
+        stuck = fail_stuck(model)
+        if stuck:
+            counts["failed"] = counts.get("failed", 0) + stuck
+        pending = model.objects.filter(image_status="pending").exclude(image_staged="")
+        last_pk = None
+        while True:
+            page = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+            batch = list(page.order_by("pk").values_list("pk", "image_staged")[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            for pk, staged in batch:
+                status = publish(model, pk, staged)
+                counts[status] = counts.get(status, 0) + 1
+    return counts
@@ -0,0 +1,47 @@
+from backend import benchmarking, compression
+from backend.management.commands.benchmark_renderers import transaction_rows
+from backend.renderers import FastJSONRenderer
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Measure CPU cost versus bytes saved for gzip levels and Brotli qualities "
+        "on rendered transaction-list payloads of several sizes."
+    )
+    name = "compression"
+
+    def add_benchmark_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[100, 1000, 10000],
+            help="Payload sizes (transactions per response).",
+        )
+        parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6, 9])
+        parser.add_argument("--brotli-qualities", type=int, nargs="+", default=[1, 5, 9])
+
+    def run(self, options):
+        codecs = {f"gzip{level}": (compression.gzip_compress, level) for level in options["gzip_levels"]}
+        if compression.brotli is not None:
+            codecs.update(
+                {f"br{q}": (compression.brotli_compress, q) for q in options["brotli_qualities"]}
+            )
+        else:
+            self.stdout.write(self.style.WARNING("brotli not installed — skipping Brotli."))
+
+        results = {}
+        for rows in options["rows"]:
+            body = FastJSONRenderer().render(transaction_rows(rows))
+            for name, (compress, level) in codecs.items():
+                compressed = compress(body, level)
+                timings = benchmarking.time_call(
+                    lambda: compress(body, level), options["iterations"], options["warmup"]
+                )
+                stats = benchmarking.summarize(timings)
+                stats["bytes_in"] = len(body)
+                stats["bytes_out"] = len(compressed)
+                stats["ratio"] = round(len(body) / len(compressed), 2)
+                # Bytes saved per millisecond of CPU spent compressing.
+                stats["saved_per_ms"] = round(
+                    (len(body) - len(compressed)) / max(stats["mean_ms"], 1e-6)
+                )
+                results[f"{rows}rows_{name}"] = stats
+        return results
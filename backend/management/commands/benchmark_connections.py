@@ -0,0 +1,71 @@
+import copy
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from backend import benchmarking
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Measure per-request database connection overhead for each DB_POOL_MODE. "
+        "Every iteration mimics one request: the request_started/request_finished "
+        "connection housekeeping around a single `SELECT 1`."
+    )
+    name = "connections"
+    iterations = 200
+    warmup = 5
+
+    def add_benchmark_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def run(self, options):
+        base = copy.deepcopy(connections.settings[options["database"]])
+        base["OPTIONS"] = {k: v for k, v in base.get("OPTIONS", {}).items() if k != "pool"}
+
+        modes = {
+            "external": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+            "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+        }
+        if base["ENGINE"].endswith("postgresql") and self._has_native_pool():
+            modes["native"] = {
+                "CONN_MAX_AGE": 0,
+                "CONN_HEALTH_CHECKS": False,
+                "OPTIONS": {**base["OPTIONS"], "pool": {"min_size": 1, "max_size": 2}},
+            }
+
+        return {
+            mode: self._measure(f"bench_{mode}", {**base, **overrides}, options)
+            for mode, overrides in modes.items()
+        }
+
+    def _has_native_pool(self):
+        try:
+            import psycopg  # noqa: F401
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            self.stdout.write("psycopg 3 / psycopg_pool not installed — skipping native pool mode.")
+            return False
+        return True
+
+    def _measure(self, alias, settings_dict, options):
+        connections.settings[alias] = settings_dict
+        connections.configure_settings(connections.settings)
+        connection = connections[alias]
+
+        def request_cycle():
+            # Same housekeeping Django runs on request_started/request_finished.
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.close_if_unusable_or_obsolete()
+
+        try:
+            timings = benchmarking.time_call(request_cycle, options["iterations"], options["warmup"])
+        finally:
+            connection.close()
+            if hasattr(connection, "close_pool"):
+                connection.close_pool()
+            del connections[alias]
+            del connections.settings[alias]
+        return benchmarking.summarize(timings)
@@ -0,0 +1,73 @@
+import io
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from backend import benchmarking
+from backend.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def transaction_rows(rows):
+    """Rows shaped like TransactionSerializer output, with raw Decimal/datetime values."""
+    rng = random.Random(42)
+    now = timezone.now()
+    return [
+        {
+            "id": i,
+            "user": 1,
+            "type": "expense" if i % 5 else "income",
+            "category": rng.randrange(1, 12),
+            "category_name": "Groceries",
+            "budget": rng.choice([None, 1, 2, 3]),
+            "budget_name": rng.choice([None, "Groceries", "Bills"]),
+            "amount": Decimal(rng.randrange(100, 500000)) / 100,
+            "title": "Supermarket",
+            "date": now - timedelta(minutes=i),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with the orjson-backed "
+        "FastJSONRenderer/FastJSONParser on a transaction-list payload."
+    )
+    name = "renderers"
+    iterations = 20
+    warmup = 2
+
+    def add_benchmark_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+
+    def run(self, options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson not installed — fast classes fall back to stdlib."))
+
+        data = transaction_rows(options["rows"])
+        stdlib_bytes = JSONRenderer().render(data)
+        fast_bytes = FastJSONRenderer().render(data)
+        if JSONParser().parse(io.BytesIO(stdlib_bytes)) != FastJSONParser().parse(io.BytesIO(fast_bytes)):
+            raise CommandError("FastJSONRenderer output differs from JSONRenderer.")
+
+        cases = {
+            "render_stdlib": lambda: JSONRenderer().render(data),
+            "render_fast": lambda: FastJSONRenderer().render(data),
+            "parse_stdlib": lambda: JSONParser().parse(io.BytesIO(stdlib_bytes)),
+            "parse_fast": lambda: FastJSONParser().parse(io.BytesIO(stdlib_bytes)),
+        }
+        results = {
+            name: benchmarking.summarize(
+                benchmarking.time_call(fn, options["iterations"], options["warmup"])
+            )
+            for name, fn in cases.items()
+        }
+        self.stdout.write(f"Payload: {options['rows']} rows, {len(stdlib_bytes):,} bytes")
+        return results
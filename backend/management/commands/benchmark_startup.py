@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import CommandError
+
+from backend import benchmarking
+
+# Runs in a fresh interpreter: time django.setup() and count loaded modules.
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "modules": len(sys.modules),
+    "firebase_loaded": "firebase_admin" in sys.modules,
+}))
+"""
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Measure cold-start cost: time django.setup() in fresh interpreters, "
+        "as a new web worker or management command would pay it."
+    )
+    name = "startup"
+
+    def run(self, options):
+        runs = [self._probe() for _ in range(options["warmup"] + options["iterations"])]
+        runs = runs[options["warmup"]:]
+
+        # summarize() takes seconds
+        stats = benchmarking.summarize([run["ms"] / 1000 for run in runs])
+        stats["modules"] = runs[-1]["modules"]
+        if runs[-1]["firebase_loaded"]:
+            self.stdout.write(self.style.WARNING("firebase_admin is imported during django.setup()."))
+        return {"django_setup": stats}
+
+    def _probe(self):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+            cwd=os.getcwd(),
+        )
+        if result.returncode != 0:
+            raise CommandError(f"django.setup() failed in a fresh interpreter:\n{result.stderr}")
+        # Anything printed during setup precedes the probe's own line
+        return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,92 @@
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.throttling import UserRateThrottle
+
+from backend import benchmarking, throttling
+
+# A rate high enough that no check is ever denied during the run.
+BENCHMARK_RATES = {"user": "1000000/s", "anon": "1000000/s"}
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Measure per-request throttle overhead for DRF's cache-based throttle and "
+        "each token-bucket store, plus the bypass path. Database stores run "
+        "against a throwaway test database."
+    )
+    name = "throttle"
+    iterations = 5000
+    warmup = 100
+    test_database = True
+
+    def run(self, options):
+        # Swap in benchmark rates and put the class defaults back afterwards
+        classes = (UserRateThrottle, throttling.BucketUserRateThrottle)
+        saved = {cls: cls.__dict__.get("THROTTLE_RATES") for cls in classes}
+        try:
+            for cls in classes:
+                cls.THROTTLE_RATES = BENCHMARK_RATES
+            return self._run_cases(options)
+        finally:
+            for cls, rates in saved.items():
+                if rates is None:
+                    del cls.THROTTLE_RATES
+                else:
+                    cls.THROTTLE_RATES = rates
+            cache.clear()
+
+    def _run_cases(self, options):
+        request = self._request()
+        cases = {}
+
+        cases["drf_cache"] = self._measure(UserRateThrottle, request, options)
+        cache.clear()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = {
+                "memory": {"BACKEND": "backend.throttling.MemoryThrottleStore", "OPTIONS": {}},
+                "sqlite": {
+                    "BACKEND": "backend.throttling.SQLiteThrottleStore",
+                    "OPTIONS": {"path": str(Path(tmp) / "throttle.sqlite3")},
+                },
+                "database": {
+                    "BACKEND": "backend.throttling.DatabaseThrottleStore",
+                    "OPTIONS": {"using": "default"},
+                },
+            }
+            for name, config in stores.items():
+                with override_settings(THROTTLE_STORE=config):
+                    cases[f"bucket_{name}"] = self._measure(
+                        throttling.BucketUserRateThrottle, request, options
+                    )
+
+        with throttling.bypass_throttling():
+            cases["bucket_bypass"] = self._measure(
+                throttling.BucketUserRateThrottle, request, options
+            )
+        return cases
+
+    def _request(self):
+        user = SimpleNamespace(pk=1, is_authenticated=True)
+        django_request = APIRequestFactory().get("/api/transactions/")
+        force_authenticate(django_request, user=user)
+        request = Request(django_request)
+        request._user = user
+        return request
+
+    def _measure(self, throttle_class, request, options):
+        view = SimpleNamespace()
+
+        def check():
+            if not throttle_class().allow_request(request, view):
+                raise CommandError(f"{throttle_class.__name__} unexpectedly throttled.")
+
+        timings = benchmarking.time_call(check, options["iterations"], options["warmup"])
+        return benchmarking.summarize(timings)
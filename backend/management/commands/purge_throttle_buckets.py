@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.throttling import get_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete throttle buckets untouched for --older-than seconds from the configured "
+        "THROTTLE_STORE. A bucket idle for longer than its rate period is full again, so "
+        "dropping it changes no limit. Schedule it daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=86400,
+            help="Idle seconds; keep it at least the longest throttle period (default: a day).",
+        )
+
+    def handle(self, *args, **options):
+        purged = get_store().purge(time.time() - options["older_than"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} idle throttle buckets."))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        # The table used to be created at runtime by the throttle store, so
+        # create it only where it does not exist yet
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        "CREATE TABLE IF NOT EXISTS throttle_bucket ("
+                        "bucket_key VARCHAR(255) NOT NULL PRIMARY KEY, "
+                        "tokens DOUBLE PRECISION NOT NULL, "
+                        "updated_at DOUBLE PRECISION NOT NULL, "
+                        "allowed BOOLEAN NOT NULL)",
+                        "CREATE INDEX IF NOT EXISTS throttle_bucket_updated_at_idx "
+                        "ON throttle_bucket (updated_at)",
+                    ],
+                    reverse_sql=["DROP TABLE IF EXISTS throttle_bucket"],
+                ),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='ThrottleBucket',
+                    fields=[
+                        ('bucket_key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                        ('tokens', models.FloatField()),
+                        ('updated_at', models.FloatField(db_index=True)),
+                        ('allowed', models.BooleanField()),
+                    ],
+                    options={
+                        'db_table': 'throttle_bucket',
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import models
+
+
+class ThrottleBucket(models.Model):
+    """
+    One token bucket of backend.throttling.DatabaseThrottleStore. Rows are
+    written with raw UPSERTs by the store; the model only owns the schema.
+    """
+
+    bucket_key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    # Unix time of the last check; `purge_throttle_buckets` deletes by it
+    updated_at = models.FloatField(db_index=True)
+    allowed = models.BooleanField()
+
+    class Meta:
+        db_table = "throttle_bucket"
+
+    def __str__(self):
+        return self.bucket_key
+
+
+class PrimaryPin(models.Model):
+    """
+    Read-your-writes pin of backend.db_routers: the user's reads stay on the
+    primary until `pinned_until`. One row per user, overwritten on each write,
+    so it lives in the primary database and is shared by every worker.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    pinned_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user_id} until {self.pinned_until}"
@@ -10,6 +10,7 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 # Load .env
 load_dotenv()
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'cloudinary_storage',
 
     # local apps
+    'backend',
     'users',
     'category',
     'transactions',
@@ -57,14 +59,24 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # After WhiteNoise: static responses are served precompressed and skip it
+    'backend.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.db_routers.PrimaryPinMiddleware',
+    'users.devices.DeviceActivityMiddleware',
+    'backend.events.EventBatchMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Response compression (Brotli when installed, else gzip) for bodies above this size
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
 ROOT_URLCONF = 'backend.urls'
 
 # -----------------------------
@@ -94,24 +106,65 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # -----------------------------
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-if DEBUG:
-    # Local development (direct connection)
-    DATABASES = {
-        'default': dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            ssl_require=True
-        )
-    }
-else:
-    # Production (Render + Supabase pooler)
-    DATABASES = {
-        'default': dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=0,   
-            ssl_require=True
-        )
-    }
+# Connection handling, switchable per environment with DB_POOL_MODE:
+#   "external"   -> new connection per request (conn_max_age=0). Safe behind an
+#                   external transaction pooler (Supabase pooler / PgBouncer).
+#   "persistent" -> reuse connections for DB_CONN_MAX_AGE seconds, with a health
+#                   check before each request reuses one.
+#   "native"     -> Django's built-in psycopg 3 pool. Needs `psycopg[pool]`,
+#                   which requirements.txt does not pin (it ships psycopg2):
+#                   install it on the hosts that use this mode.
+DB_POOL_MODES = ("external", "persistent", "native")
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "persistent" if DEBUG else "external")
+
+if DB_POOL_MODE not in DB_POOL_MODES:
+    raise ImproperlyConfigured(
+        f"DB_POOL_MODE must be one of {', '.join(DB_POOL_MODES)}, not {DB_POOL_MODE!r}."
+    )
+
+if DB_POOL_MODE == "native":
+    try:
+        import psycopg  # noqa: F401  (Django only pools with psycopg 3)
+        import psycopg_pool
+    except ImportError:
+        raise ImproperlyConfigured("DB_POOL_MODE=native needs psycopg 3: pip install 'psycopg[pool]'.")
+
+
+def database_config(url):
+    """Build a DATABASES entry for `url` using the selected DB_POOL_MODE."""
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "600")) if DB_POOL_MODE == "persistent" else 0,
+        conn_health_checks=DB_POOL_MODE == "persistent",
+        ssl_require=not url.startswith("sqlite"),
+    )
+    if DB_POOL_MODE == "native":
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            "check": psycopg_pool.ConnectionPool.check_connection,
+        }
+    elif DB_POOL_MODE == "external":
+        # Transaction-mode poolers cannot keep server-side cursors across statements
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return config
+
+
+DATABASES = {
+    'default': database_config(DATABASE_URL) if DATABASE_URL else {},
+}
+
+# Optional read replica for lag-tolerant list/analytics reads (see backend.db_routers)
+REPLICA_DB_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+if DATABASE_REPLICA_URL:
+    DATABASES[REPLICA_DB_ALIAS] = database_config(DATABASE_REPLICA_URL)
+    DATABASES[REPLICA_DB_ALIAS]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["backend.db_routers.ReplicaRouter"]
 
 
 
@@ -140,16 +193,46 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+STATICFILES_DIRS = [BASE_DIR / "static"]
+
 MEDIA_URL = '/media/'  # Django still requires this even though Cloudinary handles media
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Media storage: "cloudinary" in production, "local" (MEDIA_ROOT) for tests and offline dev
+MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "cloudinary")
+MEDIA_STORAGE_BACKENDS = {
+    "cloudinary": "cloudinary_storage.storage.MediaCloudinaryStorage",
+    "local": "django.core.files.storage.FileSystemStorage",
+}
+
+# Staging store for raw uploads awaiting the image worker (backend.images).
+# Never the media storage: staging has to be a fast local write inside the
+# request. The default is a directory that the web and `process_images`
+# hosts must share (a mounted volume); IMAGE_STAGING_STORAGE can instead
+# name another Django storage backend, e.g. a dedicated bucket, configured
+# through that backend's own settings.
+IMAGE_STAGING_STORAGE = os.getenv("IMAGE_STAGING_STORAGE", "django.core.files.storage.FileSystemStorage")
+IMAGE_STAGING_ROOT = os.getenv("IMAGE_STAGING_ROOT", str(BASE_DIR / "media_staging"))
+
+if IMAGE_STAGING_STORAGE == MEDIA_STORAGE_BACKENDS["cloudinary"]:
+    raise ImproperlyConfigured("IMAGE_STAGING_STORAGE must not be the media storage backend.")
 
 # Cloudinary Storage Config
 STORAGES = {
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        "BACKEND": MEDIA_STORAGE_BACKENDS[MEDIA_STORAGE],
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
+    "image_staging": {
+        "BACKEND": IMAGE_STAGING_STORAGE,
+        "OPTIONS": (
+            {"location": IMAGE_STAGING_ROOT}
+            if IMAGE_STAGING_STORAGE == MEDIA_STORAGE_BACKENDS["local"]
+            else {}
+        ),
+    },
 }
 
 # Configure Cloudinary from environment
@@ -159,6 +242,25 @@ cloudinary.config(
     api_secret=os.getenv("CLOUDINARY_API_SECRET"),
 )
 
+# Image pipeline (backend.images): uploads are validated and staged in the
+# "image_staging" storage during the request, then re-encoded, thumbnailed
+# and pushed to the media storage by `manage.py process_images`. Images
+# still pending after IMAGE_STAGING_TIMEOUT seconds are marked failed.
+IMAGE_PIPELINE_MODELS = ["users.CustomUser", "budgets.Budget"]
+IMAGE_STAGING_PREFIX = os.getenv("IMAGE_STAGING_PREFIX", "staging/")
+IMAGE_STAGING_TIMEOUT = int(os.getenv("IMAGE_STAGING_TIMEOUT", 24 * 3600))
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 40_000_000))
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", 2048))
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", 256))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", 85))
+# Returned for an image that is still being processed
+IMAGE_PLACEHOLDER_URL = os.getenv("IMAGE_PLACEHOLDER_URL", STATIC_URL + "images/placeholder.svg")
+# Per-process memo of storage URLs (backend.images.media_url) and whether
+# Cloudinary URLs are signed
+IMAGE_URL_CACHE_SIZE = int(os.getenv("IMAGE_URL_CACHE_SIZE", 50_000))
+IMAGE_SIGN_URLS = os.getenv("IMAGE_SIGN_URLS") == "True"
+
 # -----------------------------
 # DJANGO DEFAULTS
 # -----------------------------
@@ -169,13 +271,23 @@ AUTH_USER_MODEL = 'users.CustomUser'
 # REST FRAMEWORK & JWT
 # -----------------------------
 REST_FRAMEWORK = {
+    # orjson-backed JSON (falls back to the stdlib renderer/parser if orjson is missing)
+    "DEFAULT_RENDERER_CLASSES": (
+        "backend.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "backend.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.LazyJWTAuthentication",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "backend.throttling.BucketUserRateThrottle",
+        "backend.throttling.BucketAnonRateThrottle",
+        "backend.throttling.BucketScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "100/m",
@@ -184,7 +296,104 @@ REST_FRAMEWORK = {
     },
 }
 
+# Token-bucket throttle store: "database" (shared by all workers), "sqlite" or "memory"
+THROTTLE_STORES = {
+    "database": {
+        "BACKEND": "backend.throttling.DatabaseThrottleStore",
+        "OPTIONS": {"using": "default"},
+    },
+    "sqlite": {
+        "BACKEND": "backend.throttling.SQLiteThrottleStore",
+        "OPTIONS": {"path": os.getenv("THROTTLE_SQLITE_PATH", str(BASE_DIR / "throttle.sqlite3"))},
+    },
+    "memory": {
+        "BACKEND": "backend.throttling.MemoryThrottleStore",
+        "OPTIONS": {},
+    },
+}
+THROTTLE_STORE = THROTTLE_STORES[os.getenv("THROTTLE_STORE", "database")]
+
+# Requests carrying this value in X-Throttle-Bypass skip throttling (internal jobs)
+THROTTLE_BYPASS_TOKEN = os.getenv("THROTTLE_BYPASS_TOKEN")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    # Tokens carry a hash of the password and stop working when it changes
+    "CHECK_REVOKE_TOKEN": True,
+}
+
+# Shared cache. LazyJWTAuthentication caches each user's is_active/password
+# state here, so every worker and host must see the same cache: a per-process
+# cache would only drop a deactivated user's entry in the process that saved
+# the user. "redis" keeps the per-request lookup off the database (needs the
+# `redis` package, which requirements.txt does not pin: install it on the
+# hosts that use it); "database" is a primary-key read on the cache table
+# (`manage.py createcachetable`, run by build.sh); "memory" is per-process
+# and only for local development.
+CACHE_BACKENDS = {
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    },
+    "database": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache_entries",
+    },
+    "memory": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
 }
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "database")
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}, not {CACHE_BACKEND!r}."
+    )
+CACHES = {"default": CACHE_BACKENDS[CACHE_BACKEND]}
+
+# Seconds a user's is_active/password state is cached by LazyJWTAuthentication.
+# Saves, deletes and CustomUser queryset update()/bulk_update() drop the entry
+# at once; a change that bypasses the ORM (raw SQL, another service writing
+# the table) still lets the user's tokens through for up to this long.
+AUTH_USER_STATE_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_STATE_CACHE_TIMEOUT", "60"))
+
+# -----------------------------
+# PUSH NOTIFICATIONS
+# -----------------------------
+# Delivery backend: "firebase" (FCM), "console" (print) or "memory" (tests,
+# benchmarks); see notifications.backends. Firebase starts on the first send.
+NOTIFICATIONS_BACKENDS = {
+    "firebase": "notifications.backends.FirebaseBackend",
+    "console": "notifications.backends.ConsoleBackend",
+    "memory": "notifications.backends.InMemoryBackend",
+}
+NOTIFICATIONS_BACKEND = NOTIFICATIONS_BACKENDS[os.getenv("NOTIFICATIONS_BACKEND", "firebase")]
+
+# Device registry (users.devices): last-active touches are flushed in one
+# UPDATE within this many seconds; `manage.py prune_devices` drops each
+# user's oldest devices beyond DEVICE_MAX_PER_USER and devices idle for
+# DEVICE_INACTIVE_DAYS (0 = keep idle devices: set it once clients send
+# X-Device-Token, until then devices are only seen when they re-register)
+DEVICE_TOUCH_FLUSH_SECONDS = int(os.getenv("DEVICE_TOUCH_FLUSH_SECONDS", "60"))
+DEVICE_TOUCH_BUFFER_SIZE = int(os.getenv("DEVICE_TOUCH_BUFFER_SIZE", "1000"))
+DEVICE_INACTIVE_DAYS = int(os.getenv("DEVICE_INACTIVE_DAYS", "0"))
+DEVICE_MAX_PER_USER = int(os.getenv("DEVICE_MAX_PER_USER", "10"))
+
+# Push digests (notifications.digest): a user's pushes are held until the
+# oldest is this many seconds old, then sent one per group; at most
+# NOTIFICATION_PUSH_RATE pushes per user, none during quiet hours ("22-7"
+# local hours in TIME_ZONE, empty to disable). Rows claimed by a dispatch run
+# that died are released after NOTIFICATION_PUSH_CLAIM_TIMEOUT seconds.
+NOTIFICATION_DIGEST_WINDOW = int(os.getenv("NOTIFICATION_DIGEST_WINDOW", "60"))
+NOTIFICATION_PUSH_RATE = os.getenv("NOTIFICATION_PUSH_RATE", "10/h")
+NOTIFICATION_QUIET_HOURS = os.getenv("NOTIFICATION_QUIET_HOURS", "")
+NOTIFICATION_PUSH_CLAIM_TIMEOUT = int(os.getenv("NOTIFICATION_PUSH_CLAIM_TIMEOUT", "600"))
+
+# A running broadcast (notifications.broadcast) whose worker has not finished
+# a chunk for this many seconds counts as dead and may be resumed; keep it
+# well above the time one chunk takes to insert and send
+NOTIFICATION_BROADCAST_STALE_AFTER = int(os.getenv("NOTIFICATION_BROADCAST_STALE_AFTER", "600"))
+
+# Admin changelists of large tables (backend.admin) count at most this many
+# rows; unfiltered Postgres tables above it use the planner's estimate
+ADMIN_COUNT_LIMIT = int(os.getenv("ADMIN_COUNT_LIMIT", "10000"))
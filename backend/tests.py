@@ -0,0 +1,181 @@
+import datetime
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from budgets.models import Budget
+
+from . import compression, db_routers, images
+from .models import PrimaryPin, ThrottleBucket
+from .throttling import DatabaseThrottleStore, MemoryThrottleStore, SQLiteThrottleStore
+
+
+class ChooseCodingTests(SimpleTestCase):
+    def choose(self, header):
+        return compression.CompressionMiddleware(lambda request: None)._choose_coding(header)
+
+    def test_highest_q_wins(self):
+        self.assertEqual(self.choose("br;q=0.1, gzip;q=0.9"), "gzip")
+        self.assertEqual(self.choose("gzip;q=0.5, br"), "br")
+
+    def test_server_preference_breaks_ties(self):
+        self.assertEqual(self.choose("gzip, br"), "br")
+        self.assertEqual(self.choose("*"), "br")
+
+    def test_unacceptable_codings(self):
+        self.assertIsNone(self.choose(""))
+        self.assertIsNone(self.choose("br;q=0, gzip;q=0"))
+        self.assertIsNone(self.choose("gzip;q=0.2, identity"))
+
+    def test_brotli_missing(self):
+        with mock.patch.object(compression, "brotli", None):
+            self.assertEqual(self.choose("br, gzip;q=0.1"), "gzip")
+            self.assertIsNone(self.choose("br"))
+
+
+class ThrottleStoreTests:
+    """Shared checks; subclasses provide `make_store`."""
+
+    def test_bucket_empties_and_refills(self):
+        store = self.make_store()
+        self.assertEqual(store.consume("user:1", 2, 1.0, 100.0), (True, 1.0))
+        self.assertEqual(store.consume("user:1", 2, 1.0, 100.0), (True, 0.0))
+        self.assertEqual(store.consume("user:1", 2, 1.0, 100.0)[0], False)
+        # Other keys have their own bucket
+        self.assertTrue(store.consume("user:2", 2, 1.0, 100.0)[0])
+        # One token back per second, never above capacity
+        self.assertEqual(store.consume("user:1", 2, 1.0, 101.5), (True, 0.5))
+        self.assertEqual(store.consume("user:1", 2, 1.0, 1000.0), (True, 1.0))
+
+    def test_purge_drops_idle_buckets(self):
+        store = self.make_store()
+        store.consume("old", 5, 1.0, 100.0)
+        store.consume("new", 5, 1.0, 200.0)
+        self.assertEqual(store.purge(150.0), 1)
+        # A purged bucket starts full again
+        self.assertEqual(store.consume("old", 5, 1.0, 300.0), (True, 4.0))
+
+
+class MemoryThrottleStoreTests(ThrottleStoreTests, SimpleTestCase):
+    def make_store(self):
+        return MemoryThrottleStore()
+
+
+class SQLiteThrottleStoreTests(ThrottleStoreTests, SimpleTestCase):
+    def make_store(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return SQLiteThrottleStore(Path(tmp.name) / "throttle.sqlite3")
+
+
+class DatabaseThrottleStoreTests(ThrottleStoreTests, TestCase):
+    def make_store(self):
+        return DatabaseThrottleStore()
+
+    def test_buckets_live_in_the_model_table(self):
+        self.make_store().consume("user:1", 5, 1.0, 100.0)
+        bucket = ThrottleBucket.objects.get()
+        self.assertEqual((bucket.bucket_key, bucket.tokens), ("user:1", 4.0))
+
+
+@override_settings(REPLICA_STICKY_SECONDS=10)
+class PrimaryPinTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="pin@example.com", password="x")
+
+    def test_pin_expires(self):
+        self.assertFalse(db_routers.is_pinned_to_primary(self.user.pk))
+        db_routers.pin_to_primary(self.user.pk)
+        db_routers.pin_to_primary(self.user.pk)
+        self.assertTrue(db_routers.is_pinned_to_primary(self.user.pk))
+        self.assertEqual(PrimaryPin.objects.count(), 1)
+
+        with override_settings(REPLICA_STICKY_SECONDS=-1):
+            db_routers.pin_to_primary(self.user.pk)
+        self.assertFalse(db_routers.is_pinned_to_primary(self.user.pk))
+
+    def handle(self, method, status):
+        middleware = db_routers.PrimaryPinMiddleware(lambda request: HttpResponse(status=status))
+        request = getattr(RequestFactory(), method)("/api/transactions/")
+        request.user = self.user
+        with mock.patch.object(db_routers, "replica_alias", return_value="replica"):
+            middleware(request)
+        return db_routers.is_pinned_to_primary(self.user.pk)
+
+    def test_successful_writes_pin_the_user(self):
+        self.assertFalse(self.handle("get", 200))
+        self.assertFalse(self.handle("post", 400))
+        self.assertTrue(self.handle("post", 201))
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        locations = {}
+        for alias in ("default", "image_staging"):
+            tmp = tempfile.TemporaryDirectory()
+            self.addCleanup(tmp.cleanup)
+            locations[alias] = {
+                "BACKEND": "django.core.files.storage.FileSystemStorage", "OPTIONS": {"location": tmp.name}
+            }
+        override = override_settings(STORAGES=locations, IMAGE_STAGING_TIMEOUT=3600)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user = get_user_model().objects.create_user(email="images@example.com", password="x")
+        today = datetime.date.today()
+        self.budget = Budget.objects.create(
+            user=user, name="Trip", limit=100, start_date=today, end_date=today
+        )
+
+    def stage(self, staged_at=None):
+        buffer = io.BytesIO()
+        Image.new("RGB", (600, 400), "teal").save(buffer, "PNG")
+        staged = images.stage(SimpleUploadedFile("photo.png", buffer.getvalue()))
+        Budget.objects.filter(pk=self.budget.pk).update(
+            image_status="pending", image_staged=staged, image_staged_at=staged_at or timezone.now()
+        )
+        return staged
+
+    def test_staged_upload_is_published(self):
+        staged = self.stage()
+        self.assertTrue(staged.startswith("staging/"))
+        self.assertFalse(storages["default"].exists(staged))
+
+        self.assertEqual(images.process_pending(), {"ready": 1})
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.image_status, "ready")
+        self.assertTrue(self.budget.image_thumbnail.name)
+        self.assertFalse(images.staging_storage().exists(staged))
+
+    def test_missing_staged_file_fails(self):
+        images.staging_storage().delete(self.stage())
+
+        with self.assertLogs("backend.images", "ERROR"):
+            self.assertEqual(images.process_pending(), {"failed": 1})
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.image_status, self.budget.image_staged), ("failed", ""))
+
+    def test_unreadable_storage_retries_until_timeout(self):
+        staged = self.stage()
+        storage_down = mock.patch.object(images.staging_storage(), "open", side_effect=OSError("timeout"))
+        with storage_down, self.assertLogs("backend.images", "WARNING"):
+            self.assertEqual(images.process_pending(), {"retry": 1})
+            self.budget.refresh_from_db()
+            self.assertEqual(self.budget.image_status, "pending")
+
+            Budget.objects.filter(pk=self.budget.pk).update(
+                image_staged_at=timezone.now() - datetime.timedelta(hours=2)
+            )
+            self.assertEqual(images.process_pending(), {"failed": 1})
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.image_status, "failed")
+        self.assertFalse(images.staging_storage().exists(staged))
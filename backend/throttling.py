@@ -0,0 +1,275 @@
+"""
+Token-bucket throttles backed by a shared, atomic store.
+
+DRF's built-in throttles keep request histories in the default cache, which
+is per-process local memory here, so limits multiply with the worker count
+and reset on every restart. The throttles below keep one bucket row per
+client key and update it with a single atomic UPSERT, so every check is one
+round trip to the store regardless of how many workers share it.
+
+Stores are configured through ``settings.THROTTLE_STORE``::
+
+    THROTTLE_STORE = {
+        "BACKEND": "backend.throttling.DatabaseThrottleStore",  # shared DB
+        "OPTIONS": {},
+    }
+
+``SQLiteThrottleStore`` (a local file shared by the workers on one host) and
+``MemoryThrottleStore`` (in-process, for tests and local development) are
+drop-in alternatives. The database store's table is the ``ThrottleBucket``
+model (created by ``migrate``); schedule ``manage.py purge_throttle_buckets``
+to drop buckets of clients that went away.
+"""
+
+import contextlib
+import contextvars
+import hmac
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+TABLE_NAME = "throttle_bucket"
+BYPASS_HEADER = "HTTP_X_THROTTLE_BYPASS"
+
+_bypass = contextvars.ContextVar("throttle_bypass", default=False)
+
+
+@contextlib.contextmanager
+def bypass_throttling():
+    """Disable throttling for the current thread/task, e.g. in internal batch jobs."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_bypassed(request):
+    """Cheap check that runs before any store round trip."""
+    if _bypass.get():
+        return True
+    secret = getattr(settings, "THROTTLE_BYPASS_TOKEN", None)
+    provided = request.META.get(BYPASS_HEADER)
+    return bool(secret and provided and hmac.compare_digest(provided, secret))
+
+
+# -------------------------
+# Stores
+# -------------------------
+class BaseThrottleStore:
+    """
+    A store consumes one token from the bucket identified by `key` and
+    reports whether the request is allowed plus the tokens left.
+    Implementations must do this atomically in a single round trip.
+    """
+
+    def consume(self, key, capacity, refill_rate, now):
+        """Return `(allowed, tokens_left)`."""
+        raise NotImplementedError
+
+    def purge(self, older_than):
+        """Delete buckets untouched since `older_than` (unix time); returns how many."""
+        raise NotImplementedError
+
+
+class MemoryThrottleStore(BaseThrottleStore):
+    """In-process store for tests and local development."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, now):
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+    def purge(self, older_than):
+        with self._lock:
+            stale = [k for k, (_, ts) in self._buckets.items() if ts < older_than]
+            for key in stale:
+                del self._buckets[key]
+            return len(stale)
+
+
+class _SQLThrottleStore(BaseThrottleStore):
+    """Shared UPSERT logic for SQL stores; subclasses provide the cursor."""
+
+    least = "MIN"
+    placeholder = "?"
+
+    def _cursor(self):
+        raise NotImplementedError
+
+    def _consume_sql(self):
+        p = self.placeholder
+        refill = f"{self.least}({p}, tokens + ({p} - updated_at) * {p})"
+        return (
+            f"INSERT INTO {TABLE_NAME} (bucket_key, tokens, updated_at, allowed) "
+            f"VALUES ({p}, {p}, {p}, {p}) "
+            "ON CONFLICT (bucket_key) DO UPDATE SET "
+            f"allowed = ({refill} >= 1), "
+            f"tokens = {refill} - CASE WHEN {refill} >= 1 THEN 1 ELSE 0 END, "
+            "updated_at = excluded.updated_at "
+            "RETURNING allowed, tokens"
+        )
+
+    def _consume_params(self, key, capacity, refill_rate, now):
+        refill = [capacity, now, refill_rate]
+        return [key, capacity - 1, now, capacity >= 1, *refill, *refill, *refill]
+
+    def consume(self, key, capacity, refill_rate, now):
+        with self._cursor() as cursor:
+            cursor.execute(
+                self._consume_sql(), self._consume_params(key, capacity, refill_rate, now)
+            )
+            allowed, tokens = cursor.fetchone()
+        return bool(allowed), tokens
+
+    def purge(self, older_than):
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {TABLE_NAME} WHERE updated_at < {self.placeholder}",
+                [older_than],
+            )
+            return cursor.rowcount
+
+
+class SQLiteThrottleStore(_SQLThrottleStore):
+    """
+    File-backed store shared by every worker process on one host.
+    SQLite serializes writers, so the UPSERT is atomic across processes.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _create_table_sql(self):
+        return (
+            f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ("
+            "bucket_key VARCHAR(255) PRIMARY KEY, "
+            "tokens DOUBLE PRECISION NOT NULL, "
+            "updated_at DOUBLE PRECISION NOT NULL, "
+            "allowed BOOLEAN NOT NULL)"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(self._create_table_sql())
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {TABLE_NAME}_updated_at_idx ON {TABLE_NAME} (updated_at)"
+            )
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _cursor(self):
+        cursor = self._connection().cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+
+class DatabaseThrottleStore(_SQLThrottleStore):
+    """
+    Store that lives in a Django database (PostgreSQL or SQLite), shared by
+    every worker and host using that database. Its table is the
+    backend.ThrottleBucket model.
+    """
+
+    placeholder = "%s"
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    @property
+    def least(self):
+        return "LEAST" if connections[self.using].vendor == "postgresql" else "MIN"
+
+    def _cursor(self):
+        return connections[self.using].cursor()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide store configured by `settings.THROTTLE_STORE`."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = getattr(settings, "THROTTLE_STORE", {})
+                backend = config.get("BACKEND", "backend.throttling.MemoryThrottleStore")
+                _store = import_string(backend)(**config.get("OPTIONS", {}))
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    global _store
+    if setting == "THROTTLE_STORE":
+        _store = None
+
+
+# -------------------------
+# Throttles
+# -------------------------
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket with `num_requests` capacity refilled evenly over `duration`.
+    Uses the same rate strings and cache keys as DRF's throttles.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None or is_bypassed(request):
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.refill_rate = self.num_requests / self.duration
+        allowed, self.tokens = get_store().consume(
+            self.key, self.num_requests, self.refill_rate, time.time()
+        )
+        return allowed
+
+    def wait(self):
+        return max(0.0, (1 - self.tokens) / self.refill_rate)
+
+
+class BucketUserRateThrottle(UserRateThrottle, TokenBucketThrottle):
+    pass
+
+
+class BucketAnonRateThrottle(AnonRateThrottle, TokenBucketThrottle):
+    pass
+
+
+class BucketScopedRateThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    pass
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from django.db.models import Sum
-from .models import Budget
+from backend.admin import LargeTableAdminMixin
+from .models import Budget, BudgetSnapshot
 
 
 @admin.register(Budget)
-class BudgetAdmin(admin.ModelAdmin):
+class BudgetAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "user",
@@ -14,29 +14,40 @@ class BudgetAdmin(admin.ModelAdmin):
         "remaining_display",  # ✅ custom field
         "start_date",
         "end_date",
+        "period",
         "created_at",
     )
-    list_filter = ("user", "start_date", "end_date")
+    list_select_related = ("user",)
+    # No per-user filter (one option per user); search by email instead
+    list_filter = ("period", "start_date", "end_date")
     search_fields = ("name", "user__email")
     ordering = ("-created_at",)
+    date_hierarchy = "start_date"
+    autocomplete_fields = ("user",)
 
     # -----------------
     # Custom columns
     # -----------------
     def spent_display(self, obj):
-        from transactions.models import Transaction  # import inside to avoid circular import
-        total = (
-            Transaction.objects.filter(
-                budget=obj,
-                type="expense",
-                date__gte=obj.start_date,
-                date__lte=obj.end_date,
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0
-        )
-        return total
+        return obj.spent
     spent_display.short_description = "Spent"
 
     def remaining_display(self, obj):
-        return obj.limit - self.spent_display(obj)
+        return obj.limit - obj.spent
     remaining_display.short_description = "Remaining"
+
+
+@admin.register(BudgetSnapshot)
+class BudgetSnapshotAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "budget", "start_date", "end_date", "limit", "spent", "overspent")
+    list_select_related = ("budget",)
+    search_fields = ("budget__name", "budget__user__email")
+    date_hierarchy = "start_date"
+    ordering = ("-start_date",)
+
+    # Snapshots are immutable history
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,69 @@
+import datetime
+
+import cloudinary
+
+from backend import benchmarking
+from backend.images import media_url
+from budgets.models import Budget
+from budgets.serializers import BudgetSerializer
+from users.models import CustomUser
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Serialize budget lists without images, with images and a cold URL cache, "
+        "and with images and a warm URL cache, in a throwaway test database."
+    )
+    name = "budget_images"
+    test_database = True
+
+    def add_benchmark_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000)
+
+    def run(self, options):
+        # Cloudinary builds URLs locally; it only needs a cloud name to do so
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name="benchmark")
+        return self._run_cases(options)
+
+    def _run_cases(self, options):
+        today = datetime.date.today()
+        plain, pictured = (
+            CustomUser.objects.create_user(email=f"{name}@benchmark.local", password="x")
+            for name in ("plain", "pictured")
+        )
+        for user, with_image in ((plain, False), (pictured, True)):
+            Budget.objects.bulk_create(
+                [
+                    Budget(
+                        user=user,
+                        name=f"Budget {i}",
+                        limit=100,
+                        start_date=today,
+                        end_date=today,
+                        image=f"budget_images/{user.pk}-{i}.jpg" if with_image else None,
+                        image_thumbnail=f"budget_images/thumbnails/{user.pk}-{i}.jpg" if with_image else None,
+                        image_status="ready" if with_image else "none",
+                    )
+                    for i in range(options["rows"])
+                ]
+            )
+
+        def serialize(user):
+            return BudgetSerializer(Budget.objects.filter(user=user), many=True).data
+
+        def cold(user):
+            media_url.cache_clear()
+            return serialize(user)
+
+        cases = {
+            "without_images": lambda: serialize(plain),
+            "images_uncached": lambda: cold(pictured),
+            "images_cached": lambda: serialize(pictured),
+        }
+        return {
+            name: benchmarking.summarize(
+                benchmarking.time_call(fn, options["iterations"], options["warmup"])
+            )
+            for name, fn in cases.items()
+        }
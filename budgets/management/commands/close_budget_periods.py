@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from budgets.periods import close_ended_periods
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot every recurring budget whose period has ended and roll it over "
+        "to the next period. Safe to re-run; schedule it daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--today",
+            help="Close periods that ended before this ISO date (default: today).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        today = None
+        if options["today"]:
+            today = parse_date(options["today"])
+            if today is None:
+                raise CommandError("--today must be an ISO 8601 date.")
+
+        started = time.perf_counter()
+        processed, written = close_ended_periods(today=today, batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled over {processed} budgets, wrote {written} snapshots in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from budgets.thresholds import evaluate_alerts
+
+
+class Command(BaseCommand):
+    help = (
+        "Send threshold alerts for every budget whose spending changed since the "
+        "last run. Schedule it every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-push",
+            action="store_true",
+            help="Store the notifications without sending push messages.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        evaluated, created = evaluate_alerts(
+            batch_size=options["batch_size"], push=not options["no_push"]
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Evaluated {evaluated} budgets, created {created} alerts in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('limit', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('spent', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('overspent', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-start_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='period',
+            field=models.CharField(choices=[('none', 'One-off'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], default='none', max_length=7),
+        ),
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['period', 'end_date'], name='budgets_bud_period_156f45_idx'),
+        ),
+        migrations.AddField(
+            model_name='budgetsnapshot',
+            name='budget',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='budgets.budget'),
+        ),
+        migrations.AddConstraint(
+            model_name='budgetsnapshot',
+            constraint=models.UniqueConstraint(fields=('budget', 'start_date'), name='unique_budget_snapshot_period'),
+        ),
+    ]
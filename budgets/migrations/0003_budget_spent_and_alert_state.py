@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:12
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_spent(apps, schema_editor):
+    """Seed running spent, and mark thresholds already passed as notified."""
+    Budget = apps.get_model("budgets", "Budget")
+    Transaction = apps.get_model("transactions", "Transaction")
+
+    totals = (
+        Transaction.objects.filter(
+            budget=OuterRef("pk"),
+            type="expense",
+            date__date__gte=OuterRef("start_date"),
+            date__date__lte=OuterRef("end_date"),
+        )
+        .order_by()
+        .values("budget")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    Budget.objects.update(spent=Coalesce(Subquery(totals), Value(Decimal("0.00"))))
+
+    # Budgets were notified on every expense so far; don't alert them again.
+    over, warned = [], []
+    for pk, spent, limit in Budget.objects.filter(limit__gt=0).values_list("pk", "spent", "limit"):
+        if spent > limit:
+            over.append(pk)
+        elif spent * 100 >= limit * 80:
+            warned.append(pk)
+    Budget.objects.filter(pk__in=over).update(last_crossed=100)
+    Budget.objects.filter(pk__in=warned).update(last_crossed=80)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0002_budget_periods_and_snapshots'),
+        ('transactions', '0004_recurring_transactions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='last_crossed',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='spent',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_spent, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:13
+
+import budgets.thresholds
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0003_budget_spent_and_alert_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='alert_thresholds',
+            field=models.JSONField(blank=True, default=budgets.thresholds.default_thresholds),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='alerts_pending',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(condition=models.Q(('alerts_pending', True)), fields=['id'], name='budget_alerts_pending_idx'),
+        ),
+    ]
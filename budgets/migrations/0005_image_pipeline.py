@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    Budget = apps.get_model("budgets", "Budget")
+    Budget.objects.exclude(image=None).exclude(image="").update(image_status="ready")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0004_budget_alert_thresholds'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='image_staged',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='budget_images/thumbnails/'),
+        ),
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(condition=models.Q(('image_status', 'pending')), fields=['id'], name='budget_image_pending_idx'),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:45
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce, ExtractDay
+
+
+def backfill_anchor(apps, schema_editor):
+    # The first recorded period shows the day the budget started on
+    Budget = apps.get_model("budgets", "Budget")
+    BudgetSnapshot = apps.get_model("budgets", "BudgetSnapshot")
+    first_start = (
+        BudgetSnapshot.objects.filter(budget=OuterRef("pk")).order_by("start_date").values("start_date")[:1]
+    )
+    Budget.objects.update(
+        period_anchor=Coalesce(ExtractDay(Subquery(first_start)), ExtractDay("start_date"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0005_image_pipeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='period_anchor',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_anchor, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:53
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def start_pending_clocks(apps, schema_editor):
+    # Images already pending get the full timeout from now
+    Budget = apps.get_model("budgets", "Budget")
+    Budget.objects.filter(image_status="pending").update(image_staged_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0006_budget_period_anchor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='image_staged_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(start_pending_clocks, migrations.RunPython.noop),
+    ]
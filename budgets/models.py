@@ -1,7 +1,20 @@
+import copy
+
 from django.db import models
 from django.conf import settings
 
+from backend.images import IMAGE_STATUS_CHOICES
+
+from .thresholds import default_thresholds
+
 class Budget(models.Model):
+    PERIOD_CHOICES = (
+        ("none", "One-off"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("yearly", "Yearly"),
+    )
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.CASCADE, 
@@ -9,11 +22,120 @@ class Budget(models.Model):
     )
     name = models.CharField(max_length=100)
     image = models.ImageField(upload_to="budget_images/", blank=True, null=True)
+    # Filled in by the image pipeline (backend.images); `image_staged` names
+    # the raw upload awaiting processing (since `image_staged_at`) while
+    # `image_status` is "pending"
+    image_thumbnail = models.ImageField(upload_to="budget_images/thumbnails/", null=True, blank=True, editable=False)
+    image_status = models.CharField(max_length=7, choices=IMAGE_STATUS_CHOICES, default="none", editable=False)
+    image_staged = models.CharField(max_length=100, blank=True, default="", editable=False)
+    image_staged_at = models.DateTimeField(null=True, blank=True, editable=False)
     limit = models.DecimalField(max_digits=12, decimal_places=2)
     start_date = models.DateField()
     end_date = models.DateField()
+    # Recurring budgets roll over to the next period once end_date has passed
+    period = models.CharField(max_length=7, choices=PERIOD_CHOICES, default="none")
+    # Day of month recurring periods start on; kept when a short month clamps
+    # start_date (a budget starting on the 31st starts Feb 28, then Mar 31)
+    period_anchor = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    # Alert when spent reaches these percents of the limit, e.g. [50, 75, 100, 150]
+    alert_thresholds = models.JSONField(default=default_thresholds, blank=True)
+    # Running expense total for the current period, the highest alert
+    # threshold (percent) already notified in it and whether spent changed
+    # since alerts were last evaluated; see budgets.thresholds
+    spent = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    last_crossed = models.PositiveSmallIntegerField(default=0, editable=False)
+    alerts_pending = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["period", "end_date"]),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(alerts_pending=True),
+                name="budget_alerts_pending_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(image_status="pending"),
+                name="budget_image_pending_idx",
+            ),
+        ]
+
+    # A change to any of these may cross a threshold without new spending
+    ALERT_FIELDS = ("limit", "alert_thresholds", "period", "start_date", "end_date")
+
     def __str__(self):
         return f"{self.name} - {self.limit}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_start_date = instance.__dict__.get("start_date", models.DEFERRED)
+        # Compared by transactions.signals.reindex_renamed
+        instance._loaded_name = instance.__dict__.get("name", models.DEFERRED)
+        instance._loaded_alert_values = instance._alert_values()
+        return instance
+
+    def _alert_values(self):
+        # Copied, so editing alert_thresholds in place still counts as a change
+        return {field: copy.copy(self.__dict__.get(field, models.DEFERRED)) for field in self.ALERT_FIELDS}
+
+    def save(self, *args, **kwargs):
+        changed = []
+        loaded_alert_values = getattr(self, "_loaded_alert_values", None)
+        if loaded_alert_values is None or any(
+            value is models.DEFERRED or value != getattr(self, field)
+            for field, value in loaded_alert_values.items()
+        ):
+            self.alerts_pending = True
+            changed.append("alerts_pending")
+        # A start date set by hand re-anchors the period; rollovers don't go through save()
+        loaded = getattr(self, "_loaded_start_date", None)
+        if self.period_anchor is None or (loaded is not models.DEFERRED and self.start_date != loaded):
+            self.period_anchor = self.start_date.day
+            changed.append("period_anchor")
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *changed}
+        super().save(*args, **kwargs)
+        self._loaded_start_date = self.start_date
+        self._loaded_name = self.name
+        self._loaded_alert_values = self._alert_values()
+
+
+class BudgetSnapshot(models.Model):
+    """
+    Immutable record of a closed budget period, written by
+    `budgets.periods.close_ended_periods`. History and trend screens read
+    these instead of re-aggregating old transactions.
+    """
+
+    budget = models.ForeignKey(
+        Budget,
+        on_delete=models.CASCADE,
+        related_name="snapshots"
+    )
+    start_date = models.DateField()
+    end_date = models.DateField()
+    limit = models.DecimalField(max_digits=12, decimal_places=2)
+    spent = models.DecimalField(max_digits=12, decimal_places=2)
+    overspent = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-start_date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["budget", "start_date"], name="unique_budget_snapshot_period"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.budget.name}: {self.start_date} - {self.end_date}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Budget snapshots are immutable.")
+        super().save(*args, **kwargs)
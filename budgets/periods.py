@@ -0,0 +1,122 @@
+"""
+Rollover of recurring budgets.
+
+`close_ended_periods` finds every recurring budget whose period has ended
+and, per chunk, runs a fixed number of statements: one aggregate for the
+spent amount of every budget's period, one lookup of already recorded
+periods, one bulk insert of the new snapshots and one
+set-based UPDATE moving start/end dates on to the next period. Budgets more
+than one period behind are caught up by repeating the pass on the chunk, and
+a final UPDATE recomputes each rolled budget's running spent.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from transactions.recurrence import add_months
+from transactions.utils import update_from_values
+
+from .thresholds import refresh_spent
+
+ZERO = Decimal("0.00")
+
+# Expenses inside a budget's own start/end window (both days inclusive),
+# for use in Budget annotations.
+PERIOD_EXPENSES = Q(
+    transactions__type="expense",
+    transactions__date__date__gte=F("start_date"),
+    transactions__date__date__lte=F("end_date"),
+)
+
+
+def next_period(budget):
+    """Return `(start_date, end_date)` of the period that follows `budget`'s current one."""
+    start = budget.end_date + timedelta(days=1)
+    # Anchor on the original start day, like recurring transactions, so a
+    # period clamped to a short month does not drift (Jan 31, Feb 28, Mar 31, ...)
+    anchor = budget.period_anchor or budget.start_date.day
+    if budget.period == "weekly":
+        end = start + timedelta(weeks=1)
+    elif budget.period == "monthly":
+        end = add_months(start, 1, anchor)
+    elif budget.period == "yearly":
+        end = add_months(start, 12, anchor)
+    else:
+        raise ValueError(f"Budget period '{budget.period}' does not recur.")
+    return start, end - timedelta(days=1)
+
+
+def close_ended_periods(today=None, batch_size=500):
+    """
+    Snapshot and roll over every recurring budget whose period ended before
+    `today`, then start each rolled budget's running spent and alert state
+    afresh. Returns `(budgets_processed, snapshots_written)`.
+    """
+    from .models import Budget, BudgetSnapshot
+
+    today = today or timezone.localdate()
+    processed = written = 0
+    last_pk = 0
+
+    while True:
+        with transaction.atomic():
+            budgets = list(
+                Budget.objects.select_for_update(skip_locked=True)
+                .exclude(period="none")
+                .filter(end_date__lt=today, pk__gt=last_pk)
+                .order_by("pk")[:batch_size]
+            )
+            if not budgets:
+                break
+            last_pk = budgets[-1].pk
+            processed += len(budgets)
+            rolled = [b.pk for b in budgets]
+
+            while budgets:
+                # Not "spent": that is the running total field on Budget
+                period_spent = dict(
+                    Budget.objects.filter(pk__in=[b.pk for b in budgets])
+                    .annotate(period_spent=Sum("transactions__amount", filter=PERIOD_EXPENSES))
+                    .values_list("pk", "period_spent")
+                )
+                snapshots = []
+                for budget in budgets:
+                    total = period_spent.get(budget.pk) or ZERO
+                    snapshots.append(
+                        BudgetSnapshot(
+                            budget=budget,
+                            start_date=budget.start_date,
+                            end_date=budget.end_date,
+                            limit=budget.limit,
+                            spent=total,
+                            overspent=max(total - budget.limit, ZERO),
+                        )
+                    )
+                    budget.start_date, budget.end_date = next_period(budget)
+                # Count only new snapshots: a re-run after a partial failure
+                # meets periods that were already recorded
+                recorded = set(
+                    BudgetSnapshot.objects.filter(
+                        budget_id__in=[s.budget_id for s in snapshots],
+                        start_date__in={s.start_date for s in snapshots},
+                    ).values_list("budget_id", "start_date")
+                )
+                new = [s for s in snapshots if (s.budget_id, s.start_date) not in recorded]
+                BudgetSnapshot.objects.bulk_create(new, ignore_conflicts=True)
+                written += len(new)
+
+                update_from_values(
+                    Budget,
+                    [(b.pk, b.start_date, b.end_date) for b in budgets],
+                    [("start_date", "{value}"), ("end_date", "{value}")],
+                )
+                budgets = [b for b in budgets if b.end_date < today]
+
+            # Expenses already posted inside the new periods count towards them.
+            refresh_spent(Budget.objects.filter(pk__in=rolled), reset_alerts=True)
+
+    return processed, written
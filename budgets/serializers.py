@@ -1,10 +1,12 @@
 from rest_framework import serializers
-from django.db.models import Sum
-from .models import Budget
-from transactions.models import Transaction
+
+from backend.images import ProcessedImageField
+from .models import Budget, BudgetSnapshot
+from .thresholds import MAX_THRESHOLD_PERCENT, MAX_THRESHOLDS, refresh_spent
 
 
 class BudgetSerializer(serializers.ModelSerializer):
+    image = ProcessedImageField()
     spent = serializers.SerializerMethodField()
     remaining = serializers.SerializerMethodField()
 
@@ -17,6 +19,8 @@ class BudgetSerializer(serializers.ModelSerializer):
             "limit",
             "start_date",
             "end_date",
+            "period",
+            "alert_thresholds",
             "created_at",
             "updated_at",
             "spent",       # ✅ calculated
@@ -28,16 +32,8 @@ class BudgetSerializer(serializers.ModelSerializer):
     # -------------------
     def get_spent(self, obj):
         """Total expenses linked to this budget within its active period."""
-        total_spent = (
-            Transaction.objects.filter(
-                budget=obj,
-                type="expense",
-                date__gte=obj.start_date,
-                date__lte=obj.end_date,
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0
-        )
-        return round(total_spent, 2)
+        # Maintained incrementally by budgets.thresholds; no aggregate per row.
+        return round(obj.spent, 2)
 
     def get_remaining(self, obj):
         """Remaining balance = limit - spent (never negative)."""
@@ -45,6 +41,24 @@ class BudgetSerializer(serializers.ModelSerializer):
         remaining = obj.limit - spent
         return round(remaining, 2) if remaining > 0 else 0.00
 
+    # -------------------
+    # Validation
+    # -------------------
+    def validate_alert_thresholds(self, value):
+        """A short list of whole percents, stored sorted and without duplicates."""
+        if not isinstance(value, list) or len(value) > MAX_THRESHOLDS:
+            raise serializers.ValidationError(
+                f"Provide a list of at most {MAX_THRESHOLDS} percentages."
+            )
+        if any(
+            not isinstance(p, int) or isinstance(p, bool) or not 0 < p <= MAX_THRESHOLD_PERCENT
+            for p in value
+        ):
+            raise serializers.ValidationError(
+                f"Each threshold must be a whole percent between 1 and {MAX_THRESHOLD_PERCENT}."
+            )
+        return sorted(set(value))
+
     # -------------------
     # Attach user on create
     # -------------------
@@ -52,3 +66,34 @@ class BudgetSerializer(serializers.ModelSerializer):
         user = self.context["request"].user
         validated_data["user"] = user
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        """A moved period starts its running spent and alert state afresh."""
+        period_changed = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in ("start_date", "end_date")
+        )
+        instance = super().update(instance, validated_data)
+        if period_changed:
+            refresh_spent(Budget.objects.filter(pk=instance.pk), reset_alerts=True)
+            instance.refresh_from_db(fields=["spent", "last_crossed"])
+        return instance
+
+
+class BudgetSnapshotSerializer(serializers.ModelSerializer):
+    budget_name = serializers.CharField(source="budget.name", read_only=True)
+
+    class Meta:
+        model = BudgetSnapshot
+        fields = [
+            "id",
+            "budget",
+            "budget_name",
+            "start_date",
+            "end_date",
+            "limit",
+            "spent",
+            "overspent",
+            "created_at",
+        ]
+        read_only_fields = fields
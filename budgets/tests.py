@@ -1,3 +1,228 @@
-from django.test import TestCase
+import datetime
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+
+from notifications.models import Notification
+from transactions.models import Transaction
+
+from .models import Budget, BudgetSnapshot
+from .periods import close_ended_periods
+from .thresholds import evaluate_alerts, record_spending, refresh_spent
+
+
+def aware(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time(12)))
+
+
+class ClosePeriodsTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="periods@example.com", password="x")
+        self.user = get_user_model().objects.get(pk=user.pk)
+
+    def test_closes_ended_period(self):
+        budget = Budget.objects.create(
+            user=self.user,
+            name="Groceries",
+            limit=Decimal("100.00"),
+            start_date=datetime.date(2026, 3, 1),
+            end_date=datetime.date(2026, 3, 31),
+            period="monthly",
+        )
+        Transaction.objects.create(
+            user=self.user, type="expense", amount=Decimal("120.00"), title="Shop",
+            budget=budget, date=aware(datetime.date(2026, 3, 10)),
+        )
+        Transaction.objects.create(
+            user=self.user, type="expense", amount=Decimal("5.00"), title="Snack",
+            budget=budget, date=aware(datetime.date(2026, 4, 2)),
+        )
+
+        processed, written = close_ended_periods(today=datetime.date(2026, 4, 5))
+
+        self.assertEqual((processed, written), (1, 1))
+        snapshot = BudgetSnapshot.objects.get(budget=budget)
+        self.assertEqual(snapshot.start_date, datetime.date(2026, 3, 1))
+        self.assertEqual(snapshot.end_date, datetime.date(2026, 3, 31))
+        self.assertEqual(snapshot.spent, Decimal("120.00"))
+        self.assertEqual(snapshot.overspent, Decimal("20.00"))
+
+        budget.refresh_from_db()
+        self.assertEqual(budget.start_date, datetime.date(2026, 4, 1))
+        self.assertEqual(budget.end_date, datetime.date(2026, 4, 30))
+        # Only the expense inside the new period counts towards it
+        self.assertEqual(budget.spent, Decimal("5.00"))
+
+    def test_one_off_budgets_are_left_alone(self):
+        Budget.objects.create(
+            user=self.user, name="Trip", limit=Decimal("50.00"),
+            start_date=datetime.date(2026, 3, 1), end_date=datetime.date(2026, 3, 31),
+        )
+        self.assertEqual(close_ended_periods(today=datetime.date(2026, 4, 5)), (0, 0))
+        self.assertFalse(BudgetSnapshot.objects.exists())
+
+    def test_month_end_anchor_does_not_drift(self):
+        budget = Budget.objects.create(
+            user=self.user, name="Rent", limit=Decimal("10.00"),
+            start_date=datetime.date(2026, 1, 31), end_date=datetime.date(2026, 2, 27),
+            period="monthly",
+        )
+        close_ended_periods(today=datetime.date(2026, 5, 1))
+
+        starts = list(BudgetSnapshot.objects.filter(budget=budget).order_by("start_date").values_list("start_date", flat=True))
+        self.assertEqual(
+            starts,
+            [datetime.date(2026, 1, 31), datetime.date(2026, 2, 28), datetime.date(2026, 3, 31)],
+        )
+        budget.refresh_from_db()
+        self.assertEqual((budget.start_date, budget.end_date), (datetime.date(2026, 4, 30), datetime.date(2026, 5, 30)))
+
+    def test_rerun_counts_only_new_snapshots(self):
+        budget = Budget.objects.create(
+            user=self.user, name="Fuel", limit=Decimal("10.00"),
+            start_date=datetime.date(2026, 3, 1), end_date=datetime.date(2026, 3, 31),
+            period="monthly",
+        )
+        # A period recorded by an earlier run that failed before moving the dates
+        BudgetSnapshot.objects.create(
+            budget=budget, start_date=budget.start_date, end_date=budget.end_date,
+            limit=budget.limit, spent=Decimal("0.00"), overspent=Decimal("0.00"),
+        )
+        self.assertEqual(close_ended_periods(today=datetime.date(2026, 4, 5)), (1, 0))
+        self.assertEqual(BudgetSnapshot.objects.filter(budget=budget).count(), 1)
+
+
+class ThresholdTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="alerts@example.com", password="x")
+        self.user = get_user_model().objects.get(pk=user.pk)
+        self.today = timezone.localdate()
+        self.budget = Budget.objects.create(
+            user=self.user, name="Food", limit=Decimal("100.00"), alert_thresholds=[50, 100],
+            start_date=self.today - datetime.timedelta(days=3), end_date=self.today + datetime.timedelta(days=3),
+        )
+        evaluate_alerts(push=False)
+
+    def spend(self, amount, days_ago=0):
+        return Transaction.objects.create(
+            user=self.user, type="expense", amount=Decimal(amount), title="Shop", budget=self.budget,
+            date=timezone.now() - datetime.timedelta(days=days_ago),
+        )
+
+    def evaluate(self, **kwargs):
+        # Alerts are inserted once each batch commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return evaluate_alerts(push=False, **kwargs)
+
+    def alerts(self):
+        return list(
+            Notification.objects.filter(user=self.user, type__in=["warning", "overspending"])
+            .order_by("pk")
+            .values_list("type", flat=True)
+        )
+
+    def test_spending_updates_spent_in_place(self):
+        expense = self.spend("30.00")
+        self.spend("5.00", days_ago=10)  # before the period
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent, self.budget.alerts_pending), (Decimal("30.00"), True))
+
+        expense.delete()
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.spent, Decimal("0.00"))
+        self.assertFalse(record_spending(self.budget.pk, Decimal("1.00"), timezone.now() - datetime.timedelta(days=10)))
+
+    def test_each_threshold_fires_once_per_period(self):
+        self.spend("60.00")
+        self.assertEqual(self.evaluate(), (1, 1))
+        self.assertEqual(self.evaluate(), (0, 0))
+        self.spend("10.00")
+        self.assertEqual(self.evaluate(), (1, 0))
+        # One expense over the limit notifies only the highest threshold
+        self.spend("50.00")
+        self.assertEqual(self.evaluate(), (1, 1))
+        self.assertEqual(self.alerts(), ["warning", "overspending"])
+
+        # A new period starts over
+        refresh_spent(Budget.objects.filter(pk=self.budget.pk), reset_alerts=True)
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent, self.budget.last_crossed), (Decimal("120.00"), 0))
+        self.assertEqual(self.evaluate(), (1, 1))
+        self.assertEqual(self.alerts(), ["warning", "overspending", "overspending"])
+
+    def test_period_reset_recomputes_spent(self):
+        self.spend("40.00")
+        self.spend("25.00", days_ago=2)
+        Budget.objects.filter(pk=self.budget.pk).update(
+            spent=Decimal("999.00"), last_crossed=100, alerts_pending=False,
+            start_date=self.today - datetime.timedelta(days=1),
+        )
+        self.assertEqual(refresh_spent(Budget.objects.filter(pk=self.budget.pk), reset_alerts=True), 1)
+        self.budget.refresh_from_db()
+        self.assertEqual(
+            (self.budget.spent, self.budget.last_crossed, self.budget.alerts_pending),
+            (Decimal("40.00"), 0, True),
+        )
+
+    def test_batches_cover_every_flagged_budget(self):
+        for name in ("Fuel", "Rent"):
+            Budget.objects.create(
+                user=self.user, name=name, limit=Decimal("10.00"), alert_thresholds=[100],
+                start_date=self.budget.start_date, end_date=self.budget.end_date,
+            )
+        self.assertEqual(Budget.objects.filter(alerts_pending=True).count(), 2)
+        self.assertEqual(self.evaluate(batch_size=1), (2, 0))
+        self.assertFalse(Budget.objects.filter(alerts_pending=True).exists())
+
+    def test_only_alert_fields_flag_the_budget(self):
+        budget = Budget.objects.get(pk=self.budget.pk)
+        budget.name = "Groceries"
+        budget.save()
+        self.assertFalse(Budget.objects.get(pk=budget.pk).alerts_pending)
+
+        budget.alert_thresholds.append(10)
+        budget.save()
+        self.assertTrue(Budget.objects.get(pk=budget.pk).alerts_pending)
+
+        self.evaluate()
+        budget.limit = Decimal("50.00")
+        budget.save(update_fields=["limit"])
+        self.assertTrue(Budget.objects.get(pk=budget.pk).alerts_pending)
+
+
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class ConcurrentEvaluationTests(TransactionTestCase):
+    def test_locked_budgets_are_skipped(self):
+        user = get_user_model().objects.create_user(email="locks@example.com", password="x")
+        today = timezone.localdate()
+        locked, free = (
+            Budget.objects.create(user=user, name=name, limit=Decimal("10.00"), start_date=today, end_date=today)
+            for name in ("Locked", "Free")
+        )
+        holding, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            # Another evaluator in the middle of its batch
+            try:
+                with transaction.atomic():
+                    list(Budget.objects.select_for_update().filter(pk=locked.pk))
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            holding.wait(10)
+            self.assertEqual(evaluate_alerts(push=False), (1, 0))
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(
+            dict(Budget.objects.values_list("name", "alerts_pending")), {"Locked": True, "Free": False}
+        )
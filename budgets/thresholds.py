@@ -0,0 +1,154 @@
+"""
+Budget spent tracking and threshold alerts.
+
+Each budget keeps a running `spent` for its current period. Writing an
+expense only adds to it (one UPDATE) and flags the budget with
+`alerts_pending`; no alert is evaluated on the write path.
+
+`evaluate_alerts` runs periodically over the flagged budgets in chunks. It
+compares spent with each budget's own `alert_thresholds`, notifies the
+highest threshold crossed since `last_crossed` (so each fires at most once
+per period), publishes a ThresholdCrossed event for it (bulk inserted by
+notifications.subscribers) and clears the flags with one set-based UPDATE
+per chunk.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from backend import events
+from transactions.utils import update_from_values
+
+ZERO = Decimal("0.00")
+
+# Percent of the limit. Thresholds of 100 and above mean "over the limit by
+# that much" and are crossed once spent exceeds them; the others once spent
+# reaches them.
+DEFAULT_THRESHOLDS = [80, 100]
+MAX_THRESHOLDS = 10
+MAX_THRESHOLD_PERCENT = 1000
+
+
+def default_thresholds():
+    return list(DEFAULT_THRESHOLDS)
+
+
+def local_date(moment):
+    return timezone.localdate(moment) if timezone.is_aware(moment) else moment.date()
+
+
+def is_crossed(percent, spent, limit):
+    if limit <= 0:
+        return False
+    if percent >= 100:
+        return spent * 100 > limit * percent
+    return spent * 100 >= limit * percent
+
+
+def newly_crossed(budget):
+    """Thresholds reached by `budget.spent` that were not yet notified this period."""
+    return [
+        percent
+        for percent in sorted(budget.alert_thresholds or [])
+        if percent > budget.last_crossed and is_crossed(percent, budget.spent, budget.limit)
+    ]
+
+
+def record_spending(budget_id, amount, moment):
+    """
+    Add `amount` (negative to reverse) to the budget's running spent if
+    `moment` falls inside its current period, and flag it for alert
+    evaluation. Returns whether the budget was updated.
+    """
+    from .models import Budget
+
+    day = local_date(moment)
+    return bool(
+        Budget.objects.filter(pk=budget_id, start_date__lte=day, end_date__gte=day).update(
+            spent=F("spent") + amount, alerts_pending=True
+        )
+    )
+
+
+def refresh_spent(budgets, reset_alerts=False):
+    """
+    Recompute `spent` from transactions for every budget in the `budgets`
+    queryset with one UPDATE. Used after bulk writes and period changes.
+    """
+    from transactions.models import Transaction
+
+    totals = (
+        Transaction.objects.filter(
+            budget=OuterRef("pk"),
+            type="expense",
+            date__date__gte=OuterRef("start_date"),
+            date__date__lte=OuterRef("end_date"),
+        )
+        .order_by()
+        .values("budget")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    fields = {"spent": Coalesce(Subquery(totals), Value(ZERO)), "alerts_pending": True}
+    if reset_alerts:
+        fields["last_crossed"] = 0
+    return budgets.update(**fields)
+
+
+# -------------------------
+# Batch evaluation
+# -------------------------
+def evaluate_alerts(batch_size=1000, push=True):
+    """
+    Notify every budget flagged since the last run that crossed one of its
+    thresholds. Only the highest newly crossed threshold is notified, so a
+    single large expense does not produce a burst of alerts.
+    Returns `(budgets_evaluated, notifications_created)`.
+    """
+    from .models import Budget
+
+    evaluated = created = 0
+    last_pk = 0
+
+    while True:
+        # Alerts are written by the notification subscriber once the batch commits
+        with events.collect(), transaction.atomic():
+            budgets = list(
+                Budget.objects.select_for_update(skip_locked=True)
+                .filter(alerts_pending=True, pk__gt=last_pk)
+                .only("user_id", "name", "limit", "spent", "alert_thresholds", "last_crossed")
+                .order_by("pk")[:batch_size]
+            )
+            if not budgets:
+                break
+            last_pk = budgets[-1].pk
+
+            for budget in budgets:
+                crossed = newly_crossed(budget)
+                if crossed:
+                    budget.last_crossed = crossed[-1]
+                    events.publish(
+                        events.ThresholdCrossed(
+                            user_id=budget.user_id,
+                            budget_id=budget.pk,
+                            budget_name=budget.name,
+                            percent=crossed[-1],
+                            spent=budget.spent,
+                            limit=budget.limit,
+                            push=push,
+                        )
+                    )
+                    created += 1
+
+            update_from_values(
+                Budget,
+                [(b.pk, b.last_crossed, False) for b in budgets],
+                [("last_crossed", "{value}"), ("alerts_pending", "{value}")],
+            )
+            evaluated += len(budgets)
+
+    return evaluated, created
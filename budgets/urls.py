@@ -1,7 +1,8 @@
 from rest_framework.routers import DefaultRouter
-from .views import BudgetViewSet
+from .views import BudgetSnapshotViewSet, BudgetViewSet
 
 router = DefaultRouter()
 router.register(r"budgets", BudgetViewSet, basename="budget")
+router.register(r"budget-history", BudgetSnapshotViewSet, basename="budget-snapshot")
 
 urlpatterns = router.urls
\ No newline at end of file
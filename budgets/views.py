@@ -1,6 +1,6 @@
 from rest_framework import viewsets, permissions
-from .models import Budget
-from .serializers import BudgetSerializer
+from .models import Budget, BudgetSnapshot
+from .serializers import BudgetSerializer, BudgetSnapshotSerializer
 
 
 class BudgetViewSet(viewsets.ModelViewSet):
@@ -14,3 +14,21 @@ class BudgetViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Attach the budget to the current user automatically."""
         serializer.save(user=self.request.user)
+
+
+class BudgetSnapshotViewSet(viewsets.ReadOnlyModelViewSet):
+    """Closed budget periods, newest first. Filter one budget with `?budget=<id>`."""
+
+    serializer_class = BudgetSnapshotSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = BudgetSnapshot.objects.filter(
+            budget__user=self.request.user
+        ).select_related("budget")
+        budget_id = self.request.query_params.get("budget")
+        if budget_id:
+            if not budget_id.isdigit():
+                return queryset.none()
+            queryset = queryset.filter(budget_id=budget_id)
+        return queryset
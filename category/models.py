@@ -40,6 +40,13 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared by transactions.signals.reindex_renamed
+        instance._loaded_name = instance.__dict__.get("name", models.DEFERRED)
+        return instance
+
     def save(self, *args, **kwargs):
         # Auto-generate or normalize slug if missing or changed
         if not self.slug:
@@ -51,3 +58,4 @@ class Category(models.Model):
             ):
                 self.slug = generate_unique_slug(Category, normalized, instance=self)
         super().save(*args, **kwargs)
+        self._loaded_name = self.name
@@ -1,3 +1,53 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend import db_routers
+from backend.throttling import bypass_throttling
+
+from .models import Category
+
+
+@override_settings(DATABASE_ROUTERS=["backend.db_routers.ReplicaRouter"])
+class CategoryReplicaReadTests(TestCase):
+    def setUp(self):
+        Category.objects.create(name="Groceries")
+        self.category_reads = []
+        db_for_read = db_routers.ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            if model is Category:
+                self.category_reads.append(db_routers._replica_reads.get())
+            return db_for_read(router, model, **hints)
+
+        # The test database has no replica, so "default" stands in for it.
+        for patch in (
+            mock.patch.object(db_routers.ReplicaRouter, "db_for_read", spy),
+            mock.patch.object(db_routers, "replica_alias", return_value="default"),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def get(self, client):
+        with bypass_throttling():
+            response = client.get("/api/categories/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Groceries", [row["name"] for row in response.json()])
+
+    def test_list_reads_from_the_replica(self):
+        self.get(APIClient())
+        self.assertTrue(self.category_reads)
+        self.assertTrue(all(self.category_reads))
+
+    def test_pinned_user_reads_from_the_primary(self):
+        user = get_user_model().objects.create_user(email="pinned@example.com", password="x")
+        db_routers.pin_to_primary(user.pk)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        self.get(client)
+        self.assertTrue(self.category_reads)
+        self.assertFalse(any(self.category_reads))
@@ -1,17 +1,19 @@
 from rest_framework import viewsets, permissions
+from backend.db_routers import ReplicaReadMixin
 from .models import Category
 from .serializers import CategorySerializer, CategoryCreateUpdateSerializer
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Category CRUD operations.
-    - list/retrieve → anyone can view (read-only).
+    - list/retrieve → anyone can view (read-only), served from the read replica.
     - create/update/delete → only staff/admins.
     """
 
     queryset = Category.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    replica_actions = ["list", "retrieve"]
 
     def get_serializer_class(self):
         # Use different serializer depending on action
@@ -1,8 +1,60 @@
-from django.contrib import admin
-from .models import Notification
+from django import forms
+from django.contrib import admin, messages
+from backend.admin import LargeTableAdminMixin
+from .models import Broadcast, Notification
+from .broadcast import requeue, segment_queryset
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("user", "title", "type", "is_read", "created_at")
-    list_filter = ("type", "is_read", "created_at")
+    list_select_related = ("user",)
+    list_filter = ("type", "is_read")
     search_fields = ("title", "message")
+    date_hierarchy = "created_at"
+    autocomplete_fields = ("user",)
+
+
+class BroadcastForm(forms.ModelForm):
+    class Meta:
+        model = Broadcast
+        fields = ["title", "message", "segment", "push"]
+        help_texts = {
+            "segment": 'User lookups, e.g. {"is_active": true, "date_joined__gte": "2026-01-01"}. '
+                       "Empty means every user.",
+        }
+
+    def clean_segment(self):
+        segment = self.cleaned_data["segment"] or {}
+        segment_queryset(segment)
+        return segment
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    form = BroadcastForm
+    list_display = ("title", "status", "processed_users", "total_users", "pushes_sent", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = (
+        "status", "total_users", "processed_users", "pushes_sent", "last_user_id",
+        "error", "started_at", "heartbeat_at", "finished_at",
+    )
+    actions = ["queue_broadcasts"]
+
+    def get_readonly_fields(self, request, obj=None):
+        # Content is frozen once sending started
+        if obj is not None and obj.status != "queued":
+            return ("title", "message", "segment", "push") + self.readonly_fields
+        return self.readonly_fields
+
+    @admin.action(description="Send / resume selected broadcasts")
+    def queue_broadcasts(self, request, queryset):
+        # Picked up by `manage.py send_broadcasts`; resumes from the saved cursor.
+        # Running broadcasts are skipped unless their worker has gone quiet.
+        queued = requeue(queryset)
+        self.message_user(
+            request,
+            f"{queued} broadcast(s) requeued; new broadcasts are queued on save and "
+            "running ones only once their worker stops reporting progress. "
+            "They are sent by the send_broadcasts worker.",
+            messages.SUCCESS,
+        )
@@ -6,3 +6,4 @@ class NotificationsConfig(AppConfig):
 
     def ready(self):
         import notifications.signals  # noqa
+        import notifications.subscribers  # noqa
@@ -0,0 +1,98 @@
+"""
+Push delivery backends, selected with the NOTIFICATIONS_BACKEND setting
+(like Django's EMAIL_BACKEND):
+
+- `FirebaseBackend`: sends through Firebase Cloud Messaging (production).
+- `ConsoleBackend`: prints each push instead of sending it (development).
+- `InMemoryBackend`: appends each push (or multicast) to `backends.outbox`
+  (tests and benchmarks).
+
+`get_backend()` builds the configured backend once per process, on first use.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# Pushes recorded by InMemoryBackend
+outbox = []
+
+_backend = None
+_lock = threading.Lock()
+
+
+# Device tokens per multicast request (the FCM limit)
+MULTICAST_LIMIT = 500
+
+
+class BaseBackend:
+    def send(self, token, title, body, data=None):
+        """Deliver one push to one device token. Returns a provider message id."""
+        raise NotImplementedError
+
+    def send_multicast(self, tokens, title, body, data=None):
+        """Deliver one push to up to MULTICAST_LIMIT tokens. Returns the number delivered."""
+        return sum(1 for token in tokens if self.send(token, title, body, data))
+
+
+class FirebaseBackend(BaseBackend):
+    def __init__(self):
+        from firebase_admin import messaging
+
+        from .firebase_init import get_app
+
+        self.messaging = messaging
+        self.app = get_app()
+
+    def send(self, token, title, body, data=None):
+        message = self.messaging.Message(
+            notification=self.messaging.Notification(title=title, body=body),
+            data=data or {},
+            token=token,
+        )
+        return self.messaging.send(message, app=self.app)
+
+    def send_multicast(self, tokens, title, body, data=None):
+        message = self.messaging.MulticastMessage(
+            notification=self.messaging.Notification(title=title, body=body),
+            data=data or {},
+            tokens=list(tokens),
+        )
+        return self.messaging.send_each_for_multicast(message, app=self.app).success_count
+
+
+class ConsoleBackend(BaseBackend):
+    def send(self, token, title, body, data=None):
+        print(f"[FCM console] {token[:12]}… {title}: {body} {data or ''}")
+        return "console"
+
+
+class InMemoryBackend(BaseBackend):
+    def send(self, token, title, body, data=None):
+        outbox.append({"token": token, "title": title, "body": body, "data": data or {}})
+        return f"memory-{len(outbox)}"
+
+    def send_multicast(self, tokens, title, body, data=None):
+        outbox.append({"tokens": list(tokens), "title": title, "body": body, "data": data or {}})
+        return len(tokens)
+
+
+def get_backend():
+    """Return the configured backend, building it on first use (thread-safe)."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = import_string(settings.NOTIFICATIONS_BACKEND)()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    """Let override_settings(NOTIFICATIONS_BACKEND=...) take effect."""
+    global _backend
+    if setting == "NOTIFICATIONS_BACKEND":
+        _backend = None
@@ -0,0 +1,152 @@
+"""
+System broadcasts to a user segment.
+
+`run_broadcast` walks the segment in primary-key order, `chunk_size` users
+at a time. For each chunk it:
+- bulk inserts the Notification rows and advances the broadcast's cursor in
+  the same transaction, so a stopped broadcast resumes without duplicates;
+- sends the pushes as multicasts of up to 500 tokens from a thread pool,
+  overlapped with the next chunk's inserts.
+
+Pushes are at most once: a crash between a chunk's commit and its sends
+skips that chunk's pushes on resume, never doubles them.
+
+A failed broadcast, or a running one whose heartbeat is older than
+NOTIFICATION_BROADCAST_STALE_AFTER, can be requeued for another worker.
+Each chunk's cursor update is guarded by the cursor the worker last
+committed, so if a worker that was only slow wakes up after being replaced,
+its next chunk matches no row and it stops instead of sending duplicates.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldError, ValidationError
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from users.models import UserDevice
+
+from .backends import MULTICAST_LIMIT, get_backend
+from .models import Broadcast, Notification
+
+
+def segment_queryset(segment):
+    """Users matching a segment of CustomUser lookups; ValidationError if it is invalid."""
+    if not isinstance(segment, dict):
+        raise ValidationError("Segment must be an object of user field lookups.")
+    try:
+        users = get_user_model().objects.filter(**segment)
+        # Resolves every lookup and value now rather than mid-broadcast
+        users.query.sql_with_params()
+    except (FieldError, TypeError, ValueError, ValidationError) as e:
+        raise ValidationError(f"Invalid segment: {e}")
+    return users
+
+
+def claim(broadcast_id):
+    """Move a queued broadcast to running; False if another worker already has it."""
+    return bool(
+        Broadcast.objects.filter(pk=broadcast_id, status="queued").update(
+            status="running", error="", heartbeat_at=timezone.now()
+        )
+    )
+
+
+def requeue(broadcasts):
+    """Queue the failed and stale running broadcasts among `broadcasts`; returns how many."""
+    stale = timezone.now() - timedelta(seconds=settings.NOTIFICATION_BROADCAST_STALE_AFTER)
+    return broadcasts.filter(
+        Q(status="failed")
+        | Q(status="running", heartbeat_at__lt=stale)
+        | Q(status="running", heartbeat_at=None)
+    ).update(status="queued")
+
+
+def _send_chunk(pool, backend, user_ids, title, body):
+    tokens = list(UserDevice.objects.filter(user_id__in=user_ids).values_list("fcm_token", flat=True))
+    return [
+        pool.submit(backend.send_multicast, tokens[start:start + MULTICAST_LIMIT], title, body)
+        for start in range(0, len(tokens), MULTICAST_LIMIT)
+    ]
+
+
+def _collect(broadcast, futures):
+    sent = sum(future.result() for future in futures)
+    if sent:
+        Broadcast.objects.filter(pk=broadcast.pk).update(pushes_sent=F("pushes_sent") + sent)
+        broadcast.pushes_sent += sent
+
+
+def _owned(broadcast):
+    """This worker's broadcast row: still running, at the cursor this worker committed."""
+    return Broadcast.objects.filter(pk=broadcast.pk, status="running", last_user_id=broadcast.last_user_id)
+
+
+def run_broadcast(broadcast, chunk_size=5000, workers=8, progress=None):
+    """
+    Deliver a claimed (running) broadcast, resuming after `last_user_id`.
+    `progress(broadcast)` is called after every chunk. Stops early, leaving
+    the row alone, if another worker has taken the broadcast over.
+    """
+    users = segment_queryset(broadcast.segment).order_by("pk")
+    if not broadcast.last_user_id:
+        broadcast.total_users = users.count()
+        broadcast.started_at = timezone.now()
+        _owned(broadcast).update(total_users=broadcast.total_users, started_at=broadcast.started_at)
+
+    backend = get_backend() if broadcast.push else None
+    pending = []
+    taken_over = False
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                user_ids = list(
+                    users.filter(pk__gt=broadcast.last_user_id).values_list("pk", flat=True)[:chunk_size]
+                )
+                if not user_ids:
+                    break
+                with transaction.atomic():
+                    # Locks the row first: of two workers at the same cursor, one wins
+                    moved = _owned(broadcast).update(
+                        last_user_id=user_ids[-1],
+                        processed_users=F("processed_users") + len(user_ids),
+                        heartbeat_at=timezone.now(),
+                    )
+                    if not moved:
+                        taken_over = True
+                        break
+                    Notification.objects.bulk_create(
+                        [
+                            Notification(
+                                user_id=user_id,
+                                title=broadcast.title,
+                                message=broadcast.message,
+                                type="system",
+                            )
+                            for user_id in user_ids
+                        ],
+                        batch_size=1000,
+                    )
+                broadcast.last_user_id = user_ids[-1]
+                broadcast.processed_users += len(user_ids)
+
+                # Previous chunk's pushes were in flight during these inserts
+                _collect(broadcast, pending)
+                pending = _send_chunk(pool, backend, user_ids, broadcast.title, broadcast.message) if backend else []
+                if progress:
+                    progress(broadcast)
+            _collect(broadcast, pending)
+    except Exception as e:
+        _owned(broadcast).update(status="failed", error=str(e))
+        raise
+
+    if taken_over:
+        return broadcast
+    broadcast.status = "done"
+    broadcast.finished_at = timezone.now()
+    _owned(broadcast).update(status=broadcast.status, finished_at=broadcast.finished_at)
+    return broadcast
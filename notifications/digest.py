@@ -0,0 +1,155 @@
+"""
+Push fan-out scheduler.
+
+Pushes are not sent from the request: `notifications.utils.enqueue_push`
+stores a PendingPush
+and `dispatch_pushes` (the `dispatch_pushes` command) sends them. A user's
+pushes are held until the oldest is NOTIFICATION_DIGEST_WINDOW seconds old,
+then each group goes out as one push, e.g. "12 new expenses on 'Groceries'".
+
+Two limits are enforced here for every push:
+- NOTIFICATION_PUSH_RATE: a per-user token bucket (backend.throttling store).
+  Pushes over the limit stay queued and join the next digest.
+- NOTIFICATION_QUIET_HOURS ("22-7", in TIME_ZONE): nothing is sent; the
+  backlog goes out as digests once quiet hours end.
+
+Each batch first claims its rows with one UPDATE (a fresh `claim` id) and
+then only sends rows carrying that id, so overlapping runs (cron overlap,
+several workers) never send the same push twice. Rows held back by the
+rate limit are released; rows of a run that died are reclaimable after
+NOTIFICATION_PUSH_CLAIM_TIMEOUT seconds.
+
+The Notification rows shown in the app stay one per event.
+"""
+
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from backend.throttling import get_store
+from users.models import UserDevice
+
+from .models import PendingPush
+from .utils import send_firebase_notification
+
+RATE_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+# -------------------------
+# Limits
+# -------------------------
+def parse_rate(rate):
+    """'6/h' -> (6, 3600)."""
+    count, period = rate.split("/")
+    return int(count), RATE_PERIODS[period[0]]
+
+
+def in_quiet_hours(moment):
+    window = settings.NOTIFICATION_QUIET_HOURS
+    if not window:
+        return False
+    start, end = (int(h) for h in window.split("-"))
+    hour = timezone.localtime(moment).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def allow_push(user_id):
+    """Take one token from the user's push bucket."""
+    capacity, period = parse_rate(settings.NOTIFICATION_PUSH_RATE)
+    allowed, _ = get_store().consume(f"push:{user_id}", capacity, capacity / period, time.time())
+    return allowed
+
+
+# -------------------------
+# Claims
+# -------------------------
+def claim_pushes(user_ids, now):
+    """Claim the users' unclaimed (or stale) pushes due by `now`; returns the claim id."""
+    claim = uuid.uuid4()
+    claimed_at = timezone.now()
+    stale = claimed_at - timedelta(seconds=settings.NOTIFICATION_PUSH_CLAIM_TIMEOUT)
+    PendingPush.objects.filter(
+        Q(claimed_at=None) | Q(claimed_at__lt=stale),
+        user_id__in=user_ids,
+        created_at__lte=now,
+    ).update(claim=claim, claimed_at=claimed_at)
+    return claim
+
+
+def release_pushes(pks):
+    PendingPush.objects.filter(pk__in=pks).update(claim=None, claimed_at=None)
+
+
+# -------------------------
+# Digests
+# -------------------------
+def build_digest(pushes):
+    """Collapse one group's pushes (oldest first) into `(title, body, data)`."""
+    latest = pushes[-1]
+    if len(pushes) == 1 or not latest.digest_body:
+        return latest.title, latest.body, latest.data
+    count = str(len(pushes))
+    return latest.title, latest.digest_body.replace("{count}", count), {"count": count}
+
+
+def dispatch_pushes(now=None, batch_size=500):
+    """
+    Send every due digest. Returns `(pushes_sent, events_delivered)`: the
+    number of digest pushes and of queued events they covered.
+    """
+    now = now or timezone.now()
+    if in_quiet_hours(now):
+        return 0, 0
+
+    cutoff = now - timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW)
+    due = (
+        PendingPush.objects.values("user_id")
+        .annotate(first=Min("created_at"))
+        .filter(first__lte=cutoff)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+    )
+    sent = delivered = 0
+    last_user = 0
+    while True:
+        user_ids = list(due.filter(user_id__gt=last_user)[:batch_size])
+        if not user_ids:
+            break
+        last_user = user_ids[-1]
+
+        tokens = {}
+        for user_id, token in UserDevice.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "fcm_token"
+        ):
+            tokens.setdefault(user_id, []).append(token)
+
+        groups = {}
+        claim = claim_pushes(user_ids, now)
+        for push in PendingPush.objects.filter(claim=claim).order_by("id"):
+            groups.setdefault(push.user_id, {}).setdefault(push.group, []).append(push)
+
+        done, held = [], []
+        for user_id, user_groups in groups.items():
+            limited = False
+            for pushes in user_groups.values():
+                if limited or (user_id in tokens and not allow_push(user_id)):
+                    # Over the limit: stays queued for the next digest
+                    limited = True
+                    held.extend(push.pk for push in pushes)
+                    continue
+                if user_id in tokens:
+                    title, body, data = build_digest(pushes)
+                    for token in tokens[user_id]:
+                        send_firebase_notification(token, title, body, data)
+                    sent += 1
+                    delivered += len(pushes)
+                done.extend(push.pk for push in pushes)
+        PendingPush.objects.filter(pk__in=done).delete()
+        release_pushes(held)
+    return sent, delivered
@@ -1,21 +1,30 @@
 import os
-import firebase_admin
-from firebase_admin import credentials
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Expose the app instance so other modules can import it
+# Initialized on first use by get_app(), not at import time, so processes
+# that never send a push (migrate, collectstatic, most workers) skip
+# importing firebase_admin and building the credential.
 app = None
+_lock = threading.Lock()
 
-# Initialize Firebase only once
-if not firebase_admin._apps:
 
-    cred_dict = {
+def credential_dict():
+    private_key = os.getenv("FIREBASE_PRIVATE_KEY")
+    if not private_key:
+        raise ImproperlyConfigured(
+            "FIREBASE_PRIVATE_KEY is not set. Configure the Firebase credentials or pick "
+            "another NOTIFICATIONS_BACKEND."
+        )
+    return {
         "type": "service_account",
         "project_id": os.getenv("FIREBASE_PROJECT_ID"),
         "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID"),
-        "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace("\\n", "\n"),
+        "private_key": private_key.replace("\\n", "\n"),
         "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
         "client_id": os.getenv("FIREBASE_CLIENT_ID"),
         "auth_uri": "https://accounts.google.com/o/oauth2/auth",
@@ -25,11 +34,20 @@ if not firebase_admin._apps:
         "universe_domain": "googleapis.com",
     }
 
-    cred = credentials.Certificate(cred_dict)
-    app = firebase_admin.initialize_app(cred)
 
-    print("🔥 Firebase Admin initialized successfully!")
+def get_app():
+    """Return the Firebase Admin app, initializing it once per process (thread-safe)."""
+    global app
+    if app is not None:
+        return app
+    with _lock:
+        if app is None:
+            import firebase_admin
+            from firebase_admin import credentials
 
-else:
-    app = firebase_admin.get_app()
-    print("Firebase already initialized.")
+            if firebase_admin._apps:
+                app = firebase_admin.get_app()
+            else:
+                app = firebase_admin.initialize_app(credentials.Certificate(credential_dict()))
+                print("🔥 Firebase Admin initialized successfully!")
+    return app
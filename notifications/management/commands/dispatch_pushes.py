@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.digest import dispatch_pushes
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued pushes as per-user digests, honouring the per-user push rate "
+        "and quiet hours. Run it every minute, or keep it running with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Users per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep dispatching.")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds between runs with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            sent, delivered = dispatch_pushes(batch_size=options["batch_size"])
+            elapsed = time.perf_counter() - started
+            if sent or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sent {sent} pushes covering {delivered} notifications in {elapsed:.2f}s."
+                    )
+                )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
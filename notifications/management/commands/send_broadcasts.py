@@ -0,0 +1,74 @@
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.broadcast import claim, requeue, run_broadcast, segment_queryset
+from notifications.models import Broadcast
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued system broadcasts (created in the admin), or create and send one "
+        "with --title/--message/--filter. Stopped broadcasts resume with --resume ID."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--title")
+        parser.add_argument("--message")
+        parser.add_argument(
+            "--filter", action="append", default=[], metavar="LOOKUP=VALUE",
+            help='User lookup, repeatable, e.g. --filter is_active=true --filter date_joined__gte=2026-01-01. '
+                 "Values are parsed as JSON when possible.",
+        )
+        parser.add_argument("--no-push", action="store_true", help="Only create the notification rows.")
+        parser.add_argument("--resume", type=int, metavar="ID", help="Continue a failed broadcast, or a running one whose worker died.")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=8, help="Threads sending multicasts.")
+
+    def handle(self, *args, **options):
+        if options["title"] or options["message"]:
+            if not (options["title"] and options["message"]):
+                raise CommandError("--title and --message go together.")
+            segment = {}
+            for item in options["filter"]:
+                lookup, sep, value = item.partition("=")
+                if not sep:
+                    raise CommandError(f"Expected LOOKUP=VALUE, got '{item}'.")
+                try:
+                    segment[lookup] = json.loads(value)
+                except ValueError:
+                    segment[lookup] = value
+            try:
+                segment_queryset(segment)
+            except ValidationError as e:
+                raise CommandError(e.messages[0])
+            Broadcast.objects.create(
+                title=options["title"], message=options["message"], segment=segment, push=not options["no_push"]
+            )
+
+        if options["resume"]:
+            if not requeue(Broadcast.objects.filter(pk=options["resume"])):
+                raise CommandError(
+                    f"Broadcast {options['resume']} is not failed, or still running with a live worker."
+                )
+
+        for broadcast_id in Broadcast.objects.filter(status="queued").order_by("pk").values_list("pk", flat=True):
+            if claim(broadcast_id):
+                self._run(Broadcast.objects.get(pk=broadcast_id), options)
+
+    def _run(self, broadcast, options):
+        started = time.perf_counter()
+
+        def progress(b):
+            self.stdout.write(f"  [{b.pk}] {b.processed_users}/{b.total_users} users")
+
+        run_broadcast(broadcast, options["chunk_size"], options["workers"], progress=progress)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Broadcast {broadcast.pk} '{broadcast.title}': {broadcast.processed_users} users, "
+                f"{broadcast.pushes_sent} pushes in {elapsed:.1f}s."
+            )
+        )
@@ -22,3 +22,69 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.user})"
+
+
+class PendingPush(models.Model):
+    """
+    Outgoing push waiting for the digest scheduler (notifications.digest).
+    Pushes of one user in the same `group` are merged into a single push;
+    `digest_body` (with a `{count}` placeholder) is its text, or the latest
+    push is sent as-is when it is empty. A dispatch run claims the rows it
+    sends (`claim`, `claimed_at`) so overlapping runs never send them twice.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="pending_pushes"
+    )
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    group = models.CharField(max_length=100, blank=True, default="")
+    digest_body = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "created_at"])]
+
+    def __str__(self):
+        return f"{self.title} ({self.user_id})"
+
+
+class Broadcast(models.Model):
+    """
+    A system notification for every user matching `segment` (CustomUser
+    lookups, e.g. {"is_active": true}), sent by notifications.broadcast.
+    `last_user_id` is the resume cursor: a stopped broadcast continues after it.
+    `heartbeat_at` is bumped on claim and on every chunk, so a running
+    broadcast is only requeued once its worker has gone quiet.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    segment = models.JSONField(default=dict, blank=True)
+    push = models.BooleanField(default=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    total_users = models.PositiveIntegerField(default=0, editable=False)
+    processed_users = models.PositiveIntegerField(default=0, editable=False)
+    pushes_sent = models.PositiveIntegerField(default=0, editable=False)
+    last_user_id = models.BigIntegerField(default=0, editable=False)
+    error = models.TextField(blank=True, default="", editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.title} ({self.status})"
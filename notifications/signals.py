@@ -1,25 +1,10 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from backend import events
 from budgets.models import Budget
-from .models import Notification
 
 @receiver(post_save, sender=Budget)
-def create_budget_notification(sender, instance, created, **kwargs):
-    user = instance.user  # adjust if your Budget model uses a different field name
-
-    if created:
-        # New budget created
-        Notification.objects.create(
-            user=user,
-            title="New Budget Created",
-            message=f"You created a new budget called '{instance.name}'.",
-            type="budget",
-        )
-    else:
-        # Existing budget updated
-        Notification.objects.create(
-            user=user,
-            title="Budget Updated",
-            message=f"Your budget '{instance.name}' was updated successfully.",
-            type="budget",
-        )
+def publish_budget_saved(sender, instance, created, **kwargs):
+    """Announce budget saves on the event bus (see notifications.subscribers)."""
+    event = events.BudgetCreated if created else events.BudgetUpdated
+    events.publish(event(user_id=instance.user_id, budget_id=instance.pk, name=instance.name))
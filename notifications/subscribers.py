@@ -0,0 +1,105 @@
+"""
+The notification subscriber: turns a batch of domain events (backend.events)
+into Notification rows and queued pushes with one bulk insert each.
+"""
+
+from backend import events
+from users.models import UserDevice
+
+from .models import Notification, PendingPush
+
+
+def budget_alert(event):
+    """`(title, message, type)` for a crossed threshold."""
+    if event.percent >= 100:
+        return (
+            "Budget Overspent",
+            f"Overspent on '{event.budget_name}' by {event.spent - event.limit:,.2f}.",
+            "overspending",
+        )
+    spent_percent = (event.spent / event.limit) * 100
+    return (
+        "Budget Warning",
+        f"Warning: You've used {spent_percent:.1f}% of your '{event.budget_name}' budget.",
+        "warning",
+    )
+
+
+def notify(batch):
+    notifications, pushes = [], []
+    # A budget created and edited in the same batch is announced once
+    announced = set()
+
+    for event in batch:
+        if isinstance(event, events.BudgetCreated):
+            announced.add(event.budget_id)
+            notifications.append(
+                Notification(
+                    user_id=event.user_id,
+                    title="New Budget Created",
+                    message=f"You created a new budget called '{event.name}'.",
+                    type="budget",
+                )
+            )
+        elif isinstance(event, events.BudgetUpdated):
+            if event.budget_id in announced:
+                continue
+            announced.add(event.budget_id)
+            notifications.append(
+                Notification(
+                    user_id=event.user_id,
+                    title="Budget Updated",
+                    message=f"Your budget '{event.name}' was updated successfully.",
+                    type="budget",
+                )
+            )
+        elif isinstance(event, events.ExpenseRecorded):
+            title = "Budget Spending"
+            message = f"You spent {event.amount:,.2f} on '{event.budget_name}' budget."
+            notifications.append(
+                Notification(user_id=event.user_id, title=title, message=message, type="spending")
+            )
+            pushes.append(
+                PendingPush(
+                    user_id=event.user_id,
+                    title=title,
+                    body=message,
+                    group=f"spending:{event.budget_id}",
+                    digest_body=f"{{count}} new expenses on '{event.budget_name}' budget.",
+                )
+            )
+        elif isinstance(event, events.ThresholdCrossed):
+            title, message, type = budget_alert(event)
+            notifications.append(
+                Notification(user_id=event.user_id, title=title, message=message, type=type)
+            )
+            if event.push:
+                pushes.append(
+                    PendingPush(
+                        user_id=event.user_id,
+                        title=title,
+                        body=message,
+                        group="budget_alert",
+                        digest_body="{count} budget alerts",
+                    )
+                )
+
+    Notification.objects.bulk_create(notifications, batch_size=1000)
+    if pushes:
+        with_devices = set(
+            UserDevice.objects.filter(user_id__in={p.user_id for p in pushes}).values_list(
+                "user_id", flat=True
+            )
+        )
+        PendingPush.objects.bulk_create(
+            [p for p in pushes if p.user_id in with_devices], batch_size=1000
+        )
+
+
+events.subscribe(
+    notify,
+    events.BudgetCreated,
+    events.BudgetUpdated,
+    events.ExpenseRecorded,
+    events.ThresholdCrossed,
+)
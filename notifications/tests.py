@@ -1,3 +1,138 @@
-from django.test import TestCase
+import io
+import uuid
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from backend.throttling import get_store
+from users.models import UserDevice
+
+from . import backends
+from .broadcast import claim, requeue, run_broadcast, segment_queryset
+from .digest import dispatch_pushes
+from .models import Broadcast, Notification, PendingPush
+
+
+@override_settings(
+    NOTIFICATIONS_BACKEND="notifications.backends.InMemoryBackend",
+    THROTTLE_STORE={"BACKEND": "backend.throttling.MemoryThrottleStore"},
+    NOTIFICATION_QUIET_HOURS="",
+    NOTIFICATION_DIGEST_WINDOW=60,
+    NOTIFICATION_PUSH_CLAIM_TIMEOUT=600,
+)
+class DispatchPushesTests(TestCase):
+    def setUp(self):
+        backends.outbox.clear()
+        get_store().purge(float("inf"))
+        self.user = get_user_model().objects.create_user(email="push@example.com", password="x")
+        UserDevice.objects.create(user=self.user, fcm_token="token-1")
+        for n in range(3):
+            PendingPush.objects.create(
+                user=self.user, title="Expense", body=f"#{n}", group="expenses",
+                digest_body="{count} new expenses",
+            )
+        self.later = timezone.now() + timedelta(minutes=5)
+
+    def test_sends_one_digest_per_group(self):
+        self.assertEqual(dispatch_pushes(now=self.later), (1, 3))
+        self.assertEqual(len(backends.outbox), 1)
+        self.assertEqual(backends.outbox[0]["body"], "3 new expenses")
+        self.assertFalse(PendingPush.objects.exists())
+
+    def test_rows_claimed_by_another_run_are_skipped(self):
+        PendingPush.objects.update(claim=uuid.uuid4(), claimed_at=timezone.now())
+
+        self.assertEqual(dispatch_pushes(now=self.later), (0, 0))
+        self.assertEqual(backends.outbox, [])
+        self.assertEqual(PendingPush.objects.count(), 3)
+
+    def test_stale_claims_are_taken_over(self):
+        PendingPush.objects.update(
+            claim=uuid.uuid4(), claimed_at=timezone.now() - timedelta(seconds=601)
+        )
+
+        self.assertEqual(dispatch_pushes(now=self.later), (1, 3))
+        self.assertFalse(PendingPush.objects.exists())
+
+    @override_settings(NOTIFICATION_PUSH_RATE="0/h")
+    def test_rate_limited_pushes_are_released(self):
+        self.assertEqual(dispatch_pushes(now=self.later), (0, 0))
+        self.assertFalse(PendingPush.objects.exclude(claim=None).exists())
+        self.assertEqual(PendingPush.objects.count(), 3)
+
+
+@override_settings(
+    NOTIFICATIONS_BACKEND="notifications.backends.InMemoryBackend",
+    NOTIFICATION_BROADCAST_STALE_AFTER=600,
+)
+class BroadcastTests(TestCase):
+    segment = {"email__startswith": "fan"}
+
+    def setUp(self):
+        backends.outbox.clear()
+        self.users = []
+        for n in range(4):
+            user = get_user_model().objects.create_user(email=f"fan{n}@example.com", password="x")
+            UserDevice.objects.create(user=user, fcm_token=f"token-{n}")
+            self.users.append(user)
+
+    def received(self):
+        return sorted(
+            Notification.objects.filter(title="Maintenance", type="system").values_list("user_id", flat=True)
+        )
+
+    def send(self, **options):
+        call_command("send_broadcasts", stdout=io.StringIO(), chunk_size=2, **options)
+
+    def test_invalid_segments_are_rejected(self):
+        for segment in ([], {"no_such_field": 1}, {"date_joined__gte": "not a date"}):
+            with self.assertRaises(ValidationError, msg=segment):
+                segment_queryset(segment)
+        self.assertEqual(segment_queryset(self.segment).count(), 4)
+
+        with self.assertRaises(CommandError):
+            self.send(title="Maintenance", message="Tonight", filter=["no_such_field=1"])
+        self.assertFalse(Broadcast.objects.exists())
+
+    def test_claim_is_exclusive(self):
+        broadcast = Broadcast.objects.create(title="Maintenance", message="Tonight", segment=self.segment)
+        self.assertTrue(claim(broadcast.pk))
+        self.assertFalse(claim(broadcast.pk))
+        broadcast.refresh_from_db()
+        self.assertEqual(broadcast.status, "running")
+        self.assertIsNotNone(broadcast.heartbeat_at)
+
+    def test_resume_waits_for_the_worker_to_go_quiet(self):
+        broadcast = Broadcast.objects.create(
+            title="Maintenance", message="Tonight", segment=self.segment, status="running",
+            total_users=4, processed_users=2, last_user_id=self.users[1].pk, heartbeat_at=timezone.now(),
+        )
+        with self.assertRaises(CommandError):
+            self.send(resume=broadcast.pk)
+        self.assertEqual(requeue(Broadcast.objects.all()), 0)
+
+        Broadcast.objects.update(heartbeat_at=timezone.now() - timedelta(seconds=601))
+        self.send(resume=broadcast.pk)
+
+        broadcast.refresh_from_db()
+        self.assertEqual((broadcast.status, broadcast.processed_users, broadcast.pushes_sent), ("done", 4, 2))
+        self.assertEqual(self.received(), [self.users[2].pk, self.users[3].pk])
+        self.assertEqual(backends.outbox[0]["tokens"], ["token-2", "token-3"])
+
+    def test_replaced_worker_stops(self):
+        broadcast = Broadcast.objects.create(title="Maintenance", message="Tonight", segment=self.segment)
+        claim(broadcast.pk)
+        stale = Broadcast.objects.get(pk=broadcast.pk)
+        # Meanwhile another worker resumed it and sent the first chunk
+        Broadcast.objects.filter(pk=broadcast.pk).update(last_user_id=self.users[1].pk, processed_users=2)
+
+        run_broadcast(stale, chunk_size=2)
+
+        broadcast.refresh_from_db()
+        self.assertEqual((broadcast.status, broadcast.last_user_id), ("running", self.users[1].pk))
+        self.assertEqual(self.received(), [])
+        self.assertEqual(backends.outbox, [])
@@ -1,8 +1,9 @@
 from rest_framework import generics, permissions
+from backend.db_routers import ReplicaReadMixin
 from .models import Notification
 from .serializers import NotificationSerializer
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
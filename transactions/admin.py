@@ -1,9 +1,13 @@
 from django.contrib import admin
-from .models import Transaction
+from django.contrib.auth import get_user_model
+from backend.admin import LargeTableAdminMixin
+from .models import Transaction, RecurringTransaction
+from .bulk import delete_transactions
+from .search import search
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin configuration for Transaction model."""
 
     list_display = [
@@ -17,6 +21,58 @@ class TransactionAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     ]
-    list_filter = ["type", "category", "date"]
-    search_fields = ["user__email", "category__name", "title"]  # updated
+    list_select_related = ["user", "category"]
+    # Categories are a small shared list; users are searched by email instead
+    list_filter = ["type", "category"]
+    date_hierarchy = "date"
+    autocomplete_fields = ["user", "category", "budget"]
+    raw_id_fields = ["recurring"]
+    search_fields = ["title"]  # searched via the index, see get_search_results
+    search_help_text = "Title, category or budget name, or a user's exact email."
+    readonly_fields = ["created_at", "updated_at"]
+
+    actions = ["delete_with_totals"]
+
+    def get_actions(self, request):
+        # The stock action deletes without reversing user/budget totals
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(description="Delete selected transactions", permissions=["delete"])
+    def delete_with_totals(self, request, queryset):
+        deleted = delete_transactions(queryset)
+        self.message_user(request, f"Deleted {deleted} transactions and updated balances.")
+
+    def get_search_results(self, request, queryset, search_term):
+        """Indexed search instead of icontains scans across joins."""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        # Resolve the user on its own (unique email index) rather than OR-ing
+        # a join onto the transaction table
+        users = get_user_model().objects.filter(email__iexact=term).values("pk")
+        matches = search(queryset, term) | queryset.filter(user_id__in=users)
+        return matches, False
+
+
+@admin.register(RecurringTransaction)
+class RecurringTransactionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Admin configuration for RecurringTransaction schedules."""
+
+    list_display = [
+        "id",
+        "user",
+        "type",
+        "amount",
+        "title",
+        "frequency",
+        "interval",
+        "next_run",
+        "is_active",
+    ]
+    list_select_related = ["user"]
+    list_filter = ["frequency", "type", "is_active"]
+    search_fields = ["user__email", "title"]
+    autocomplete_fields = ["user", "category", "budget"]
     readonly_fields = ["created_at", "updated_at"]
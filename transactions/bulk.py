@@ -0,0 +1,97 @@
+"""
+Set-based bulk operations on transactions.
+
+Each operation runs a fixed number of statements however many rows it
+touches: one UPDATE or DELETE, one net-delta update of the owners' totals
+and one INSERT ... SELECT into the journal (deletes only), and one spent
+recompute covering every affected budget. Deletes first lock and collect
+the matching ids, then run per chunk of DELETE_CHUNK_SIZE ids.
+Used by the bulk API endpoints, the admin and account cleanup jobs.
+"""
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from budgets.models import Budget
+from budgets.thresholds import refresh_spent
+
+from . import journal
+from .search import document_expression
+from .utils import add_user_delta, apply_user_deltas
+
+# Ids per statement when deleting a materialized selection
+DELETE_CHUNK_SIZE = 5000
+
+
+def _budget_ids(queryset):
+    """Budgets whose spent depends on the expenses in `queryset`."""
+    return set(
+        queryset.filter(type="expense")
+        .exclude(budget=None)
+        .order_by()
+        .values_list("budget_id", flat=True)
+        .distinct()
+    )
+
+
+def _refresh_budgets(budget_ids):
+    if budget_ids:
+        refresh_spent(Budget.objects.filter(pk__in=budget_ids))
+
+
+def delete_transactions(queryset):
+    """Delete every transaction in `queryset` and reverse their effect on totals."""
+    model = queryset.model
+    with transaction.atomic():
+        # Lock and pin the rows first: totals, journal and DELETE must cover
+        # exactly the same set, even if matching rows are inserted meanwhile
+        ids = list(
+            queryset.select_for_update(of=("self",)).order_by().values_list("pk", flat=True)
+        )
+        deleted = 0
+        deltas = {}
+        budget_ids = set()
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            rows = model.objects.filter(pk__in=ids[start:start + DELETE_CHUNK_SIZE])
+            totals = (
+                rows.order_by()
+                .values("user_id", "type")
+                .annotate(total=Sum("amount"))
+                .values_list("user_id", "type", "total")
+            )
+            for user_id, type, total in totals:
+                add_user_delta(deltas, user_id, type, total, sign=-1)
+            budget_ids |= _budget_ids(rows)
+            journal.record_queryset(rows, kind="delete", sign=-1)
+
+            _, counts = rows.delete()
+            deleted += counts.get(model._meta.label, 0)
+        apply_user_deltas(deltas)
+        _refresh_budgets(budget_ids)
+    return deleted
+
+
+def recategorize_transactions(queryset, category):
+    """Move every transaction in `queryset` to `category` (None to clear it)."""
+    with transaction.atomic():
+        return queryset.update(
+            category=category,
+            search_document=document_expression(category_name=category.name if category else ""),
+            updated_at=timezone.now(),
+        )
+
+
+def rebudget_transactions(queryset, budget):
+    """Attach every transaction in `queryset` to `budget` (None to detach)."""
+    with transaction.atomic():
+        budget_ids = _budget_ids(queryset)
+        updated = queryset.update(
+            budget=budget,
+            search_document=document_expression(budget_name=budget.name if budget else ""),
+            updated_at=timezone.now(),
+        )
+        if budget is not None:
+            budget_ids.add(budget.pk)
+        _refresh_budgets(budget_ids)
+    return updated
@@ -0,0 +1,255 @@
+"""
+Append-only journal of balance deltas and per-user balance checkpoints.
+
+Every change to a transaction's effect on the balance appends JournalEntry
+rows dated at the transaction's own date (`effective_at`): +amount for
+income, -amount for expenses, and the reversal of the old effect when a
+transaction is edited or deleted.
+
+A BalanceCheckpoint stores a user's balance as of a moment, counting the
+entries up to `last_entry_id` when it was taken. The balance as of any
+moment is then the latest checkpoint before it, plus entries dated between
+the checkpoint and the moment, plus entries recorded after the checkpoint
+but dated before it (backdated edits). Both tails are short index scans.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import (
+    Case,
+    DecimalField,
+    Exists,
+    F,
+    Max,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+CENT = Decimal("0.01")
+
+
+def effect(type, amount):
+    """Signed effect of a transaction on its owner's balance."""
+    return amount if type == "income" else -amount
+
+
+def entries_for_save(instance, old=None):
+    """Unsaved JournalEntry rows for saving `instance` (previously `old`)."""
+    from .models import JournalEntry
+
+    if old is not None and (old.user_id, old.type, old.amount, old.date) == (
+        instance.user_id, instance.type, instance.amount, instance.date
+    ):
+        return []
+    entries = []
+    kind = "create" if old is None else "update"
+    if old is not None:
+        entries.append(
+            JournalEntry(
+                user_id=old.user_id,
+                transaction_id=old.pk,
+                effective_at=old.date,
+                delta=-effect(old.type, old.amount),
+                kind=kind,
+            )
+        )
+    entries.append(
+        JournalEntry(
+            user_id=instance.user_id,
+            transaction_id=instance.pk,
+            effective_at=instance.date,
+            delta=effect(instance.type, instance.amount),
+            kind=kind,
+        )
+    )
+    return entries
+
+
+def entry_for_delete(instance):
+    from .models import JournalEntry
+
+    return JournalEntry(
+        user_id=instance.user_id,
+        transaction_id=instance.pk,
+        effective_at=instance.date,
+        delta=-effect(instance.type, instance.amount),
+        kind="delete",
+    )
+
+
+def record_queryset(queryset, kind, sign=1):
+    """
+    Journal every transaction in `queryset` with one INSERT ... SELECT,
+    `sign=-1` reversing their effect. For bulk writes that bypass save().
+    """
+    from .models import JournalEntry
+
+    delta = Case(
+        When(type="income", then=F("amount")),
+        default=-F("amount"),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    rows = queryset.order_by().values_list(
+        "user_id",
+        "pk",
+        "date",
+        delta * Value(sign),
+        Value(kind),
+        Value(timezone.now(), output_field=JournalEntry._meta.get_field("recorded_at")),
+    )
+    connection = connections[queryset.db]
+    select_sql, params = rows.query.get_compiler(queryset.db).as_sql()
+    qn = connection.ops.quote_name
+    columns = ", ".join(
+        qn(JournalEntry._meta.get_field(name).column)
+        for name in ("user", "transaction_id", "effective_at", "delta", "kind", "recorded_at")
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(JournalEntry._meta.db_table)} ({columns}) {select_sql}", params
+        )
+        return cursor.rowcount
+
+
+# -------------------------
+# Balances
+# -------------------------
+def balances_as_of(users, moment, max_entry_id=None):
+    """
+    Annotate the `users` queryset with `balance_as_of`: each user's balance
+    counting every journal entry dated at or before `moment`. One query, via
+    each user's latest checkpoint plus its two tails.
+    """
+    from .models import BalanceCheckpoint, JournalEntry
+
+    money = DecimalField(max_digits=12, decimal_places=2)
+    checkpoint = BalanceCheckpoint.objects.filter(
+        user=OuterRef("pk"), as_of__lte=moment
+    ).order_by("-as_of")
+    entries = JournalEntry.objects.filter(user=OuterRef("pk"))
+    if max_entry_id is not None:
+        entries = entries.filter(pk__lte=max_entry_id)
+
+    def total(queryset):
+        return Coalesce(
+            Subquery(
+                queryset.order_by().values("user").annotate(total=Sum("delta")).values("total"),
+                output_field=money,
+            ),
+            Value(0, output_field=money),
+        )
+
+    return (
+        users.annotate(
+            checkpoint_balance=Coalesce(
+                Subquery(checkpoint.values("balance")[:1]), Value(0, output_field=money)
+            ),
+            checkpoint_as_of=Coalesce(Subquery(checkpoint.values("as_of")[:1]), Value(EPOCH)),
+            checkpoint_entry=Coalesce(Subquery(checkpoint.values("last_entry_id")[:1]), Value(0)),
+        )
+        .annotate(
+            # Entries dated after the checkpoint...
+            tail=total(
+                entries.filter(
+                    effective_at__gt=OuterRef("checkpoint_as_of"), effective_at__lte=moment
+                )
+            ),
+            # ...and backdated ones recorded after it was taken.
+            late=total(
+                entries.filter(
+                    effective_at__lte=OuterRef("checkpoint_as_of"),
+                    pk__gt=OuterRef("checkpoint_entry"),
+                )
+            ),
+        )
+        .annotate(balance_as_of=F("checkpoint_balance") + F("tail") + F("late"))
+    )
+
+
+def balance_as_of(user_id, moment):
+    """One user's balance counting every transaction dated at or before `moment`."""
+    users = get_user_model().objects.filter(pk=user_id)
+    balance = balances_as_of(users, moment).values_list("balance_as_of", flat=True).first()
+    # SQLite sums decimals as floats
+    return Decimal(balance or 0).quantize(CENT)
+
+
+def running_balances(user_id, oldest, newest):
+    """
+    `{transaction id: balance right after it}` for the user's transactions
+    dated `oldest`..`newest`, e.g. one page of a listing. A window function
+    runs over that range only, seeded with the balance just before it, so
+    no page scans the whole history.
+    """
+    from .models import Transaction
+
+    seed = balance_as_of(user_id, oldest - timedelta(microseconds=1))
+    effect_expression = Case(
+        When(type="income", then=F("amount")),
+        default=-F("amount"),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    rows = (
+        Transaction.objects.filter(user_id=user_id, date__gte=oldest, date__lte=newest)
+        .order_by()
+        .annotate(
+            running=Window(Sum(effect_expression), order_by=(F("date").asc(), F("id").asc()))
+        )
+        .values_list("pk", "running")
+    )
+    return {pk: (seed + Decimal(running)).quantize(CENT) for pk, running in rows}
+
+
+def create_checkpoints(as_of, chunk_size=2000):
+    """
+    Checkpoint the balance as of `as_of` for every user with journal entries
+    not yet covered by a checkpoint. Returns the number of checkpoints written.
+    """
+    from .models import BalanceCheckpoint, JournalEntry
+
+    CustomUser = get_user_model()
+    max_entry_id = JournalEntry.objects.aggregate(max=Max("pk"))["max"]
+    if max_entry_id is None:
+        return 0
+
+    latest = BalanceCheckpoint.objects.filter(user=OuterRef("pk")).order_by("-as_of", "-pk")
+    written = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            CustomUser.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return written
+        last_pk = ids[-1]
+
+        users = CustomUser.objects.filter(pk__in=ids).annotate(
+            covered=Coalesce(Subquery(latest.values("last_entry_id")[:1]), Value(0))
+        ).filter(
+            Exists(
+                JournalEntry.objects.filter(
+                    user=OuterRef("pk"), pk__gt=OuterRef("covered"), pk__lte=max_entry_id
+                )
+            )
+        )
+        rows = balances_as_of(users, as_of, max_entry_id).values_list("pk", "balance_as_of")
+        checkpoints = [
+            BalanceCheckpoint(user_id=pk, as_of=as_of, balance=balance, last_entry_id=max_entry_id)
+            for pk, balance in rows
+        ]
+        with transaction.atomic():
+            BalanceCheckpoint.objects.filter(user_id__in=[c.user_id for c in checkpoints], as_of=as_of).delete()
+            BalanceCheckpoint.objects.bulk_create(checkpoints)
+        written += len(checkpoints)
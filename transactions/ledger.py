@@ -0,0 +1,117 @@
+"""
+Consistency checks for the denormalized user totals.
+
+`CustomUser.balance`, `income_total` and `expense_total` are maintained
+incrementally and drift when writes bypass `Transaction.save`/`delete` or
+race. `reconcile` recomputes them per chunk of users with one grouped
+aggregate over transactions, reports mismatches and optionally fixes them
+with one set-based UPDATE per chunk. Only one chunk is held in memory.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from .utils import update_from_values
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+
+def all_user_ids(chunk_size):
+    """Yield lists of user ids, keyset-paged by pk."""
+    CustomUser = get_user_model()
+    last_pk = 0
+    while True:
+        ids = list(
+            CustomUser.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def changed_user_ids(since, chunk_size):
+    """Yield lists of ids of users with transactions created or updated since `since`."""
+    from .models import Transaction
+
+    last_pk = 0
+    while True:
+        ids = list(
+            Transaction.objects.filter(updated_at__gte=since, user_id__gt=last_pk)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()[:chunk_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def _money(value):
+    # SQLite sums decimals as floats
+    return Decimal(value or 0).quantize(CENT)
+
+
+def reconcile_users(user_ids, fix=False):
+    """
+    Compare stored totals with the transactions of `user_ids`.
+    Returns `(users_checked, mismatches)` where each mismatch is
+    `(user_id, stored, expected)` and both are `(balance, income, expense)`.
+    With `fix`, the users are locked first and mismatches are corrected.
+    """
+    from .models import Transaction
+
+    CustomUser = get_user_model()
+    with transaction.atomic():
+        users = CustomUser.objects.filter(pk__in=user_ids)
+        if fix:
+            users = users.select_for_update()
+        stored = {
+            pk: (balance, income, expense)
+            for pk, balance, income, expense in users.values_list(
+                "pk", "balance", "income_total", "expense_total"
+            )
+        }
+        totals = {
+            user_id: (_money(income), _money(expense))
+            for user_id, income, expense in Transaction.objects.filter(user_id__in=user_ids)
+            .order_by()
+            .values("user_id")
+            .annotate(
+                income=Sum("amount", filter=Q(type="income")),
+                expense=Sum("amount", filter=Q(type="expense")),
+            )
+            .values_list("user_id", "income", "expense")
+        }
+
+        mismatches = []
+        for pk, current in stored.items():
+            income, expense = totals.get(pk, (ZERO, ZERO))
+            expected = (income - expense, income, expense)
+            if current != expected:
+                mismatches.append((pk, current, expected))
+
+        if fix and mismatches:
+            update_from_values(
+                CustomUser,
+                [(pk, *expected) for pk, _, expected in mismatches],
+                [
+                    ("balance", "{value}"),
+                    ("income_total", "{value}"),
+                    ("expense_total", "{value}"),
+                ],
+            )
+    return len(stored), mismatches
+
+
+def reconcile(user_id_chunks, fix=False):
+    """Run reconcile_users() over each chunk, yielding its result."""
+    for user_ids in user_id_chunks:
+        yield reconcile_users(user_ids, fix=fix)
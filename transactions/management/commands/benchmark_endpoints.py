@@ -0,0 +1,106 @@
+import contextlib
+import io
+import time
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend import benchmarking
+from backend.throttling import bypass_throttling
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Benchmark the main API endpoints with the Django test client against a "
+        "throwaway test database seeded by generate_ledger_data. Records throughput, "
+        "p50/p95/p99 latency and query counts, and diffs them against a JSON baseline."
+    )
+    name = "endpoints"
+    iterations = 50
+    warmup = 5
+    test_database = True
+
+    def add_benchmark_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5)
+        parser.add_argument("--transactions", type=int, default=500)
+
+    def run(self, options):
+        call_command(
+            "generate_ledger_data",
+            users=options["users"],
+            transactions=options["transactions"],
+            clear=True,
+            stdout=io.StringIO(),
+        )
+        return self._run_scenarios(options)
+
+    def metadata(self, options):
+        return {
+            "users": options["users"],
+            "transactions_per_user": options["transactions"],
+            "iterations": options["iterations"],
+            "database": connection.vendor,
+        }
+
+    # -------------------------
+    # Scenarios
+    # -------------------------
+    def _run_scenarios(self, options):
+        from django.contrib.auth import get_user_model
+
+        user = get_user_model().objects.filter(devices__isnull=False).order_by("id").first()
+        budget = user.budgets.first()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        create_payload = {
+            "type": "expense",
+            "amount": "12.50",
+            "title": "Benchmark expense",
+            "budget": budget.pk if budget else None,
+        }
+        scenarios = {
+            "transactions_list": lambda: client.get("/api/transactions/"),
+            "transactions_create": lambda: client.post(
+                "/api/transactions/", create_payload, format="json"
+            ),
+            "budgets_list": lambda: client.get("/api/budgets/"),
+            "users_me": lambda: client.get("/api/users/me/"),
+            "notifications_list": lambda: client.get("/api/notifications/"),
+        }
+
+        endpoints = {}
+        # Throttling is benchmarked separately (benchmark_throttle); FCM sends
+        # never leave the process.
+        with bypass_throttling(), \
+                override_settings(NOTIFICATIONS_BACKEND="notifications.backends.InMemoryBackend"), \
+                contextlib.redirect_stdout(io.StringIO()):
+            for name, request in scenarios.items():
+                endpoints[name] = self._measure(request, options["iterations"], options["warmup"])
+
+        return endpoints
+
+    def _measure(self, request, iterations, warmup):
+        for _ in range(warmup):
+            request()
+
+        timings, queries = [], []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            # The query log is a bounded deque; keep it from saturating.
+            reset_queries()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = request()
+                timings.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f"{response.request['PATH_INFO']} returned {response.status_code}: "
+                    f"{response.content[:200]!r}"
+                )
+            queries.append(len(ctx.captured_queries))
+        return benchmarking.summarize(timings, queries, time.perf_counter() - started)
@@ -0,0 +1,64 @@
+import io
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from backend import benchmarking
+from transactions.models import Transaction
+from transactions.serializers import TransactionSerializer
+
+
+class InstanceTransactionSerializer(TransactionSerializer):
+    """TransactionSerializer with the default, per-instance list serializer."""
+
+    class Meta(TransactionSerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+
+class Command(benchmarking.BenchmarkCommand):
+    help = (
+        "Compare per-instance TransactionSerializer output with the values()-based "
+        "TransactionListSerializer on one user's transactions in a throwaway test database."
+    )
+    name = "serializers"
+    iterations = 5
+    test_database = True
+
+    def add_benchmark_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+
+    def run(self, options):
+        call_command(
+            "generate_ledger_data",
+            users=1,
+            transactions=options["rows"],
+            notifications=0,
+            clear=True,
+            stdout=io.StringIO(),
+        )
+        return self._run_cases(options)
+
+    def _run_cases(self, options):
+        queryset = Transaction.objects.order_by("-date", "-created_at")
+        cases = {
+            "instances": lambda: InstanceTransactionSerializer(queryset.all(), many=True).data,
+            "instances_select_related": lambda: InstanceTransactionSerializer(
+                queryset.select_related("category", "budget"), many=True
+            ).data,
+            "values": lambda: TransactionSerializer(queryset.all(), many=True).data,
+        }
+
+        if cases["instances"]() != cases["values"]():
+            raise CommandError("values() read path output differs from TransactionSerializer.")
+
+        results = {}
+        for name, fn in cases.items():
+            reset_queries()
+            with CaptureQueriesContext(connection) as ctx:
+                fn()
+            timings = benchmarking.time_call(fn, options["iterations"], options["warmup"])
+            results[name] = benchmarking.summarize(timings, [len(ctx.captured_queries)])
+        return results
@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.ledger import all_user_ids, changed_user_ids, reconcile
+from transactions.models import LedgerCheckRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's balance, income_total and expense_total from "
+        "transactions, report mismatches and optionally fix them. --incremental "
+        "only checks users with transactions created or updated since the last "
+        "finished run. QuerySet.delete() and QuerySet.update() without updated_at "
+        "leave no trace, so schedule a full run too (e.g. nightly full, hourly "
+        "incremental)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Correct mismatched totals.")
+        parser.add_argument("--incremental", action="store_true")
+        parser.add_argument(
+            "--overlap",
+            type=int,
+            default=300,
+            help="Seconds to re-check before the last run, for writes that committed late.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Users per aggregate.")
+        parser.add_argument(
+            "--show", type=int, default=20, help="Mismatches to print (0 for none)."
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        run = LedgerCheckRun(
+            mode="incremental" if options["incremental"] else "full", fixed=options["fix"]
+        )
+        if options["incremental"]:
+            last = LedgerCheckRun.objects.exclude(finished_at=None).first()
+            if last is None:
+                self.stdout.write("No previous run; checking every user.")
+                chunks = all_user_ids(options["chunk_size"])
+            else:
+                since = last.started_at - timedelta(seconds=options["overlap"])
+                self.stdout.write(f"Checking users with transactions changed since {since:%Y-%m-%d %H:%M:%S}.")
+                chunks = changed_user_ids(since, options["chunk_size"])
+        else:
+            chunks = all_user_ids(options["chunk_size"])
+        run.save()
+
+        started = time.perf_counter()
+        shown = 0
+        for checked, mismatches in reconcile(chunks, fix=options["fix"]):
+            run.users_checked += checked
+            run.mismatches += len(mismatches)
+            for user_id, stored, expected in mismatches:
+                if shown >= options["show"]:
+                    break
+                shown += 1
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"user {user_id}: stored balance/income/expense "
+                        f"{'/'.join(map(str, stored))}, expected {'/'.join(map(str, expected))}"
+                    )
+                )
+
+        run.finished_at = timezone.now()
+        run.save(update_fields=["users_checked", "mismatches", "finished_at"])
+        elapsed = time.perf_counter() - started
+
+        summary = f"Checked {run.users_checked} users in {elapsed:.2f}s: {run.mismatches} mismatched"
+        if run.mismatches and options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"{summary}, all fixed."))
+        elif run.mismatches:
+            self.stdout.write(self.style.ERROR(f"{summary}. Re-run with --fix to correct them."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}."))
@@ -0,0 +1,38 @@
+import time
+from datetime import datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from transactions.journal import create_checkpoints
+
+
+class Command(BaseCommand):
+    help = (
+        "Checkpoint every user's balance as of a moment (default: the start of "
+        "today) so balance-as-of lookups only scan the journal after it. "
+        "Users without new journal entries are skipped; schedule it daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--as-of", help="ISO datetime to checkpoint at.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["as_of"]:
+            as_of = parse_datetime(options["as_of"])
+            if as_of is None:
+                raise CommandError("--as-of must be an ISO 8601 datetime.")
+            if timezone.is_naive(as_of):
+                as_of = timezone.make_aware(as_of)
+        else:
+            as_of = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+
+        started = time.perf_counter()
+        written = create_checkpoints(as_of, chunk_size=options["chunk_size"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {written} checkpoints as of {as_of:%Y-%m-%d %H:%M} in {elapsed:.2f}s.")
+        )
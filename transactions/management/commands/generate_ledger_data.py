@@ -0,0 +1,229 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from budgets.models import Budget
+from budgets.thresholds import refresh_spent
+from category.models import Category
+from notifications.models import Notification
+from transactions import journal
+from transactions.models import Transaction
+from transactions.search import build_document
+from users.models import UserDevice
+
+CustomUser = get_user_model()
+
+CATEGORY_NAMES = [
+    "Groceries", "Rent", "Salary", "Transport", "Utilities", "Dining",
+    "Entertainment", "Health", "Subscriptions", "Travel", "Shopping", "Freelance",
+]
+INCOME_TITLES = ["Salary", "Freelance payment", "Refund", "Interest", "Gift"]
+EXPENSE_TITLES = [
+    "Netflix", "Uber ride", "Supermarket", "Electricity bill", "Coffee",
+    "Gym membership", "Pharmacy", "Restaurant", "Flight", "Internet",
+]
+BUDGET_NAMES = ["Groceries", "Transport", "Fun", "Bills", "Eating out", "Travel"]
+DEVICE_NAMES = ["iPhone 14 Pro", "Pixel 8", "Galaxy S23", "iPad Air"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, categories, budgets, devices, transactions and "
+        "notifications with bulk inserts. User totals are computed in memory so "
+        "they match the generated transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10, help="Number of users to create.")
+        parser.add_argument(
+            "--transactions", type=int, default=200, help="Transactions per user."
+        )
+        parser.add_argument("--budgets", type=int, default=3, help="Budgets per user.")
+        parser.add_argument("--devices", type=int, default=1, help="Devices per user.")
+        parser.add_argument(
+            "--notifications", type=int, default=20, help="Notifications per user."
+        )
+        parser.add_argument(
+            "--email-domain",
+            default="synthetic.ledgerly.test",
+            help="Domain used for generated user emails.",
+        )
+        parser.add_argument("--password", default="password123")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated users on the same email domain first.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        domain = options["email_domain"]
+        batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            if options["clear"]:
+                deleted, _ = CustomUser.objects.filter(email__endswith=f"@{domain}").delete()
+                self.stdout.write(f"Removed {deleted} previously generated rows.")
+
+            categories = self._ensure_categories()
+            users = self._create_users(options["users"], domain, options["password"], batch_size)
+            budgets = self._create_budgets(rng, users, options["budgets"], batch_size)
+            self._create_devices(users, options["devices"], batch_size)
+            count = self._create_transactions(
+                rng, users, categories, budgets, options["transactions"], batch_size
+            )
+            refresh_spent(Budget.objects.filter(user__in=users))
+            journal.record_queryset(Transaction.objects.filter(user__in=users), kind="create")
+            self._create_notifications(rng, users, options["notifications"], batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {len(users)} users, {count} transactions, "
+                f"{sum(len(b) for b in budgets.values())} budgets."
+            )
+        )
+
+    # -------------------------
+    # Generators
+    # -------------------------
+    def _ensure_categories(self):
+        """Categories are global, so reuse existing ones by name."""
+        Category.objects.bulk_create(
+            [Category(name=name, slug=slugify(name)) for name in CATEGORY_NAMES],
+            ignore_conflicts=True,
+        )
+        return list(Category.objects.filter(name__in=CATEGORY_NAMES))
+
+    def _create_users(self, count, domain, password, batch_size):
+        # Hash once: PBKDF2 per user would dominate the run time.
+        password_hash = make_password(password)
+        offset = CustomUser.objects.filter(email__endswith=f"@{domain}").count()
+        users = [
+            CustomUser(
+                email=f"user{offset + i}@{domain}",
+                name=f"Synthetic User {offset + i}",
+                password=password_hash,
+            )
+            for i in range(count)
+        ]
+        CustomUser.objects.bulk_create(users, batch_size=batch_size)
+        # Not every backend returns primary keys from bulk_create.
+        if users and users[0].pk is None:
+            users = list(
+                CustomUser.objects.filter(email__in=[u.email for u in users]).order_by("id")
+            )
+        return users
+
+    def _create_budgets(self, rng, users, per_user, batch_size):
+        today = timezone.now().date()
+        budgets = []
+        for user in users:
+            for i in range(per_user):
+                start = today.replace(day=1) - timedelta(days=30 * rng.randint(0, 2))
+                budgets.append(
+                    Budget(
+                        user=user,
+                        name=BUDGET_NAMES[i % len(BUDGET_NAMES)],
+                        limit=Decimal(rng.randrange(100, 5000)),
+                        start_date=start,
+                        end_date=start + timedelta(days=90),
+                    )
+                )
+        Budget.objects.bulk_create(budgets, batch_size=batch_size)
+        if budgets and budgets[0].pk is None:
+            budgets = list(Budget.objects.filter(user__in=users))
+
+        by_user = {user.pk: [] for user in users}
+        for budget in budgets:
+            by_user[budget.user_id].append(budget)
+        return by_user
+
+    def _create_devices(self, users, per_user, batch_size):
+        devices = [
+            UserDevice(
+                user=user,
+                fcm_token=f"synthetic-token-{user.pk}-{i}",
+                device_name=DEVICE_NAMES[i % len(DEVICE_NAMES)],
+            )
+            for user in users
+            for i in range(per_user)
+        ]
+        UserDevice.objects.bulk_create(devices, batch_size=batch_size, ignore_conflicts=True)
+
+    def _create_transactions(self, rng, users, categories, budgets, per_user, batch_size):
+        """Bulk insert transactions and write matching user totals in one bulk_update."""
+        now = timezone.now()
+        batch = []
+        count = 0
+        for user in users:
+            income = expense = Decimal("0.00")
+            user_budgets = budgets.get(user.pk) or []
+            for _ in range(per_user):
+                is_income = rng.random() < 0.2
+                amount = Decimal(rng.randrange(100, 500000)) / 100
+                if is_income:
+                    amount *= 5
+                    income += amount
+                else:
+                    expense += amount
+                category = rng.choice(categories) if categories else None
+                budget = (
+                    rng.choice(user_budgets)
+                    if user_budgets and not is_income and rng.random() < 0.6
+                    else None
+                )
+                title = rng.choice(INCOME_TITLES if is_income else EXPENSE_TITLES)
+                batch.append(
+                    Transaction(
+                        user=user,
+                        type="income" if is_income else "expense",
+                        category=category,
+                        budget=budget,
+                        amount=amount,
+                        title=title,
+                        date=now - timedelta(minutes=rng.randrange(0, 60 * 24 * 365)),
+                        search_document=build_document(
+                            title, category and category.name, budget and budget.name
+                        ),
+                    )
+                )
+                if len(batch) >= batch_size:
+                    Transaction.objects.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+
+            user.income_total = income
+            user.expense_total = expense
+            user.balance = income - expense
+
+        if batch:
+            Transaction.objects.bulk_create(batch)
+            count += len(batch)
+
+        CustomUser.objects.bulk_update(
+            users, ["income_total", "expense_total", "balance"], batch_size=batch_size
+        )
+        return count
+
+    def _create_notifications(self, rng, users, per_user, batch_size):
+        notifications = [
+            Notification(
+                user=user,
+                title="Budget Spending",
+                message=f"You spent {rng.randrange(1, 500):,.2f} on '{rng.choice(BUDGET_NAMES)}' budget.",
+                type="budget",
+                is_read=rng.random() < 0.5,
+            )
+            for user in users
+            for _ in range(per_user)
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from transactions.recurrence import materialize_due
+
+
+class Command(BaseCommand):
+    help = (
+        "Post every due occurrence of every active recurring transaction in one "
+        "batched pass. Safe to re-run: occurrences already posted are skipped. "
+        "Schedule it (cron, Render cron job, ...) as often as the finest schedule needs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--now",
+            help="Materialize occurrences due up to this ISO datetime (default: now).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--max-catch-up",
+            type=int,
+            default=366,
+            help="Maximum occurrences posted per schedule in one run.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options["now"]:
+            now = parse_datetime(options["now"])
+            if now is None:
+                raise CommandError("--now must be an ISO 8601 datetime.")
+            if timezone.is_naive(now):
+                now = timezone.make_aware(now)
+
+        started = time.perf_counter()
+        processed, created = materialize_due(
+            now=now, batch_size=options["batch_size"], max_catch_up=options["max_catch_up"]
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} schedules, posted {created} transactions "
+                f"in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:47
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+
+
+def backfill_documents(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    Category = apps.get_model("category", "Category")
+    Budget = apps.get_model("budgets", "Budget")
+
+    category_name = Category.objects.filter(pk=OuterRef("category_id")).values("name")
+    budget_name = Budget.objects.filter(pk=OuterRef("budget_id")).values("name")
+    Transaction.objects.update(
+        search_document=Lower(
+            Concat(
+                F("title"),
+                Value(" "),
+                Coalesce(Subquery(category_name), Value("")),
+                Value(" "),
+                Coalesce(Subquery(budget_name), Value("")),
+            )
+        )
+    )
+
+
+def install_index(apps, schema_editor):
+    from transactions.search import install_index
+
+    install_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0004_budget_alert_thresholds'),
+        ('category', '0001_initial'),
+        ('transactions', '0004_recurring_transactions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+        migrations.RunPython(install_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_ledger_check_runs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('last_entry_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-as_of'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'as_of'), name='unique_balance_checkpoint')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JournalEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_id', models.BigIntegerField(blank=True, null=True)),
+                ('effective_at', models.DateTimeField()),
+                ('delta', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('kind', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='journal_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'journal entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user', 'effective_at'], name='transaction_user_id_287808_idx')],
+            },
+        ),
+        # Journal every existing transaction as created at its own date.
+        migrations.RunSQL(
+            """
+            INSERT INTO transactions_journalentry
+                (user_id, transaction_id, effective_at, delta, kind, recorded_at)
+            SELECT user_id, id, date,
+                   CASE WHEN type = 'income' THEN amount ELSE -amount END,
+                   'create', CURRENT_TIMESTAMP
+            FROM transactions_transaction
+            ORDER BY date, id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
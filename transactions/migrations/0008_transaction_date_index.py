@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0005_image_pipeline'),
+        ('category', '0001_initial'),
+        ('transactions', '0007_balance_journal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date'], name='transaction_date_ad8c94_idx'),
+        ),
+    ]
@@ -2,8 +2,10 @@ from django.db import models, transaction
 from django.utils import timezone
 from django.conf import settings
 from category.models import Category
+from budgets import thresholds
 from budgets.models import Budget
-from notifications.utils import create_budget_notification  # ✅ import helper
+from backend import events
+from . import journal, recurrence, search
 
 
 class Transaction(models.Model):
@@ -38,11 +40,29 @@ class Transaction(models.Model):
     title = models.CharField(max_length=150, default="Untitled Transaction")
     date = models.DateTimeField(default=timezone.now)
 
+    # Set when the row was posted by a RecurringTransaction schedule
+    recurring = models.ForeignKey(
+        "RecurringTransaction",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="transactions"
+    )
+    occurrence_key = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False
+    )
+
+    # Lowercased title + category + budget names; indexed by transactions.search
+    search_document = models.TextField(blank=True, default="", editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        # updated_at: users with recent changes, for incremental ledger checks;
+        # date: admin changelist ordering and date hierarchy
+        indexes = [models.Index(fields=["updated_at"]), models.Index(fields=["date"])]
 
     def __str__(self):
         return f"{self.user.email} - {self.type} - {self.amount} ({self.category})"
@@ -51,22 +71,34 @@ class Transaction(models.Model):
     # Balance auto-update logic
     # -------------------------
     def save(self, *args, **kwargs):
-        """Update user totals and trigger budget notifications."""
+        """Update user totals, budget spent and the journal, and trigger budget notifications."""
         with transaction.atomic():
+            old = None
             if self.pk:  # Updating an existing transaction
                 old = Transaction.objects.get(pk=self.pk)
                 self._reverse_user_update(old)
 
+            self.search_document = search.build_document(
+                self.title,
+                self.category.name if self.category_id else None,
+                self.budget.name if self.budget_id else None,
+            )
             super().save(*args, **kwargs)
             self._apply_user_update()
+            JournalEntry.objects.bulk_create(journal.entries_for_save(self, old))
+
+            if old is not None:
+                old._record_budget_spending(sign=-1)
 
             # ✅ Handle notifications AFTER save
             self._handle_budget_notifications()
 
     def delete(self, *args, **kwargs):
-        """Reverse user totals when deleting a transaction."""
+        """Reverse user totals, budget spent and the journal when deleting a transaction."""
         with transaction.atomic():
             self._reverse_user_update(self)
+            self._record_budget_spending(sign=-1)
+            journal.entry_for_delete(self).save()
             super().delete(*args, **kwargs)
 
     # -------------------------
@@ -95,43 +127,219 @@ class Transaction(models.Model):
     # -------------------------
     # Budget Notification Logic
     # -------------------------
+    def _record_budget_spending(self, sign=1):
+        """Add (or with sign=-1, remove) this expense from its budget's running spent."""
+        if not self.budget_id or self.type != "expense":
+            return False
+        return thresholds.record_spending(self.budget_id, sign * self.amount, self.date)
+
     def _handle_budget_notifications(self):
         """Trigger notifications when spending affects a budget."""
         # Skip if not an expense or not linked to a budget
-        if not self.budget or self.type != "expense":
+        if not self.budget_id or self.type != "expense":
             return
 
-        # Calculate total spent on this budget so far
-        total_spent = (
-            self.budget.transactions.filter(type="expense")
-            .aggregate(models.Sum("amount"))["amount__sum"] or 0
+        # Threshold alerts are evaluated in batch (budgets.thresholds.evaluate_alerts)
+        self._record_budget_spending()
+
+        # 🟢 Spending notification (notifications.subscribers)
+        events.publish(
+            events.ExpenseRecorded(
+                user_id=self.user_id,
+                budget_id=self.budget_id,
+                budget_name=self.budget.name,
+                amount=self.amount,
+            )
         )
-        limit = self.budget.limit or 0
-        spent_percent = (total_spent / limit) * 100 if limit > 0 else 0
-
-        # 🟢 Spending notification
-        create_budget_notification(
-            user=self.user,
-            title="Budget Spending",
-            message=f"You spent {self.amount:,.2f} on '{self.budget.name}' budget.",
-            type="spending",
+
+
+class RecurringTransaction(models.Model):
+    """
+    Schedule that posts a Transaction on every occurrence (rent, salary,
+    subscriptions...). Occurrences are materialized in bulk by
+    `transactions.recurrence.materialize_due`.
+    """
+
+    FREQUENCY_CHOICES = (
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("yearly", "Yearly"),
+        ("cron", "Cron rule"),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recurring_transactions"
+    )
+    type = models.CharField(max_length=7, choices=Transaction.TYPE_CHOICES)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="recurring_transactions"
+    )
+    budget = models.ForeignKey(
+        Budget,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="recurring_transactions"
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    title = models.CharField(max_length=150, default="Untitled Transaction")
+
+    frequency = models.CharField(max_length=7, choices=FREQUENCY_CHOICES, default="monthly")
+    interval = models.PositiveSmallIntegerField(default=1)  # every N days/weeks/months/years
+    cron = models.CharField(max_length=100, blank=True)  # "minute hour day month weekday"
+    start_date = models.DateTimeField(default=timezone.now)
+    end_date = models.DateTimeField(null=True, blank=True)
+
+    next_run = models.DateTimeField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["next_run"]
+        indexes = [models.Index(fields=["is_active", "next_run"])]
+
+    def __str__(self):
+        return f"{self.title} - {self.frequency} - {self.amount}"
+
+    def save(self, *args, **kwargs):
+        if self.next_run is None:
+            self.next_run = recurrence.first_occurrence(self)
+        super().save(*args, **kwargs)
+
+    def advance(self, now, limit):
+        """
+        Return the occurrences due at or before `now` (at most `limit`) and
+        move `next_run`/`is_active` past them. Does not save.
+        """
+        occurrences = []
+        current = self.next_run
+        while current is not None and current <= now and len(occurrences) < limit:
+            if self.end_date and current > self.end_date:
+                break
+            occurrences.append(current)
+            current = recurrence.next_occurrence(self, current)
+
+        self.next_run = current
+        if current is None or (self.end_date and current > self.end_date):
+            self.is_active = False
+        return occurrences
+
+    def occurrence_key(self, occurred_at):
+        return f"r{self.pk}:{occurred_at:%Y%m%dT%H%M}"
+
+    def build_transaction(self, occurred_at):
+        """Unsaved Transaction for one occurrence, ready for bulk_create."""
+        return Transaction(
+            user_id=self.user_id,
+            type=self.type,
+            category_id=self.category_id,
+            budget_id=self.budget_id,
+            amount=self.amount,
+            title=self.title,
+            date=occurred_at,
+            recurring=self,
+            occurrence_key=self.occurrence_key(occurred_at),
+            search_document=search.build_document(
+                self.title,
+                self.category.name if self.category_id else None,
+                self.budget.name if self.budget_id else None,
+            ),
         )
 
-        # 🟠 Warning notification (≥80% spent)
-        if spent_percent >= 80 and spent_percent < 100:
-            create_budget_notification(
-                user=self.user,
-                title="Budget Warning",
-                message=f"Warning: You've used {spent_percent:.1f}% of your '{self.budget.name}' budget.",
-                type="warning",
-            )
 
-        # 🔴 Overspending notification (>100%)
-        if spent_percent > 100:
-            overspent = total_spent - limit
-            create_budget_notification(
-                user=self.user,
-                title="Budget Overspent",
-                message=f"Overspent on '{self.budget.name}' by {overspent:,.2f}.",
-                type="overspending",
-            )
+class LedgerCheckRun(models.Model):
+    """
+    One run of the `check_ledger` command. The start of the last finished run
+    is the watermark for incremental checks.
+    """
+
+    MODE_CHOICES = (
+        ("full", "Full"),
+        ("incremental", "Incremental"),
+    )
+
+    mode = models.CharField(max_length=11, choices=MODE_CHOICES)
+    fixed = models.BooleanField(default=False)  # mismatches were corrected
+    users_checked = models.PositiveIntegerField(default=0)
+    mismatches = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.mode} ledger check at {self.started_at:%Y-%m-%d %H:%M} ({self.mismatches} mismatches)"
+
+
+class JournalEntry(models.Model):
+    """
+    Append-only record of one change to a user's balance, dated at the
+    transaction's own date. See transactions.journal.
+    """
+
+    KIND_CHOICES = (
+        ("create", "Create"),
+        ("update", "Update"),
+        ("delete", "Delete"),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="journal_entries"
+    )
+    # Not a foreign key: entries outlive the transactions they describe
+    transaction_id = models.BigIntegerField(null=True, blank=True)
+    effective_at = models.DateTimeField()
+    delta = models.DecimalField(max_digits=12, decimal_places=2)
+    kind = models.CharField(max_length=6, choices=KIND_CHOICES)
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["user", "effective_at"])]
+        verbose_name_plural = "journal entries"
+
+    def __str__(self):
+        return f"{self.kind} {self.delta} for user {self.user_id} at {self.effective_at}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Journal entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Journal entries are append-only.")
+
+
+class BalanceCheckpoint(models.Model):
+    """A user's balance as of `as_of`, counting journal entries up to `last_entry_id`."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="balance_checkpoints"
+    )
+    as_of = models.DateTimeField()
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    last_entry_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-as_of"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "as_of"], name="unique_balance_checkpoint")
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.balance} as of {self.as_of}"
@@ -0,0 +1,26 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TransactionCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (date, id): every page is an index range scan,
+    however deep the client scrolls, and rows inserted meanwhile don't shift pages.
+    """
+
+    ordering = ("-date", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class OptionalTransactionCursorPagination(TransactionCursorPagination):
+    """
+    Paginates only when the client asks for it with `cursor` or `page_size`,
+    so existing clients of the transaction list keep getting every row.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
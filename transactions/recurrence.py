@@ -0,0 +1,208 @@
+"""
+Date math and batch materialization for recurring transactions.
+
+`materialize_due` walks every due schedule in chunks and, per chunk, runs a
+handful of set-based statements: lock the schedules, look up which candidate
+occurrence keys are already posted, bulk insert the new transactions, apply the per-user totals
+with one set-based UPDATE, refresh the touched budgets' running spent and
+bulk update the schedules' `next_run`.
+Occurrence keys are unique, so re-running never double-posts.
+"""
+
+import calendar
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from django.db import transaction
+from django.utils import timezone
+
+from budgets.thresholds import refresh_spent
+
+from . import journal
+from .utils import add_user_delta, apply_user_deltas, update_from_values
+
+# How far ahead a cron rule is searched before giving up (about 5 years).
+CRON_SEARCH_DAYS = 366 * 5
+
+CRON_RANGES = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+
+# -------------------------
+# Cron rules
+# -------------------------
+def _parse_cron_field(value, name, low, high):
+    values = set()
+    for part in value.split(","):
+        expr, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(x) for x in expr.split("-", 1))
+        else:
+            start = end = int(expr)
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid {name} field '{value}'.")
+        values.update(range(start, end + 1, step))
+    if name == "day of week" and 7 in values:
+        # Both 0 and 7 mean Sunday.
+        values = (values - {7}) | {0}
+    return frozenset(values)
+
+
+@lru_cache(maxsize=256)
+def parse_cron(rule):
+    """
+    Parse a standard 5-field cron rule ("minute hour day month weekday").
+    Returns a tuple of value sets plus flags for restricted day fields.
+    Raises ValueError for malformed rules.
+    """
+    fields = rule.split()
+    if len(fields) != 5:
+        raise ValueError("Cron rule must have 5 fields: minute hour day month weekday.")
+    try:
+        parsed = [
+            _parse_cron_field(value, name, low, high)
+            for value, (name, low, high) in zip(fields, CRON_RANGES)
+        ]
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e) or f"Invalid cron rule '{rule}'.") from e
+    return parsed, fields[2] != "*", fields[4] != "*"
+
+
+def cron_next(rule, after):
+    """Return the first datetime strictly after `after` that matches `rule`."""
+    (minutes, hours, days, months, weekdays), dom_set, dow_set = parse_cron(rule)
+    tz = after.tzinfo
+    day = after.date()
+    for _ in range(CRON_SEARCH_DAYS):
+        # Cron weekdays count from Sunday=0; Python's from Monday=0.
+        cron_weekday = (day.weekday() + 1) % 7
+        dom_match, dow_match = day.day in days, cron_weekday in weekdays
+        # Like cron: if both day fields are restricted, either may match.
+        if dom_set and dow_set:
+            day_match = dom_match or dow_match
+        else:
+            day_match = dom_match and dow_match
+        if day.month in months and day_match:
+            for hour in sorted(hours):
+                for minute in sorted(minutes):
+                    candidate = datetime.combine(day, time(hour, minute), tzinfo=tz)
+                    if candidate > after:
+                        return candidate
+        day += timedelta(days=1)
+    return None
+
+
+# -------------------------
+# Calendar schedules
+# -------------------------
+def add_months(moment, months, anchor_day):
+    """Move `moment` by `months`, clamping `anchor_day` to the target month's length."""
+    index = moment.month - 1 + months
+    year, month = moment.year + index // 12, index % 12 + 1
+    day = min(anchor_day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def next_occurrence(schedule, current):
+    """Return the occurrence that follows `current` for `schedule`, or None."""
+    interval = schedule.interval or 1
+    if schedule.frequency == "daily":
+        return current + timedelta(days=interval)
+    if schedule.frequency == "weekly":
+        return current + timedelta(weeks=interval)
+    if schedule.frequency == "monthly":
+        return add_months(current, interval, schedule.start_date.day)
+    if schedule.frequency == "yearly":
+        return add_months(current, 12 * interval, schedule.start_date.day)
+    if schedule.frequency == "cron":
+        return cron_next(schedule.cron, current)
+    raise ValueError(f"Unknown frequency '{schedule.frequency}'.")
+
+
+def first_occurrence(schedule, not_before=None):
+    """First occurrence of `schedule` at or after `not_before` (default: its start)."""
+    current = schedule.start_date
+    if schedule.frequency == "cron":
+        current = cron_next(schedule.cron, current - timedelta(minutes=1))
+    while current is not None and not_before is not None and current < not_before:
+        current = next_occurrence(schedule, current)
+    return current
+
+
+# -------------------------
+# Batch materialization
+# -------------------------
+def materialize_due(now=None, batch_size=1000, max_catch_up=366):
+    """
+    Post every occurrence due at or before `now` for all active schedules.
+
+    Each schedule posts at most `max_catch_up` occurrences per run; the rest
+    are picked up by the next run. Returns `(schedules_processed, transactions_created)`.
+    """
+    from budgets.models import Budget
+
+    from .models import JournalEntry, RecurringTransaction, Transaction
+
+    now = now or timezone.now()
+    processed = created = 0
+    last_pk = 0
+
+    while True:
+        with transaction.atomic():
+            schedules = list(
+                RecurringTransaction.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("category", "budget")
+                .filter(is_active=True, next_run__lte=now, pk__gt=last_pk)
+                .order_by("pk")[:batch_size]
+            )
+            if not schedules:
+                break
+            last_pk = schedules[-1].pk
+
+            candidates = []
+            for schedule in schedules:
+                for occurred_at in schedule.advance(now, max_catch_up):
+                    candidates.append(schedule.build_transaction(occurred_at))
+
+            if candidates:
+                # By key, not by schedule and date: a posted occurrence may
+                # since have been re-dated or detached from its schedule.
+                keys = [t.occurrence_key for t in candidates]
+                posted = set()
+                for start in range(0, len(keys), batch_size):
+                    posted.update(
+                        Transaction.objects.filter(occurrence_key__in=keys[start:start + batch_size])
+                        .values_list("occurrence_key", flat=True)
+                    )
+                new = [t for t in candidates if t.occurrence_key not in posted]
+                Transaction.objects.bulk_create(new, batch_size=batch_size)
+                JournalEntry.objects.bulk_create(
+                    [e for t in new for e in journal.entries_for_save(t)], batch_size=batch_size
+                )
+
+                deltas = {}
+                for t in new:
+                    add_user_delta(deltas, t.user_id, t.type, t.amount)
+                apply_user_deltas(deltas)
+
+                budget_ids = {t.budget_id for t in new if t.budget_id and t.type == "expense"}
+                if budget_ids:
+                    refresh_spent(Budget.objects.filter(pk__in=budget_ids))
+                created += len(new)
+
+            update_from_values(
+                RecurringTransaction,
+                [(s.pk, s.next_run, s.is_active) for s in schedules],
+                [("next_run", "{value}"), ("is_active", "{value}")],
+            )
+            processed += len(schedules)
+
+    return processed, created
@@ -0,0 +1,161 @@
+"""
+Transaction search over title, category name and budget name.
+
+Each transaction stores a lowercased `search_document` with those three
+texts. It is indexed per database:
+
+- PostgreSQL: a pg_trgm GIN index, which serves `LIKE '%term%'`.
+- SQLite: an FTS5 shadow table using the trigram tokenizer, kept in sync by
+  triggers. SQLite drops triggers when a migration rebuilds the table, so
+  install_index() also runs after every migrate.
+- Anything else: plain substring matching, unindexed.
+
+Every whitespace-separated term must match, as a substring, somewhere in the
+document. Trigram indexes need at least 3 characters, so shorter terms are
+matched with a plain substring filter on the rows the longer terms found.
+"""
+
+from django.db import OperationalError, connections
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Concat, Lower
+
+TABLE = "transactions_transaction"
+FTS_TABLE = "transactions_transaction_fts"
+TRIGRAM_INDEX = "transaction_search_trgm"
+MIN_INDEXED_TERM = 3
+
+SQLITE_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document)
+        VALUES ('delete', old.id, old.search_document);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_document ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document)
+        VALUES ('delete', old.id, old.search_document);
+        INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document);
+    END""",
+)
+
+# alias -> whether the SQLite FTS5 table exists
+_fts_available = {}
+
+
+def build_document(title, category_name=None, budget_name=None):
+    """Search document for one transaction."""
+    return " ".join(part for part in (title, category_name, budget_name) if part).lower()
+
+
+def document_expression(category_name=None, budget_name=None):
+    """
+    DB-side equivalent of build_document(), for set-based reindexing.
+    Pass a name (or "" for none) to use it instead of looking the row's own up.
+    """
+    from budgets.models import Budget
+    from category.models import Category
+
+    if category_name is None:
+        category = Coalesce(
+            Subquery(Category.objects.filter(pk=OuterRef("category_id")).values("name")),
+            Value(""),
+        )
+    else:
+        category = Value(category_name)
+    if budget_name is None:
+        budget = Coalesce(
+            Subquery(Budget.objects.filter(pk=OuterRef("budget_id")).values("name")),
+            Value(""),
+        )
+    else:
+        budget = Value(budget_name)
+    return Lower(Concat(F("title"), Value(" "), category, Value(" "), budget))
+
+
+def reindex(queryset):
+    """Rebuild `search_document` for every transaction in `queryset` with one UPDATE."""
+    return queryset.update(search_document=document_expression())
+
+
+# -------------------------
+# Index setup
+# -------------------------
+def install_index(connection):
+    """Create the search index for `connection` if missing. Idempotent."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} "
+                f"ON {TABLE} USING gin (search_document gin_trgm_ops)"
+            )
+        elif connection.vendor == "sqlite":
+            _fts_available.pop(connection.alias, None)
+            if not has_fts_table(connection.alias):
+                try:
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                        f"search_document, content='{TABLE}', content_rowid='id', "
+                        f"tokenize='trigram')"
+                    )
+                except OperationalError:
+                    # No FTS5 or trigram tokenizer (SQLite < 3.34): search unindexed.
+                    return
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                _fts_available[connection.alias] = True
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(trigger)
+
+
+def install_index_after_migrate(using, **kwargs):
+    """post_migrate receiver; skips databases the migrations haven't reached yet."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if TABLE not in connection.introspection.table_names(cursor):
+            return
+        columns = connection.introspection.get_table_description(cursor, TABLE)
+    if any(column.name == "search_document" for column in columns):
+        install_index(connection)
+
+
+# -------------------------
+# Querying
+# -------------------------
+def has_fts_table(using):
+    if using not in _fts_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            _fts_available[using] = cursor.fetchone() is not None
+    return _fts_available[using]
+
+
+def _fts_phrase(term):
+    # A quoted FTS5 string is matched literally; quotes are escaped by doubling.
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search(queryset, query):
+    """Narrow a Transaction queryset to rows matching every term of `query`."""
+    terms = query.lower().split()
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    if connection.vendor == "sqlite" and has_fts_table(queryset.db):
+        indexed = [t for t in terms if len(t) >= MIN_INDEXED_TERM]
+        if indexed:
+            queryset = queryset.filter(
+                pk__in=RawSQL(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                    [" ".join(_fts_phrase(t) for t in indexed)],
+                )
+            )
+        terms = [t for t in terms if len(t) < MIN_INDEXED_TERM]
+
+    for term in terms:
+        queryset = queryset.filter(search_document__contains=term)
+    return queryset
@@ -1,14 +1,85 @@
+import datetime
+
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Transaction
+from .models import Transaction, RecurringTransaction
+from .recurrence import first_occurrence, parse_cron
+from .search import search
 from category.models import Category
 from budgets.models import Budget
 
 
+class TransactionListSerializer(serializers.ListSerializer):
+    """
+    List read path that skips model instances.
+
+    For querysets it pulls only the needed columns with values_list(), with the
+    category and budget names joined in the same query, and builds the same
+    dicts TransactionSerializer would. Anything else (e.g. a page of
+    instances) goes through the regular per-instance path. With
+    `running_balances` in the context, each row also gets `running_balance`.
+    """
+
+    # Output field -> values() column
+    values_columns = {
+        "id": "id",
+        "user": "user_id",
+        "type": "type",
+        "category": "category_id",
+        "category_name": "category__name",
+        "budget": "budget_id",
+        "budget_name": "budget__name",
+        "amount": "amount",
+        "title": "title",
+        "date": "date",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+
+    def to_representation(self, data):
+        rows = self._rows(data)
+        # Opt-in: {transaction id: balance after it}, see transactions.journal
+        balances = self.context.get("running_balances")
+        if balances is not None:
+            money = serializers.DecimalField(max_digits=14, decimal_places=2)
+            for row in rows:
+                balance = balances.get(row["id"])
+                row["running_balance"] = None if balance is None else money.to_representation(balance)
+        return rows
+
+    def _rows(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        if not isinstance(data, models.QuerySet):
+            return super().to_representation(data)
+
+        fields = list(self.child._readable_fields)
+        names = [field.field_name for field in fields]
+        columns = [self.values_columns[name] for name in names]
+        # Only decimals and datetimes need formatting; ids and strings pass through.
+        converters = [
+            (index, field.to_representation)
+            for index, field in enumerate(fields)
+            if isinstance(field, (serializers.DecimalField, serializers.DateTimeField))
+        ]
+
+        rows = []
+        for row in data.values_list(*columns):
+            row = list(row)
+            for index, convert in converters:
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+            rows.append(dict(zip(names, row)))
+        return rows
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer for reading transaction details."""
 
-    category_name = serializers.CharField(source="category.name", read_only=True)
-    budget_name = serializers.CharField(source="budget.name", read_only=True)  # ✅ show budget name
+    # None without a category/budget, in place (TransactionListSerializer keeps this order)
+    category_name = serializers.CharField(source="category.name", read_only=True, allow_null=True)
+    budget_name = serializers.CharField(source="budget.name", read_only=True, allow_null=True)  # ✅ show budget name
 
     class Meta:
         model = Transaction
@@ -34,13 +105,7 @@ class TransactionSerializer(serializers.ModelSerializer):
             "category_name", 
             "budget_name"
         ]
-
-    def to_representation(self, instance):
-        """Customize output to include category and budget names."""
-        rep = super().to_representation(instance)
-        rep["category_name"] = instance.category.name if instance.category else None
-        rep["budget_name"] = instance.budget.name if instance.budget else None
-        return rep
+        list_serializer_class = TransactionListSerializer
 
 
 class TransactionCreateSerializer(serializers.ModelSerializer):
@@ -86,3 +151,168 @@ class TransactionUpdateSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Amount must be greater than 0.")
         return value
+
+
+class RecurringTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for recurring transaction schedules. User is set automatically."""
+
+    SCHEDULE_FIELDS = ("frequency", "interval", "cron", "start_date")
+
+    class Meta:
+        model = RecurringTransaction
+        fields = [
+            "id",
+            "type",
+            "category",
+            "budget",
+            "amount",
+            "title",
+            "frequency",
+            "interval",
+            "cron",
+            "start_date",
+            "end_date",
+            "next_run",
+            "is_active",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "next_run", "created_at", "updated_at"]
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Amount must be greater than 0.")
+        return value
+
+    def validate_budget(self, value):
+        if value is not None and value.user_id != self.context["request"].user.pk:
+            raise serializers.ValidationError("Budget not found.")
+        return value
+
+    def validate(self, attrs):
+        frequency = attrs.get("frequency", getattr(self.instance, "frequency", None))
+        cron = attrs.get("cron", getattr(self.instance, "cron", ""))
+        if frequency == "cron":
+            try:
+                parse_cron(cron or "")
+            except ValueError as e:
+                raise serializers.ValidationError({"cron": str(e)})
+        return attrs
+
+    def create(self, validated_data):
+        validated_data["user"] = self.context["request"].user
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        """Changing the schedule restarts it from now; already-posted occurrences stay."""
+        rescheduled = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in self.SCHEDULE_FIELDS
+        )
+        instance = super().update(instance, validated_data)
+        if rescheduled:
+            instance.next_run = first_occurrence(instance, not_before=timezone.now())
+            instance.save(update_fields=["next_run"])
+        return instance
+
+
+class TransactionSearchSerializer(serializers.Serializer):
+    """Validates the query parameters of the transaction search endpoint."""
+
+    q = serializers.CharField(required=False, allow_blank=True, max_length=200)
+    type = serializers.ChoiceField(choices=Transaction.TYPE_CHOICES, required=False)
+    min_amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    max_amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if "min_amount" in attrs and "max_amount" in attrs and attrs["min_amount"] > attrs["max_amount"]:
+            raise serializers.ValidationError("min_amount cannot be greater than max_amount.")
+        if "date_from" in attrs and "date_to" in attrs and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from cannot be after date_to.")
+        return attrs
+
+    def filter(self, queryset):
+        """Apply the validated filters to a Transaction queryset."""
+        return filter_transactions(queryset, self.validated_data)
+
+
+def filter_transactions(queryset, params):
+    """Narrow a Transaction queryset by validated TransactionSearchSerializer data."""
+    if params.get("q"):
+        queryset = search(queryset, params["q"])
+    if "type" in params:
+        queryset = queryset.filter(type=params["type"])
+    if "min_amount" in params:
+        queryset = queryset.filter(amount__gte=params["min_amount"])
+    if "max_amount" in params:
+        queryset = queryset.filter(amount__lte=params["max_amount"])
+    # Plain range on the indexed column: whole days in the current time zone
+    if "date_from" in params:
+        queryset = queryset.filter(date__gte=start_of_day(params["date_from"]))
+    if "date_to" in params:
+        queryset = queryset.filter(date__lt=start_of_day(params["date_to"] + datetime.timedelta(days=1)))
+    return queryset
+
+
+def start_of_day(day):
+    """Aware midnight starting `day` in the current time zone."""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def has_effective_filter(params):
+    """Whether validated search params narrow the queryset at all."""
+    if (params.get("q") or "").strip():
+        return True
+    return any(key in params for key in ("type", "min_amount", "max_amount", "date_from", "date_to"))
+
+
+class TransactionBulkSerializer(serializers.Serializer):
+    """Selects the transactions a bulk action applies to: explicit `ids` or a `filter`."""
+
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_IDS,
+    )
+    filter = TransactionSearchSerializer(required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'.")
+        if "filter" in attrs and not has_effective_filter(attrs["filter"]):
+            # A blank filter would select every transaction of the user
+            raise serializers.ValidationError({"filter": "At least one filter is required."})
+        return attrs
+
+    def select(self, queryset):
+        """The subset of `queryset` (already scoped to the user) to act on."""
+        if "ids" in self.validated_data:
+            return queryset.filter(pk__in=self.validated_data["ids"])
+        return filter_transactions(queryset, self.validated_data["filter"])
+
+
+class TransactionRecategorizeSerializer(TransactionBulkSerializer):
+    category = serializers.PrimaryKeyRelatedField(
+        queryset=Category.objects.all(), allow_null=True
+    )
+
+
+class TransactionRebudgetSerializer(TransactionBulkSerializer):
+    budget = serializers.PrimaryKeyRelatedField(queryset=Budget.objects.all(), allow_null=True)
+
+    def validate_budget(self, value):
+        if value is not None and value.user_id != self.context["request"].user.pk:
+            raise serializers.ValidationError("Budget not found.")
+        return value
+
+
+class BalanceSerializer(serializers.Serializer):
+    """`as_of` query parameter in, `{as_of, balance}` out."""
+
+    as_of = serializers.DateTimeField(required=False)
+    balance = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
@@ -0,0 +1,23 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from budgets.models import Budget
+from category.models import Category
+
+from .models import Transaction
+from .search import reindex
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Budget)
+def reindex_renamed(sender, instance, created, update_fields=None, **kwargs):
+    """Keep transactions' search documents in step with category/budget names."""
+    if created or (update_fields is not None and "name" not in update_fields):
+        return
+    # Models record the name they were loaded with; unknown counts as renamed
+    loaded = getattr(instance, "_loaded_name", DEFERRED)
+    if loaded is not DEFERRED and loaded == instance.name:
+        return
+    field = "category" if sender is Category else "budget"
+    reindex(Transaction.objects.filter(**{field: instance}))
@@ -1,3 +1,283 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.throttling import bypass_throttling
+from budgets.models import Budget
+from category.models import Category
+
+from . import journal, signals
+from .bulk import delete_transactions
+from .ledger import all_user_ids, reconcile
+from .models import JournalEntry, RecurringTransaction, Transaction
+from .recurrence import cron_next, materialize_due, parse_cron
+from .serializers import TransactionSerializer, filter_transactions
+
+
+class BulkFilterTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="bulk@example.com", password="x")
+        self.user = get_user_model().objects.get(pk=user.pk)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        for title, amount in (("Coffee", "3.50"), ("Rent", "900.00"), ("Coffee beans", "12.00")):
+            Transaction.objects.create(user=self.user, type="expense", amount=Decimal(amount), title=title)
+
+    def post(self, action, data):
+        with bypass_throttling():
+            return self.client.post(f"/api/transactions/{action}/", data, format="json")
+
+    def test_blank_filter_is_rejected(self):
+        for action in ("bulk-delete", "bulk-recategorize", "bulk-rebudget"):
+            for selection in ({}, {"q": ""}, {"q": "   "}):
+                data = {"filter": selection, "category": None, "budget": None}
+                response = self.post(action, data)
+                self.assertEqual(response.status_code, 400, (action, selection))
+                self.assertIn("filter", response.data)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+
+    def test_filter_deletes_only_matching_rows(self):
+        response = self.post("bulk-delete", {"filter": {"max_amount": "20.00"}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertEqual(list(Transaction.objects.values_list("title", flat=True)), ["Rent"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.expense_total, Decimal("900.00"))
+        self.assertEqual(self.user.balance, Decimal("-900.00"))
+
+
+@override_settings(TIME_ZONE="America/New_York")
+class DateFilterTests(TestCase):
+    def test_date_bounds_cover_whole_local_days(self):
+        user = get_user_model().objects.create_user(email="dates@example.com", password="x")
+        user = get_user_model().objects.get(pk=user.pk)
+        local = timezone.get_current_timezone()
+        for title, moment in (
+            ("before", datetime.datetime(2026, 5, 31, 23, 30)),
+            ("first", datetime.datetime(2026, 6, 1, 0, 0)),
+            ("last", datetime.datetime(2026, 6, 2, 23, 30)),
+            ("after", datetime.datetime(2026, 6, 3, 0, 0)),
+        ):
+            Transaction.objects.create(
+                user=user, type="income", amount=Decimal("1.00"), title=title,
+                date=timezone.make_aware(moment, local),
+            )
+
+        params = {"date_from": datetime.date(2026, 6, 1), "date_to": datetime.date(2026, 6, 2)}
+        titles = filter_transactions(Transaction.objects.all(), params).values_list("title", flat=True)
+
+        self.assertEqual(sorted(titles), ["first", "last"])
+
+
+class LedgerConsistencyTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="ledger@example.com", password="x")
+        self.user = get_user_model().objects.get(pk=user.pk)
+        self.start = timezone.now() - datetime.timedelta(days=30)
+
+    def add(self, type, amount, days):
+        return Transaction.objects.create(
+            user=self.user, type=type, amount=Decimal(amount), title=type,
+            date=self.start + datetime.timedelta(days=days),
+        )
+
+    def assertConsistent(self):
+        """Stored totals, the journal, the as-of balance and reconcile() all agree."""
+        self.user.refresh_from_db()
+        journal_total = sum(
+            JournalEntry.objects.filter(user=self.user).values_list("delta", flat=True), Decimal(0)
+        )
+        self.assertEqual(self.user.balance, journal_total)
+        self.assertEqual(journal.balance_as_of(self.user.pk, timezone.now()), self.user.balance)
+        mismatches = [m for _, chunk in reconcile(all_user_ids(100)) for m in chunk]
+        self.assertEqual(mismatches, [])
+
+    def test_edits_and_deletes_are_journaled(self):
+        salary = self.add("income", "1000.00", 1)
+        rent = self.add("expense", "400.00", 2)
+        self.add("expense", "25.00", 3)
+        self.assertConsistent()
+
+        rent.amount = Decimal("450.00")
+        rent.save()
+        salary.delete()
+        delete_transactions(Transaction.objects.filter(user=self.user, amount=Decimal("25.00")))
+        self.assertConsistent()
+        self.assertEqual(self.user.balance, Decimal("-450.00"))
+
+    def test_balance_as_of_with_checkpoint_and_backdated_entry(self):
+        self.add("income", "100.00", 1)
+        self.add("expense", "30.00", 5)
+        journal.create_checkpoints(as_of=self.start + datetime.timedelta(days=10))
+        # Recorded after the checkpoint but dated before it
+        self.add("expense", "20.00", 3)
+
+        self.assertEqual(journal.balance_as_of(self.user.pk, self.start), Decimal("0.00"))
+        self.assertEqual(
+            journal.balance_as_of(self.user.pk, self.start + datetime.timedelta(days=4)), Decimal("80.00")
+        )
+        self.assertEqual(
+            journal.balance_as_of(self.user.pk, self.start + datetime.timedelta(days=10)), Decimal("50.00")
+        )
+        self.assertConsistent()
+
+    def test_running_balances_follow_the_journal(self):
+        first = self.add("income", "100.00", 1)
+        second = self.add("expense", "40.00", 2)
+        third = self.add("income", "5.50", 3)
+
+        balances = journal.running_balances(self.user.pk, second.date, third.date)
+
+        self.assertEqual(balances, {second.pk: Decimal("60.00"), third.pk: Decimal("65.50")})
+        self.assertNotIn(first.pk, balances)
+        for transaction in (second, third):
+            self.assertEqual(balances[transaction.pk], journal.balance_as_of(self.user.pk, transaction.date))
+
+
+class CronTests(SimpleTestCase):
+    def test_parse_fields(self):
+        (minutes, hours, days, months, weekdays), dom_set, dow_set = parse_cron("*/15 9-17/4 1,15 * 7")
+        self.assertEqual(minutes, {0, 15, 30, 45})
+        self.assertEqual(hours, {9, 13, 17})
+        self.assertEqual(days, {1, 15})
+        self.assertEqual(len(months), 12)
+        # 7 is Sunday, like 0
+        self.assertEqual(weekdays, {0})
+        self.assertEqual((dom_set, dow_set), (True, True))
+
+    def test_malformed_rules_are_rejected(self):
+        for rule in ("* * * *", "60 * * * *", "* * 0 * *", "5-1 * * * *", "*/0 * * * *", "a * * * *"):
+            with self.assertRaises(ValueError, msg=rule):
+                parse_cron(rule)
+
+    def test_next_match(self):
+        after = datetime.datetime(2026, 6, 1, 9, 0, tzinfo=datetime.timezone.utc)  # a Monday
+        self.assertEqual(cron_next("30 9 * * *", after), after.replace(minute=30))
+        self.assertEqual(cron_next("0 9 * * *", after), after.replace(day=2))
+        # Both day fields restricted: the 15th or any Friday, whichever comes first
+        self.assertEqual(cron_next("0 8 15 * 5", after), after.replace(day=5, hour=8))
+        self.assertIsNone(cron_next("0 0 31 2 *", after))
+
+
+class MaterializeDueTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="recurring@example.com", password="x")
+        self.user = get_user_model().objects.get(pk=user.pk)
+        self.now = timezone.now().replace(second=0, microsecond=0)
+        self.schedule = RecurringTransaction.objects.create(
+            user=self.user, type="expense", amount=Decimal("10.00"), title="Gym",
+            frequency="daily", start_date=self.now - datetime.timedelta(days=4),
+        )
+
+    def assertPosted(self, count):
+        self.assertEqual(Transaction.objects.filter(recurring=self.schedule).count(), count)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.expense_total, Decimal("10.00") * count)
+
+    def test_catch_up_is_limited_per_run(self):
+        self.assertEqual(materialize_due(now=self.now, max_catch_up=3), (1, 3))
+        self.assertPosted(3)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.next_run, self.now - datetime.timedelta(days=1))
+
+        self.assertEqual(materialize_due(now=self.now, max_catch_up=3), (1, 2))
+        self.assertPosted(5)
+
+    def test_rerun_posts_nothing_twice(self):
+        self.assertEqual(materialize_due(now=self.now), (1, 5))
+        self.assertEqual(materialize_due(now=self.now), (0, 0))
+
+        # A schedule rewound over posted occurrences only moves next_run on
+        RecurringTransaction.objects.filter(pk=self.schedule.pk).update(next_run=self.schedule.start_date)
+        self.assertEqual(materialize_due(now=self.now), (1, 0))
+        self.assertPosted(5)
+
+    def test_redated_occurrence_is_still_skipped(self):
+        materialize_due(now=self.now)
+        # Move the first occurrence before every other candidate's date
+        Transaction.objects.filter(date=self.schedule.start_date).update(
+            date=self.schedule.start_date - datetime.timedelta(days=30)
+        )
+        RecurringTransaction.objects.filter(pk=self.schedule.pk).update(next_run=self.schedule.start_date)
+
+        self.assertEqual(materialize_due(now=self.now), (1, 0))
+        self.assertPosted(5)
+
+    def test_budget_must_belong_to_the_user(self):
+        other = get_user_model().objects.create_user(email="other@example.com", password="x")
+        today = datetime.date.today()
+        budgets = {
+            owner: Budget.objects.create(user=owner, name="Fitness", limit=100, start_date=today, end_date=today)
+            for owner in (self.user, other)
+        }
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+        for owner, status in ((other, 400), (self.user, 201)):
+            data = {"type": "expense", "amount": "10.00", "title": "Gym", "budget": budgets[owner].pk}
+            with bypass_throttling():
+                response = client.post("/api/recurring-transactions/", data, format="json")
+            self.assertEqual(response.status_code, status, response.data)
+        self.assertEqual(RecurringTransaction.objects.exclude(budget=None).get().budget, budgets[self.user])
+
+
+class ReindexRenamedTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="search@example.com", password="x")
+        user = get_user_model().objects.get(pk=user.pk)
+        today = datetime.date.today()
+        self.category = Category.objects.create(name="Groceries")
+        self.budget = Budget.objects.create(user=user, name="Food", limit=100, start_date=today, end_date=today)
+        self.transaction = Transaction.objects.create(
+            user=user, type="expense", amount=Decimal("5.00"), title="Milk",
+            category=self.category, budget=self.budget,
+        )
+
+    def test_only_renames_reindex(self):
+        with mock.patch.object(signals, "reindex", wraps=signals.reindex) as reindex:
+            Category.objects.get().save()
+            budget = Budget.objects.get()
+            budget.limit = 200
+            budget.save()
+            self.assertEqual(reindex.call_count, 0)
+
+            category = Category.objects.get()
+            category.name = "Supermarket"
+            category.save()
+            self.budget.name = "Household"
+            self.budget.save()
+            self.assertEqual(reindex.call_count, 2)
+            # Saving again after the rename is not another rename
+            category.save()
+            self.assertEqual(reindex.call_count, 2)
+
+        self.transaction.refresh_from_db()
+        self.assertIn("supermarket", self.transaction.search_document)
+        self.assertIn("household", self.transaction.search_document)
+
+
+class TransactionListSerializerTests(TestCase):
+    def test_values_path_matches_instance_output(self):
+        user = get_user_model().objects.create_user(email="list@example.com", password="x")
+        user = get_user_model().objects.get(pk=user.pk)
+        today = datetime.date.today()
+        category = Category.objects.create(name="Transport")
+        budget = Budget.objects.create(user=user, name="Commute", limit=50, start_date=today, end_date=today)
+        for links in ({}, {"category": category}, {"budget": budget}, {"category": category, "budget": budget}):
+            Transaction.objects.create(user=user, type="expense", amount=Decimal("2.40"), title="Bus", **links)
+        transactions = Transaction.objects.filter(user=user).order_by("pk")
+
+        listed = TransactionSerializer(transactions, many=True).data
+        detailed = [TransactionSerializer(transaction).data for transaction in transactions]
+
+        # Same keys, values and key order, for rows with and without names
+        self.assertEqual([list(row.items()) for row in listed], [list(row.items()) for row in detailed])
+        self.assertEqual(listed[0]["category_name"], None)
+        self.assertEqual(listed[3]["budget_name"], "Commute")
@@ -1,9 +1,12 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import TransactionViewSet
+from .views import TransactionViewSet, RecurringTransactionViewSet
 
 router = DefaultRouter()
 router.register(r"transactions", TransactionViewSet, basename="transaction")
+router.register(
+    r"recurring-transactions", RecurringTransactionViewSet, basename="recurring-transaction"
+)
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+
+# Rows per UPDATE statement; keeps parameters well below SQLite/Postgres limits.
+UPDATE_CHUNK_SIZE = 500
+
+ZERO = Decimal("0.00")
+
+
+def update_from_values(model, rows, assignments, using=None):
+    """
+    Set-based UPDATE of many rows with per-row values, one statement per chunk:
+
+        UPDATE table SET col = <expr> FROM (VALUES (pk, v1, ...), ...) AS d
+        WHERE table.pk = d.column1
+
+    `rows` are `(pk, value1, value2, ...)` tuples and `assignments` is a list
+    of `(field_name, template)` pairs in the same order as the values. The
+    template uses `{col}` for the current column and `{value}` for the row's
+    value, e.g. `"{col} + {value}"` or just `"{value}"`.
+    Much cheaper than bulk_update()/Case(When()) for thousands of rows.
+    Returns the number of rows updated.
+    """
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    fields = [model._meta.pk] + [model._meta.get_field(name) for name, _ in assignments]
+
+    # Postgres needs typed VALUES; SQLite is dynamically typed and CAST would coerce.
+    if connection.vendor == "postgresql":
+        placeholders = [f"CAST(%s AS {field.db_type(connection)})" for field in fields]
+    else:
+        placeholders = ["%s"] * len(fields)
+    row_sql = "(" + ", ".join(placeholders) + ")"
+
+    set_sql = ", ".join(
+        f"{qn(field.column)} = "
+        + template.format(col=f"{table}.{qn(field.column)}", value=f"d.column{index}")
+        for index, (field, (_, template)) in enumerate(zip(fields[1:], assignments), start=2)
+    )
+
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPDATE_CHUNK_SIZE):
+            chunk = rows[start:start + UPDATE_CHUNK_SIZE]
+            params = [
+                field.get_db_prep_save(value, connection)
+                for row in chunk
+                for field, value in zip(fields, row)
+            ]
+            cursor.execute(
+                f"UPDATE {table} SET {set_sql} "
+                f"FROM (VALUES {', '.join([row_sql] * len(chunk))}) AS d "
+                f"WHERE {table}.{qn(fields[0].column)} = d.column1",
+                params,
+            )
+            updated += cursor.rowcount
+    return updated
+
+
+def apply_user_deltas(deltas):
+    """
+    Apply `{user_id: (income_delta, expense_delta)}` to the denormalized user
+    totals with set-based UPDATEs instead of one `user.save()` per transaction.
+    Returns the number of users updated.
+    """
+    rows = [
+        (user_id, income, expense, income - expense)
+        for user_id, (income, expense) in deltas.items()
+        if income or expense
+    ]
+    return update_from_values(
+        get_user_model(),
+        rows,
+        [
+            ("income_total", "{col} + {value}"),
+            ("expense_total", "{col} + {value}"),
+            ("balance", "{col} + {value}"),
+        ],
+    )
+
+
+def add_user_delta(deltas, user_id, type, amount, sign=1):
+    """Accumulate one transaction's effect into a `deltas` dict for apply_user_deltas."""
+    income, expense = deltas.get(user_id, (ZERO, ZERO))
+    if type == "income":
+        income += sign * amount
+    elif type == "expense":
+        expense += sign * amount
+    deltas[user_id] = (income, expense)
@@ -1,11 +1,24 @@
+from django.db.models import Max, Min
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import ScopedRateThrottle
-from .models import Transaction
+from rest_framework.response import Response
+from backend.throttling import BucketScopedRateThrottle
+from .journal import balance_as_of, running_balances
+from .bulk import delete_transactions, rebudget_transactions, recategorize_transactions
+from .models import Transaction, RecurringTransaction
+from .pagination import OptionalTransactionCursorPagination, TransactionCursorPagination
 from .serializers import (
     TransactionSerializer,
     TransactionCreateSerializer,
     TransactionUpdateSerializer,
+    TransactionSearchSerializer,
+    TransactionBulkSerializer,
+    TransactionRecategorizeSerializer,
+    TransactionRebudgetSerializer,
+    BalanceSerializer,
+    RecurringTransactionSerializer,
 )
 
 
@@ -16,15 +29,20 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
     permission_classes = [IsAuthenticated]
     queryset = Transaction.objects.all()
-    throttle_classes = [ScopedRateThrottle]   # 👈 enable scoped throttling
+    throttle_classes = [BucketScopedRateThrottle]   # 👈 enable scoped throttling
     throttle_scope = "transactions"           # 👈 define scope for transactions
+    pagination_class = OptionalTransactionCursorPagination  # only with ?cursor= / ?page_size=
 
     def get_queryset(self):
         """
         Users can only see their own transactions.
         """
         user = self.request.user
-        return Transaction.objects.filter(user=user).order_by("-date", "-created_at")
+        return (
+            Transaction.objects.filter(user=user)
+            .select_related("category", "budget")
+            .order_by("-date", "-created_at")
+        )
 
     def get_serializer_class(self):
         """
@@ -35,3 +53,95 @@ class TransactionViewSet(viewsets.ModelViewSet):
         elif self.action in ["update", "partial_update"]:
             return TransactionUpdateSerializer
         return TransactionSerializer
+
+    def list(self, request, *args, **kwargs):
+        """
+        The user's transactions. `?running_balance=true` adds the balance after
+        each one; combine it with `page_size`/`cursor` to keep every page cheap.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+
+        context = self.get_serializer_context()
+        if request.query_params.get("running_balance", "").lower() in ("1", "true", "yes"):
+            context["running_balances"] = self._running_balances(rows)
+        data = self.get_serializer_class()(rows, many=True, context=context).data
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+    def _running_balances(self, rows):
+        if isinstance(rows, list):
+            dates = [t.date for t in rows]
+            oldest, newest = (min(dates), max(dates)) if dates else (None, None)
+        else:
+            bounds = rows.aggregate(oldest=Min("date"), newest=Max("date"))
+            oldest, newest = bounds["oldest"], bounds["newest"]
+        if oldest is None:
+            return {}
+        return running_balances(self.request.user.pk, oldest, newest)
+
+    @action(detail=False, methods=["get"], pagination_class=TransactionCursorPagination)
+    def search(self, request):
+        """
+        Search title, category name and budget name (`q`), filtered by `type`,
+        `min_amount`/`max_amount` and `date_from`/`date_to`. Cursor paginated.
+        """
+        params = TransactionSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = params.filter(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def balance(self, request):
+        """Balance counting every transaction dated at or before `as_of` (default: now)."""
+        params = BalanceSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        as_of = params.validated_data.get("as_of") or timezone.now()
+        balance = balance_as_of(request.user.pk, as_of)
+        return Response(BalanceSerializer({"as_of": as_of, "balance": balance}).data)
+
+    # -------------------------
+    # Bulk actions
+    # -------------------------
+    # Each takes {"ids": [...]} or {"filter": {<search params>}} and runs a
+    # fixed number of statements however many rows match (see transactions.bulk).
+    def _bulk_selection(self, serializer_class):
+        serializer = serializer_class(data=self.request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        return serializer, serializer.select(Transaction.objects.filter(user=self.request.user))
+
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_delete(self, request):
+        _, queryset = self._bulk_selection(TransactionBulkSerializer)
+        return Response({"deleted": delete_transactions(queryset)})
+
+    @action(detail=False, methods=["post"], url_path="bulk-recategorize")
+    def bulk_recategorize(self, request):
+        serializer, queryset = self._bulk_selection(TransactionRecategorizeSerializer)
+        updated = recategorize_transactions(queryset, serializer.validated_data["category"])
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=["post"], url_path="bulk-rebudget")
+    def bulk_rebudget(self, request):
+        serializer, queryset = self._bulk_selection(TransactionRebudgetSerializer)
+        updated = rebudget_transactions(queryset, serializer.validated_data["budget"])
+        return Response({"updated": updated})
+
+
+class RecurringTransactionViewSet(viewsets.ModelViewSet):
+    """
+    CRUD for recurring transaction schedules (rent, salary, subscriptions).
+    Occurrences are posted by the `materialize_recurring` management command.
+    """
+
+    serializer_class = RecurringTransactionSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [BucketScopedRateThrottle]
+    throttle_scope = "transactions"
+
+    def get_queryset(self):
+        """Users can only see their own schedules."""
+        return RecurringTransaction.objects.filter(user=self.request.user).order_by("next_run")
@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
+from backend.admin import LargeTableAdminMixin
 from .models import CustomUser
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdminMixin, UserAdmin):
     """Admin configuration for CustomUser model."""
 
     ordering = ["id"]
@@ -20,6 +21,7 @@ class CustomUserAdmin(UserAdmin):
         "is_active",
     ]
     search_fields = ["email", "name"]
+    date_hierarchy = "date_joined"
 
     fieldsets = (
         (None, {"fields": ("email", "password")}),
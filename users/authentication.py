@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_STATE_CACHE_PREFIX = "auth:user-state"
+_MISSING = "missing"
+
+# Only these fields affect whether a token is still accepted.
+AUTH_STATE_FIELDS = {"is_active", "password"}
+
+
+def user_state_cache_key(user_id):
+    return f"{USER_STATE_CACHE_PREFIX}:{user_id}"
+
+
+def get_user_state(user_id):
+    """
+    Return `(pk, is_active, password_hash)` for the user behind a token,
+    or None if the user does not exist.
+
+    The tuple is cached in the shared cache for `AUTH_USER_STATE_CACHE_TIMEOUT`
+    seconds instead of running a SELECT per request. ORM writes to the auth
+    fields invalidate it (users.signals, CustomUserQuerySet); other writes are
+    picked up when the entry expires.
+    """
+    key = user_state_cache_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = (
+            get_user_model().objects
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list("pk", "is_active", "password")
+            .first()
+        )
+        state = (row[0], row[1], get_md5_hash_password(row[2])) if row else _MISSING
+        cache.set(key, state, settings.AUTH_USER_STATE_CACHE_TIMEOUT)
+    return None if state == _MISSING else state
+
+
+def invalidate_user_state(user_id):
+    invalidate_user_states([user_id])
+
+
+def invalidate_user_states(user_ids):
+    keys = [user_state_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # A request may re-cache the old row before the write commits
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def build_lazy_user(pk, is_active):
+    """
+    Build a user instance with only `pk` and `is_active` loaded.
+
+    Every other field is deferred; the first access to any of them loads
+    all of them in one query (see `CustomUser.refresh_from_db`).
+    """
+    model = get_user_model()
+    return model.from_db(
+        router.db_for_write(model),
+        [model._meta.pk.attname, "is_active"],
+        [pk, is_active],
+    )
+
+
+class LazyJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not SELECT the user row on every request.
+
+    Active/revoked state comes from a short-lived cache; the returned user is
+    a deferred instance, so views that only scope querysets by user never
+    touch the users table.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        state = get_user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        pk, is_active, password_hash = state
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return build_lazy_user(pk, is_active)
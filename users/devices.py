@@ -0,0 +1,140 @@
+"""
+Device registry housekeeping.
+
+A device's `last_active` is refreshed whenever it (re)registers its FCM
+token (`update-firebase-token`), and on requests that identify the device
+with the `X-Device-Token` header. `DeviceActivityMiddleware` records those
+touches in a per-process buffer and `flush_touches` writes them with a
+single UPDATE, instead of one write per request. The buffer is flushed when
+it holds DEVICE_TOUCH_BUFFER_SIZE devices, DEVICE_TOUCH_FLUSH_SECONDS after
+its first touch (from a timer thread, so idle workers flush too), and when
+the process exits.
+
+`prune_devices` (see the `prune_devices` command) deletes the oldest devices
+beyond DEVICE_MAX_PER_USER, which keeps push fan-out per notification
+bounded, and devices not seen for DEVICE_INACTIVE_DAYS. Age-based pruning is
+off (0) by default: clients that do not send the header yet are only seen
+when they re-register, so they would look idle.
+"""
+
+import atexit
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import UserDevice
+
+DEVICE_TOKEN_HEADER = "HTTP_X_DEVICE_TOKEN"
+
+# fcm_token -> user_id of devices seen since the last flush
+_touches = {}
+_lock = threading.Lock()
+# Pending time-based flush of the current buffer
+_timer = None
+
+
+# -------------------------
+# Last-active tracking
+# -------------------------
+def touch(user_id, token):
+    """Buffer a device touch; flushes when the buffer is full or on a timer."""
+    global _timer
+    with _lock:
+        if not _touches and _timer is None:
+            _timer = threading.Timer(settings.DEVICE_TOUCH_FLUSH_SECONDS, _flush_from_timer)
+            _timer.daemon = True
+            _timer.start()
+        _touches[token] = user_id
+        full = len(_touches) >= settings.DEVICE_TOUCH_BUFFER_SIZE
+    if full:
+        flush_touches()
+
+
+def _flush_from_timer():
+    try:
+        flush_touches()
+    finally:
+        # The timer thread opened its own connection
+        connections.close_all()
+
+
+def flush_touches(now=None):
+    """Write every buffered touch with one UPDATE. Returns the number of devices updated."""
+    global _timer
+    with _lock:
+        touches = dict(_touches)
+        _touches.clear()
+        if _timer is not None and _timer is not threading.current_thread():
+            _timer.cancel()
+        _timer = None
+    if not touches:
+        return 0
+    return UserDevice.objects.filter(
+        fcm_token__in=touches, user_id__in=set(touches.values())
+    ).update(last_active=now or timezone.now())
+
+
+# Don't lose the last touches when a worker shuts down
+atexit.register(flush_touches)
+
+
+class DeviceActivityMiddleware:
+    """Record the requesting device for authenticated requests."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        token = request.META.get(DEVICE_TOKEN_HEADER)
+        # DRF sets the authenticated user on the underlying request
+        user = getattr(request, "user", None)
+        if token and user is not None and user.is_authenticated and response.status_code < 400:
+            touch(user.pk, token[:255])
+        return response
+
+
+# -------------------------
+# Pruning
+# -------------------------
+def enforce_device_cap(user_ids=None, cap=None):
+    """
+    Delete each user's least recently active devices beyond `cap`
+    (default DEVICE_MAX_PER_USER). Returns the number of devices deleted.
+    """
+    cap = cap or settings.DEVICE_MAX_PER_USER
+    devices = UserDevice.objects.all()
+    if user_ids is not None:
+        devices = devices.filter(user_id__in=user_ids)
+    ranked = devices.annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F("user_id")],
+            order_by=[F("last_active").desc(), F("id").desc()],
+        )
+    ).filter(rank__gt=cap)
+    excess = list(ranked.values_list("pk", flat=True))
+    if not excess:
+        return 0
+    return UserDevice.objects.filter(pk__in=excess).delete()[0]
+
+
+def prune_devices(now=None, inactive_days=None, cap=None):
+    """
+    Remove stale devices (unless `inactive_days`, default
+    DEVICE_INACTIVE_DAYS, is 0) and enforce the per-user cap.
+    Returns `(stale, over_cap)` counts.
+    """
+    flush_touches(now)
+    now = now or timezone.now()
+    inactive_days = settings.DEVICE_INACTIVE_DAYS if inactive_days is None else inactive_days
+    stale = 0
+    if inactive_days:
+        cutoff = now - timedelta(days=inactive_days)
+        stale = UserDevice.objects.filter(last_active__lt=cutoff).delete()[0]
+    return stale, enforce_device_cap(cap=cap)
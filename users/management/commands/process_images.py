@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.images import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode, thumbnail and upload every staged profile/budget image. "
+        "Run it from cron, or keep it running with --loop as the image worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new uploads.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            counts = process_pending(batch_size=options["batch_size"])
+            elapsed = time.perf_counter() - started
+            if counts or not options["loop"]:
+                summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) or "nothing to do"
+                self.stdout.write(self.style.SUCCESS(f"Processed images: {summary} in {elapsed:.2f}s."))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from users.devices import prune_devices
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete devices not seen for --inactive-days and each user's least recently "
+        "active devices beyond --max-per-user. Schedule it daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--inactive-days", type=int, default=None, help="Default: DEVICE_INACTIVE_DAYS; 0 keeps idle devices.")
+        parser.add_argument("--max-per-user", type=int, default=None, help="Default: DEVICE_MAX_PER_USER.")
+
+    def handle(self, *args, **options):
+        stale, over_cap = prune_devices(
+            inactive_days=options["inactive_days"], cap=options["max_per_user"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {stale} inactive devices and {over_cap} over the per-user cap.")
+        )
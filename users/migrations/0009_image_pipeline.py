@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:25
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    CustomUser = apps.get_model("users", "CustomUser")
+    CustomUser.objects.exclude(image=None).exclude(image="").update(image_status="ready")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0008_remove_customuser_firebase_notification_token_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='image_staged',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_images/thumbnails/'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('image_status', 'pending')), fields=['id'], name='user_image_pending_idx'),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_image_pipeline'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userdevice',
+            name='last_active',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:53
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def start_pending_clocks(apps, schema_editor):
+    # Images already pending get the full timeout from now
+    CustomUser = apps.get_model("users", "CustomUser")
+    CustomUser.objects.filter(image_status="pending").update(image_staged_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_device_last_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='image_staged_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(start_pending_clocks, migrations.RunPython.noop),
+    ]
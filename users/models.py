@@ -5,8 +5,35 @@ from django.contrib.auth.models import (
 from django.utils import timezone
 from django.conf import settings
 
+from backend.images import IMAGE_STATUS_CHOICES
 
-class CustomUserManager(BaseUserManager):
+
+class CustomUserQuerySet(models.QuerySet):
+    """
+    Bulk writes that change `is_active` or `password` bypass the post_save
+    signal, so they drop the affected users' cached auth state themselves.
+    """
+
+    def update(self, **kwargs):
+        from .authentication import AUTH_STATE_FIELDS, invalidate_user_states
+
+        if not AUTH_STATE_FIELDS & kwargs.keys():
+            return super().update(**kwargs)
+        user_ids = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        invalidate_user_states(user_ids)
+        return rows
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        from .authentication import AUTH_STATE_FIELDS, invalidate_user_states
+
+        rows = super().bulk_update(objs, fields, batch_size=batch_size)
+        if AUTH_STATE_FIELDS & set(fields):
+            invalidate_user_states([obj.pk for obj in objs])
+        return rows
+
+
+class CustomUserManager(BaseUserManager.from_queryset(CustomUserQuerySet)):
     """Manager for custom user model that uses email as the unique identifier."""
 
     def create_user(self, email, name=None, password=None, **extra_fields):
@@ -44,6 +71,13 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     name = models.CharField(max_length=150, blank=True, null=True)
     image = models.ImageField(upload_to="profile_images/", null=True, blank=True)
+    # Filled in by the image pipeline (backend.images); `image_staged` names
+    # the raw upload awaiting processing (since `image_staged_at`) while
+    # `image_status` is "pending"
+    image_thumbnail = models.ImageField(upload_to="profile_images/thumbnails/", null=True, blank=True, editable=False)
+    image_status = models.CharField(max_length=7, choices=IMAGE_STATUS_CHOICES, default="none", editable=False)
+    image_staged = models.CharField(max_length=100, blank=True, default="", editable=False)
+    image_staged_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     balance = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     income_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
@@ -67,9 +101,27 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self):
         return self.name.split(" ")[0] if self.name else self.email
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """
+        When a deferred field is accessed, load every deferred field at once.
+        Lazily authenticated users (see users.authentication) then cost a
+        single query on first use instead of one query per field.
+        """
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
     class Meta:
         verbose_name = "user"
         verbose_name_plural = "users"
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(image_status="pending"),
+                name="user_image_pending_idx",
+            ),
+        ]
 
 
 # ✅ NEW: UserDevice model to support multiple devices per user
@@ -82,7 +134,8 @@ class UserDevice(models.Model):
     fcm_token = models.CharField(max_length=255, unique=True)
     device_name = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    last_active = models.DateTimeField(auto_now=True)
+    # Refreshed in batches by users.devices.flush_touches
+    last_active = models.DateTimeField(default=timezone.now, db_index=True)
 
     def __str__(self):
         return f"{self.user.email} — {self.device_name or 'Unknown Device'}"
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
+from backend.images import ProcessedImageField
 from transactions.serializers import TransactionSerializer
 
 CustomUser = get_user_model()
@@ -9,6 +10,7 @@ CustomUser = get_user_model()
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for reading/updating user objects with nested transactions."""
 
+    image = ProcessedImageField()
     transactions = TransactionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -38,6 +40,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new users with password, and returning JWT tokens."""
 
     password = serializers.CharField(write_only=True, min_length=6)
+    image = ProcessedImageField()
     refresh = serializers.CharField(read_only=True)
     access = serializers.CharField(read_only=True)
 
@@ -88,6 +91,8 @@ class UserCreateSerializer(serializers.ModelSerializer):
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating user profile (excluding email)."""
 
+    image = ProcessedImageField()
+
     class Meta:
         model = CustomUser
         fields = ["name", "image", "balance", "income_total", "expense_total"]
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import AUTH_STATE_FIELDS, invalidate_user_state
+
+CustomUser = get_user_model()
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_auth_state_on_save(sender, instance, update_fields=None, **kwargs):
+    # Balance updates from Transaction.save pass update_fields and skip this.
+    if update_fields is None or AUTH_STATE_FIELDS & set(update_fields):
+        invalidate_user_state(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_auth_state_on_delete(sender, instance, **kwargs):
+    invalidate_user_state(instance.pk)
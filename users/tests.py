@@ -1,3 +1,93 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.throttling import bypass_throttling
+
+from . import devices
+from .authentication import get_user_state
+from .models import UserDevice
+
+
+class DeviceActivityTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="devices@example.com", password="x")
+        self.long_ago = timezone.now() - timedelta(days=400)
+        self.device = UserDevice.objects.create(
+            user=self.user, fcm_token="token-1", last_active=self.long_ago
+        )
+
+    def tearDown(self):
+        devices.flush_touches()
+
+    @override_settings(DEVICE_TOUCH_BUFFER_SIZE=2, DEVICE_TOUCH_FLUSH_SECONDS=3600)
+    def test_full_buffer_flushes(self):
+        devices.touch(self.user.pk, "token-1")
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.last_active, self.long_ago)
+        self.assertIsNotNone(devices._timer)
+
+        devices.touch(self.user.pk, "token-2")
+        self.device.refresh_from_db()
+        self.assertGreater(self.device.last_active, self.long_ago)
+        self.assertIsNone(devices._timer)
+
+    def test_age_pruning_is_opt_in(self):
+        with override_settings(DEVICE_INACTIVE_DAYS=0):
+            self.assertEqual(devices.prune_devices(), (0, 0))
+        self.assertTrue(UserDevice.objects.filter(pk=self.device.pk).exists())
+
+        with override_settings(DEVICE_INACTIVE_DAYS=90):
+            self.assertEqual(devices.prune_devices(), (1, 0))
+
+
+@override_settings(AUTH_USER_STATE_CACHE_TIMEOUT=3600)
+class UserStateCacheTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="state@example.com", password="old-password")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def status(self):
+        with bypass_throttling():
+            return self.client.get("/api/transactions/").status_code
+
+    def test_state_is_cached(self):
+        self.assertEqual(self.status(), 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(get_user_state(self.user.pk)[1])
+        users_table = get_user_model()._meta.db_table
+        self.assertFalse([q for q in queries.captured_queries if users_table in q["sql"]])
+
+    def test_deactivation_revokes_access(self):
+        self.assertEqual(self.status(), 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.status(), 401)
+
+    def test_bulk_deactivation_revokes_access(self):
+        users = get_user_model().objects.filter(pk=self.user.pk)
+        self.assertEqual(self.status(), 200)
+        users.update(is_active=False)
+        self.assertEqual(self.status(), 401)
+
+        users.update(is_active=True)
+        self.assertEqual(self.status(), 200)
+        self.user.is_active = False
+        users.bulk_update([self.user], ["is_active"])
+        self.assertEqual(self.status(), 401)
+
+    def test_password_change_revokes_tokens(self):
+        self.assertEqual(self.status(), 200)
+        self.user.set_password("new-password")
+        self.user.save()
+        self.assertEqual(self.status(), 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.assertEqual(self.status(), 200)
@@ -2,6 +2,9 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.utils import timezone
+
+from .devices import enforce_device_cap
 from .models import CustomUser, UserDevice
 from .serializers import UserSerializer, UserCreateSerializer, UserUpdateSerializer
 
@@ -62,8 +65,10 @@ class UserViewSet(viewsets.ModelViewSet):
         # ✅ Check if this token already exists
         device, created = UserDevice.objects.update_or_create(
             fcm_token=token,
-            defaults={"user": user, "device_name": device_name},
+            defaults={"user": user, "device_name": device_name, "last_active": timezone.now()},
         )
+        # Keep fan-out bounded: drop the user's least recently active devices
+        enforce_device_cap(user_ids=[user.pk])
 
         if created:
             message = "Device registered successfully."